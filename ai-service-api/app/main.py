@@ -2,7 +2,10 @@ from fastapi import FastAPI, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from app.routes import inference_router, vector_router
 from app.services.model_manager_service import ModelManager
+from app.services.embedding_cache_service import get_embedding_cache
+from app.services.embedding_head_service import EmbeddingDimMismatch
 import asyncio
+import importlib
 
 def create_app() -> FastAPI:
     app = FastAPI()
@@ -40,13 +43,20 @@ def create_app() -> FastAPI:
     async def live():
         return {"alive": True}
 
+    @app.get("/metrics/batching", tags=["Health"])
+    async def batching_metrics():
+        return model_mgr.get_batching_stats()
+
+    @app.get("/metrics/embedding-cache", tags=["Health"])
+    async def embedding_cache_metrics():
+        return get_embedding_cache().get_stats()
+
     @app.on_event("startup")
     async def _startup_wait_models():
-        ok = await asyncio.to_thread(model_mgr.wait_for_models, 120)
+        ok = await asyncio.to_thread(model_mgr.wait_for_core_models, 120)
         if ok:
-            print("[startup] models loaded")
+            print(f"[startup] core models loaded; brand models continue in background {model_mgr.get_warmup_status().get('load_timings')}")
             try:
-                import importlib
                 inference_mod = importlib.import_module("app.routes.inference")
                 seg_model = model_mgr.get_segmentation_model()
                 if seg_model is not None and hasattr(inference_mod, "_service"):
@@ -54,6 +64,17 @@ def create_app() -> FastAPI:
                     print("[startup] segmentation model attached to route service")
             except Exception as e:
                 print(f"[startup] failed to attach model to route: {e}")
+
+            # A head that cannot produce EMBEDDING_DIM would write vectors the
+            # backend column rejects; refuse to start instead.
+            vector_mod = importlib.import_module("app.routes.vector")
+            try:
+                dim = await asyncio.to_thread(vector_mod._vectorService.probe_embedding_dim)
+                print(f"[startup] embedding head {vector_mod._vectorService.get_embedding_info()['head']} outputs {dim} dims")
+            except EmbeddingDimMismatch:
+                raise
+            except Exception as e:
+                print(f"[startup] embedding dimension probe failed: {e}")
         else:
             print("[startup] model loading timed out (120s)")
 
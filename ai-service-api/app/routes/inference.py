@@ -1,5 +1,3 @@
-import os
-import tempfile
 import asyncio
 from fastapi import APIRouter, UploadFile, File, Form
 from fastapi.responses import JSONResponse
@@ -11,10 +9,13 @@ from PIL import Image
 from app.services.model_segment_service import ModelSegmentService
 from app.services.model_brand_service import ModelBrandService
 from app.services.model_firearm_model_service import ModelFirearmModelService
+from app.services.firearm_pipeline_service import FirearmPipelineService
+from app.utils.image_util import decode_image_bytes
 
 router = APIRouter(tags=["inference"])
 _model_segment_service = ModelSegmentService()
 _model_brand_service = ModelBrandService()
+_firearm_pipeline_service = FirearmPipelineService(segment_service=_model_segment_service, brand_service=_model_brand_service)
 
 @router.post("/object-classify")
 async def object_classify_service(
@@ -26,13 +27,11 @@ async def object_classify_service(
             content={"error": "ประเภทไฟล์ไม่ถูกต้อง อนุญาตเฉพาะรูปภาพเท่านั้น"}
         )
         
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as temp:
-        temp_path = temp.name
-        contents = await image.read()
-        temp.write(contents)
-        
+    contents = await image.read()
+
     try:
-        results = await asyncio.to_thread(_model_segment_service.run_segment_model, temp_path, wait_for_model=True, wait_timeout=10, include_crops=True)
+        decoded = await asyncio.to_thread(decode_image_bytes, contents)
+        results = await _model_segment_service.run_segment_model_batched(decoded, wait_for_model=True, wait_timeout=10, include_crops=True)
         return JSONResponse(status_code=200, content=results)
         
     except ValueError as e:
@@ -41,9 +40,6 @@ async def object_classify_service(
         return JSONResponse(status_code=503, content={"error": str(e)})
     except Exception:
         return JSONResponse(status_code=500, content={"error": "Internal server error"})
-    finally:
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
 
 @router.post("/firearm-brand-classify")
 async def firearm_brand_classify(
@@ -55,13 +51,11 @@ async def firearm_brand_classify(
             content={"error": "ประเภทไฟล์ไม่ถูกต้อง อนุญาตเฉพาะรูปภาพเท่านั้น"}
         )
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as temp:
-        temp_path = temp.name
-        contents = await image.read()
-        temp.write(contents)
+    contents = await image.read()
 
     try:
-        result = await asyncio.to_thread(_model_brand_service.analyze_gun_brand, temp_path)
+        decoded = await asyncio.to_thread(decode_image_bytes, contents)
+        result = await _model_brand_service.analyze_gun_brand_batched(decoded)
         return JSONResponse(status_code=200, content=result)
 
     except ValueError as e:
@@ -70,23 +64,18 @@ async def firearm_brand_classify(
         return JSONResponse(status_code=503, content={"error": str(e)})
     except Exception:
         return JSONResponse(status_code=500, content={"error": "Internal server error"})
-    finally:
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
 
 @router.post("/firearm-model-classify")
 async def firearm_model_classify(brand: str = Form(...), file: UploadFile = File(...)):
     if not file.content_type.startswith("image/"):
         return JSONResponse(status_code=400, content={"error": "invalid image"})
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as temp:
-        temp_path = temp.name
-        contents = await file.read()
-        temp.write(contents)
+    contents = await file.read()
 
     svc = ModelFirearmModelService()
     try:
-        result = await asyncio.to_thread(svc.classify_firearm_model, temp_path, brand)
+        decoded = await asyncio.to_thread(decode_image_bytes, contents)
+        result = await svc.classify_firearm_model_batched(decoded, brand)
         return JSONResponse(status_code=200, content=result)
     except ValueError as e:
         return JSONResponse(status_code=400, content={"error": str(e)})
@@ -94,6 +83,28 @@ async def firearm_model_classify(brand: str = Form(...), file: UploadFile = File
         return JSONResponse(status_code=503, content={"error": str(e)})
     except Exception:
         return JSONResponse(status_code=500, content={"error": "Internal server error"})
-    finally:
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
\ No newline at end of file
+
+@router.post("/firearm-analyze")
+async def firearm_analyze(
+    image: UploadFile = File(...),
+    include_crops: bool = Form(True)
+):
+    if not image.content_type.startswith('image/'):
+        return JSONResponse(
+            status_code=400,
+            content={"error": "ประเภทไฟล์ไม่ถูกต้อง อนุญาตเฉพาะรูปภาพเท่านั้น"}
+        )
+
+    contents = await image.read()
+
+    try:
+        decoded = await asyncio.to_thread(decode_image_bytes, contents)
+        result = await _firearm_pipeline_service.analyze(decoded, include_crops=include_crops)
+        return JSONResponse(status_code=200, content=result)
+
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    except RuntimeError as e:
+        return JSONResponse(status_code=503, content={"error": str(e)})
+    except Exception:
+        return JSONResponse(status_code=500, content={"error": "Internal server error"})
\ No newline at end of file
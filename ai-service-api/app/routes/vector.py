@@ -1,16 +1,86 @@
-from fastapi import APIRouter, UploadFile, File
-from fastapi.responses import JSONResponse
+import json
+import shutil
+import asyncio
+import tempfile
+from typing import List, Optional
+from fastapi import APIRouter, UploadFile, File, Form
+from fastapi.responses import JSONResponse, StreamingResponse
 from app.services.vector_service import VectorService
+from app.utils.archive_util import iter_archive_images, take
 
 
 _vectorService = VectorService()
 router = APIRouter(tags=["vectors"])
 
+@router.get("/embedding-info")
+async def embedding_info():
+    return _vectorService.get_embedding_info()
+
 @router.post("/convert_image_ref_to_vector")
 async def convert_image_to_vector(image: UploadFile = File(...)):
     try:
         image_bytes = await image.read()
-        result = _vectorService.create_vector_embedding(image_bytes, segment_first=True)
+        result = await asyncio.to_thread(_vectorService.create_vector_embedding, image_bytes, segment_first=True)
         return JSONResponse(status_code=200, content=result)
     except Exception as e:
-        return JSONResponse(status_code=500, content={"error": "vectorization failed", "detail": str(e)})
\ No newline at end of file
+        return JSONResponse(status_code=500, content={"error": "vectorization failed", "detail": str(e)})
+
+@router.post("/convert_image_ref_to_vector/batch")
+async def convert_images_to_vectors(
+    images: Optional[List[UploadFile]] = File(None),
+    archive: Optional[UploadFile] = File(None),
+    segment_first: bool = Form(True),
+    batch_size: int = Form(16)
+):
+    if not images and archive is None:
+        return JSONResponse(status_code=400, content={"error": "images or archive is required"})
+
+    batch_size = max(1, min(int(batch_size), 64))
+
+    uploads = list(images or [])
+    spooled = None
+    if archive is not None:
+        spooled = tempfile.TemporaryFile()
+        await asyncio.to_thread(shutil.copyfileobj, archive.file, spooled)
+
+    async def _chunks():
+        # Uploads stay in Starlette's spooled files until their chunk is due,
+        # so at most one chunk of image bytes is held at a time.
+        for start in range(0, len(uploads), batch_size):
+            yield [(upload.filename or "", await upload.read()) for upload in uploads[start:start + batch_size]]
+        if spooled is not None:
+            members = iter_archive_images(spooled, archive.filename or "")
+            while True:
+                chunk = await asyncio.to_thread(take, members, batch_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    async def _stream():
+        offset = 0
+        try:
+            async for chunk in _chunks():
+                names = [name for name, _ in chunk]
+                try:
+                    results = await asyncio.to_thread(
+                        _vectorService.create_vector_embeddings,
+                        [data for _, data in chunk],
+                        segment_first,
+                        batch_size,
+                    )
+                except Exception as e:
+                    results = [{"index": i, "error": "vectorization failed", "detail": str(e)} for i in range(len(chunk))]
+                for result in results:
+                    result["filename"] = names[result["index"]]
+                    result["index"] += offset
+                    yield json.dumps(result) + "\n"
+                offset += len(chunk)
+        except Exception as e:
+            # Only reading the uploads or the archive gets here; nothing
+            # further can be decoded.
+            yield json.dumps({"index": offset, "error": "reading images failed", "detail": str(e)}) + "\n"
+        finally:
+            if spooled is not None:
+                spooled.close()
+
+    return StreamingResponse(_stream(), media_type="application/x-ndjson")
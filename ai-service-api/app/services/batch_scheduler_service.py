@@ -0,0 +1,149 @@
+from __future__ import annotations
+import os
+import time
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class BatchQueueFullError(RuntimeError):
+    pass
+
+
+@dataclass
+class BatchStats:
+    requests: int = 0
+    batches: int = 0
+    errors: int = 0
+    rejected: int = 0
+    max_batch_size_seen: int = 0
+    max_queue_depth_seen: int = 0
+    total_wait_ms: float = 0.0
+    total_infer_ms: float = 0.0
+
+    def to_dict(self, queue_depth: int) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "avg_batch_size": round(self.requests / self.batches, 3) if self.batches else 0.0,
+            "max_batch_size_seen": self.max_batch_size_seen,
+            "queue_depth": queue_depth,
+            "max_queue_depth_seen": self.max_queue_depth_seen,
+            "avg_wait_ms": round(self.total_wait_ms / self.requests, 3) if self.requests else 0.0,
+            "avg_infer_ms": round(self.total_infer_ms / self.batches, 3) if self.batches else 0.0,
+        }
+
+
+@dataclass
+class _ModelQueue:
+    model: Any
+    queue: "asyncio.Queue[Tuple[Any, asyncio.Future, float]]"
+    worker: Optional[asyncio.Task] = None
+    stats: BatchStats = field(default_factory=BatchStats)
+
+
+class BatchScheduler:
+    def __init__(self, max_batch_size: int = 8, window_ms: float = 10.0, max_queue_size: int = 256):
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.window_ms = max(0.0, float(window_ms))
+        self.max_queue_size = max(1, int(max_queue_size))
+        self._queues: Dict[str, _ModelQueue] = {}
+
+    @classmethod
+    def from_env(cls) -> "BatchScheduler":
+        return cls(
+            max_batch_size=int(os.environ.get("BATCH_MAX_SIZE", "8")),
+            window_ms=float(os.environ.get("BATCH_WINDOW_MS", "10")),
+            max_queue_size=int(os.environ.get("BATCH_MAX_QUEUE", "256")),
+        )
+
+    def _get_queue(self, key: str, model: Any) -> _ModelQueue:
+        entry = self._queues.get(key)
+        if entry is None:
+            entry = _ModelQueue(model=model, queue=asyncio.Queue(maxsize=self.max_queue_size))
+            self._queues[key] = entry
+        entry.model = model
+        if entry.worker is None or entry.worker.done():
+            entry.worker = asyncio.get_running_loop().create_task(self._run(key, entry))
+        return entry
+
+    async def infer(self, key: str, model: Any, image: Any) -> Any:
+        if model is None:
+            raise RuntimeError(f"Model '{key}' is not available")
+
+        entry = self._get_queue(key, model)
+        future = asyncio.get_running_loop().create_future()
+        try:
+            entry.queue.put_nowait((image, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            entry.stats.rejected += 1
+            raise BatchQueueFullError(f"Inference queue for '{key}' is full; try again later")
+
+        depth = entry.queue.qsize()
+        if depth > entry.stats.max_queue_depth_seen:
+            entry.stats.max_queue_depth_seen = depth
+        return await future
+
+    async def _collect(self, entry: _ModelQueue) -> List[Tuple[Any, asyncio.Future, float]]:
+        batch = [await entry.queue.get()]
+        deadline = time.perf_counter() + self.window_ms / 1000.0
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(entry.queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        while len(batch) < self.max_batch_size and not entry.queue.empty():
+            batch.append(entry.queue.get_nowait())
+        return batch
+
+    async def _run(self, key: str, entry: _ModelQueue) -> None:
+        while True:
+            batch = await self._collect(entry)
+            batch = [item for item in batch if not item[1].cancelled()]
+            if not batch:
+                continue
+
+            images = [item[0] for item in batch]
+            model = entry.model
+            started = time.perf_counter()
+            stats = entry.stats
+            stats.requests += len(batch)
+            stats.batches += 1
+            stats.max_batch_size_seen = max(stats.max_batch_size_seen, len(batch))
+            stats.total_wait_ms += sum((started - item[2]) * 1000.0 for item in batch)
+
+            try:
+                results = await asyncio.to_thread(model, images)
+                results = list(results)
+                if len(results) != len(batch):
+                    raise RuntimeError(f"Model '{key}' returned {len(results)} results for a batch of {len(batch)}")
+            except Exception as e:
+                stats.errors += 1
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                if entry.queue.empty():
+                    entry.model = None
+                continue
+            finally:
+                stats.total_infer_ms += (time.perf_counter() - started) * 1000.0
+
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+            if entry.queue.empty():
+                entry.model = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "window_ms": self.window_ms,
+            "max_queue_size": self.max_queue_size,
+            "models": {key: entry.stats.to_dict(entry.queue.qsize()) for key, entry in self._queues.items()},
+        }
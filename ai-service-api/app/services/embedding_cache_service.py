@@ -0,0 +1,209 @@
+from __future__ import annotations
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+from PIL import Image
+
+
+def hash_image_input(image: Any) -> Optional[str]:
+    h = hashlib.sha256()
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        h.update(image)
+    elif isinstance(image, (str, Path)):
+        with open(image, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+    elif isinstance(image, np.ndarray):
+        h.update(str((image.shape, image.dtype.str)).encode("utf-8"))
+        h.update(np.ascontiguousarray(image).tobytes())
+    elif isinstance(image, Image.Image):
+        h.update(str((image.size, image.mode)).encode("utf-8"))
+        h.update(image.tobytes())
+    else:
+        return None
+    return h.hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, max_items: int = 1024, db_path: Optional[str] = None, max_disk_mb: float = 512.0,
+                 touch_batch: int = 64):
+        self.max_items = max(0, int(max_items))
+        self.max_disk_bytes = int(max(0.0, float(max_disk_mb)) * 1024 * 1024)
+        self.touch_batch = max(1, int(touch_batch))
+        self.version: Optional[str] = None
+
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Access times of disk rows read since the last flush. They only
+        # order eviction, so they are written in batches (and before every
+        # eviction) instead of one committed UPDATE per hit.
+        self._touched: Dict[str, float] = {}
+        self._touch_hits = 0
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, version TEXT NOT NULL, value BLOB NOT NULL, "
+                "size INTEGER NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS ix_embeddings_accessed ON embeddings (accessed)")
+            self._db.commit()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_env(cls) -> "EmbeddingCache":
+        return cls(
+            max_items=int(os.environ.get("EMBED_CACHE_MAX_ITEMS", "1024")),
+            db_path=os.environ.get("EMBED_CACHE_DB") or None,
+            max_disk_mb=float(os.environ.get("EMBED_CACHE_MAX_MB", "512")),
+            touch_batch=int(os.environ.get("EMBED_CACHE_TOUCH_BATCH", "64")),
+        )
+
+    @staticmethod
+    def make_key(content_hash: str, version: str, segment_first: bool) -> str:
+        return f"{content_hash}:{version}:{int(bool(segment_first))}"
+
+    def set_version(self, version: str) -> None:
+        with self._lock:
+            if version == self.version:
+                return
+            if self.version is not None:
+                self.invalidations += 1
+            self.version = version
+            self._memory.clear()
+            self._touched.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM embeddings WHERE version != ?", (version,))
+                self._db.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                self._touch(key)
+                return dict(value)
+
+            if self._db is not None:
+                row = self._db.execute("SELECT value FROM embeddings WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._touch(key)
+                    value = json.loads(row[0])
+                    self._put_memory(key, value)
+                    self.disk_hits += 1
+                    return dict(value)
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._put_memory(key, value)
+            if self._db is not None:
+                blob = json.dumps(value).encode("utf-8")
+                self._db.execute(
+                    "INSERT OR REPLACE INTO embeddings (key, version, value, size, accessed) VALUES (?, ?, ?, ?, ?)",
+                    (key, self.version or "", blob, len(blob), time.time()),
+                )
+                self._touched.pop(key, None)
+                self._flush_touched()
+                self._evict_disk()
+                self._db.commit()
+
+    def _touch(self, key: str) -> None:
+        if self._db is None:
+            return
+        self._touched[key] = time.time()
+        self._touch_hits += 1
+        if self._touch_hits >= self.touch_batch:
+            self._flush_touched()
+            self._db.commit()
+
+    def _flush_touched(self) -> None:
+        if self._touched:
+            self._db.executemany("UPDATE embeddings SET accessed = ? WHERE key = ?",
+                                 [(accessed, key) for key, accessed in self._touched.items()])
+            self._touched.clear()
+        self._touch_hits = 0
+
+    def _put_memory(self, key: str, value: Dict[str, Any]) -> None:
+        if self.max_items == 0:
+            return
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _evict_disk(self) -> None:
+        if not self.max_disk_bytes:
+            return
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+        while total > self.max_disk_bytes:
+            row = self._db.execute("SELECT key, size FROM embeddings ORDER BY accessed ASC LIMIT 1").fetchone()
+            if row is None:
+                break
+            self._db.execute("DELETE FROM embeddings WHERE key = ?", (row[0],))
+            total -= row[1]
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM embeddings")
+                self._db.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            disk_entries, disk_bytes = 0, 0
+            if self._db is not None:
+                disk_entries, disk_bytes = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM embeddings").fetchone()
+            return {
+                "version": self.version,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "memory_entries": len(self._memory),
+                "max_items": self.max_items,
+                "disk_enabled": self._db is not None,
+                "disk_entries": disk_entries,
+                "disk_bytes": disk_bytes,
+                "max_disk_bytes": self.max_disk_bytes,
+            }
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EmbeddingCache.from_env()
+    return _cache
@@ -0,0 +1,133 @@
+from __future__ import annotations
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import torch
+
+SUPPORTED_HEADS = ("interp", "gap", "projection")
+
+
+class EmbeddingDimMismatch(ValueError):
+    pass
+
+
+class EmbeddingHead:
+    def __init__(
+        self,
+        mode: str = "interp",
+        dim: Optional[int] = 16000,
+        projection_path: Optional[str] = None,
+        seed: int = 42,
+    ):
+        mode = (mode or "interp").lower()
+        if mode not in SUPPORTED_HEADS:
+            raise ValueError(f"Unsupported embedding head '{mode}'; expected one of {SUPPORTED_HEADS}")
+        self.mode = mode
+        # For gap the output size is the backbone's channel count; a configured
+        # dim is only the value bind() checks it against.
+        self.configured_dim = int(dim) if dim else None
+        self.dim = self.configured_dim or 512
+        self.in_dim: Optional[int] = None
+        self.projection_path = projection_path
+        self.seed = seed
+
+        self._mean: Optional[np.ndarray] = None
+        self._components: Optional[np.ndarray] = None
+        self._random: Dict[int, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+        if mode == "projection" and projection_path:
+            data = np.load(projection_path)
+            self._components = np.asarray(data["components"], dtype=np.float32)
+            self._mean = np.asarray(data["mean"], dtype=np.float32) if "mean" in data else None
+            self.dim = int(self._components.shape[0])
+
+    @classmethod
+    def from_env(cls) -> "EmbeddingHead":
+        mode = os.environ.get("EMBEDDING_HEAD", "interp")
+        default_dim = {"interp": "16000", "projection": "512"}.get(mode, "")
+        return cls(
+            mode=mode,
+            dim=int(os.environ.get("EMBEDDING_DIM") or default_dim or 0) or None,
+            projection_path=os.environ.get("EMBEDDING_PROJECTION_PATH") or None,
+        )
+
+    def version(self) -> str:
+        source = Path(self.projection_path).name if self.projection_path else f"seed{self.seed}"
+        if self.mode == "interp":
+            return f"interp{self.dim}"
+        if self.mode == "gap":
+            return "gap"
+        return f"projection{self.dim}:{source}"
+
+    def bind(self, in_dim: int) -> int:
+        """Fix the output size against the pooled backbone feature size and
+        return it. Raises EmbeddingDimMismatch when the configured dim (which
+        the backend's vector column is sized from) cannot be produced."""
+        in_dim = int(in_dim)
+        if self.mode == "gap":
+            if self.configured_dim is not None and self.configured_dim != in_dim:
+                raise EmbeddingDimMismatch(
+                    f"EMBEDDING_HEAD=gap outputs {in_dim}-dim vectors (backbone channels) "
+                    f"but EMBEDDING_DIM={self.configured_dim}; set EMBEDDING_DIM={in_dim} "
+                    f"on both services and re-embed"
+                )
+            self.dim = in_dim
+        elif self.mode == "projection" and self._components is not None:
+            expected = self._components.shape[1]
+            if expected != in_dim:
+                raise EmbeddingDimMismatch(
+                    f"projection matrix expects {expected}-dim features but the backbone pools to {in_dim}"
+                )
+            if self.configured_dim is not None and self.configured_dim != self.dim:
+                raise EmbeddingDimMismatch(
+                    f"projection matrix outputs {self.dim}-dim vectors but EMBEDDING_DIM={self.configured_dim}"
+                )
+        self.in_dim = in_dim
+        return self.dim
+
+    def pool(self, features: torch.Tensor) -> torch.Tensor:
+        if self.mode in ("gap", "projection") and features.dim() == 4:
+            return features.mean(dim=(2, 3))
+        return features.reshape(features.size(0), -1)
+
+    def _random_matrix(self, in_dim: int) -> np.ndarray:
+        with self._lock:
+            matrix = self._random.get(in_dim)
+            if matrix is None:
+                rng = np.random.default_rng(self.seed)
+                matrix = (rng.standard_normal((self.dim, in_dim)) / np.sqrt(self.dim)).astype(np.float32)
+                self._random[in_dim] = matrix
+            return matrix
+
+    def project(self, vector: np.ndarray) -> np.ndarray:
+        v = np.asarray(vector, dtype=np.float32).reshape(-1)
+        if self.mode == "gap":
+            return v
+        if self.mode == "projection":
+            if self._components is not None:
+                if self._mean is not None:
+                    v = v - self._mean
+                out = self._components @ v
+            else:
+                out = self._random_matrix(v.shape[0]) @ v
+            norm = float(np.linalg.norm(out))
+            return (out / norm).astype(np.float32) if norm > 0 else out.astype(np.float32)
+
+        if v.shape[0] == self.dim:
+            return v
+        if v.shape[0] == 1:
+            return np.full((self.dim,), v[0], dtype=np.float32)
+        old_idx = np.linspace(0.0, 1.0, v.shape[0])
+        new_idx = np.linspace(0.0, 1.0, self.dim)
+        return np.interp(new_idx, old_idx, v).astype(np.float32)
+
+
+def fit_pca(features: np.ndarray, dim: int) -> Dict[str, np.ndarray]:
+    x = np.asarray(features, dtype=np.float32)
+    mean = x.mean(axis=0)
+    _, _, vt = np.linalg.svd(x - mean, full_matrices=False)
+    return {"mean": mean, "components": vt[:dim].astype(np.float32)}
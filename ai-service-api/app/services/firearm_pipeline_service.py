@@ -0,0 +1,45 @@
+import asyncio
+import numpy as np
+from typing import Any, Dict, Optional
+
+from .model_segment_service import ModelSegmentService
+from .model_brand_service import ModelBrandService
+from .model_firearm_model_service import ModelFirearmModelService
+
+NON_FIREARM_CLASSES = ("Drug", "PackageDrug")
+
+
+class FirearmPipelineService:
+    def __init__(
+        self,
+        segment_service: Optional[ModelSegmentService] = None,
+        brand_service: Optional[ModelBrandService] = None,
+        model_service: Optional[ModelFirearmModelService] = None,
+    ):
+        self.segment_service = segment_service or ModelSegmentService()
+        self.brand_service = brand_service or ModelBrandService()
+        self.model_service = model_service or ModelFirearmModelService()
+
+    async def _classify_crop(self, obj: Dict[str, Any], crop: np.ndarray) -> None:
+        brand = await self.brand_service.analyze_gun_brand_batched(crop)
+        obj.update(brand)
+
+        if brand.get("selected_brand", "Unknown") == "Unknown":
+            obj.update({"selected_model": "Unknown", "model_top3": []})
+            return
+        obj.update(await self.model_service.classify_firearm_model_batched(crop, brand["selected_brand"]))
+
+    async def analyze(self, image: np.ndarray, include_crops: bool = True, wait_timeout: float = 10.0) -> Dict[str, Any]:
+        out, crops = await self.segment_service.segment_with_crops_batched(
+            image, wait_for_model=True, wait_timeout=wait_timeout, include_crops=include_crops
+        )
+
+        tasks = []
+        for obj, crop in zip(out["objects"], crops):
+            if crop is None or obj.get("detection_type") in NON_FIREARM_CLASSES:
+                continue
+            tasks.append(self._classify_crop(obj, crop))
+
+        if tasks:
+            await asyncio.gather(*tasks)
+        return out
@@ -2,6 +2,7 @@ from typing import List, Dict, Optional, Any
 import numpy as np
 import traceback
 from .model_manager_service import ModelManager
+from .batch_scheduler_service import BatchQueueFullError
 
 def get_model_manager() -> ModelManager:
     return ModelManager()
@@ -94,6 +95,11 @@ def _get_top3_from_prediction(pred: Any, names: Dict[int, str]) -> List[Dict[str
 
 
 class ModelBrandService:
+    def _brand_from_prediction(self, pred: Any, model_brand: Any) -> Dict[str, Any]:
+        brand_top3 = _get_top3_from_prediction(pred, getattr(model_brand, "names", {}))
+        selected_brand = brand_top3[0]["label"] if brand_top3 else "Unknown"
+        return {"selected_brand": selected_brand, "brand_top3": brand_top3}
+
     def analyze_gun_brand(self, cropped_image: Any) -> Dict[str, Any]:
         model_manager = get_model_manager()
         model_brand = model_manager.get_firearm_brand_model()
@@ -103,9 +109,22 @@ class ModelBrandService:
         try:
             pred_all = model_brand(cropped_image)
             pred = pred_all[0]
-            brand_top3 = _get_top3_from_prediction(pred, getattr(model_brand, "names", {}))
-            selected_brand = brand_top3[0]["label"] if brand_top3 else "Unknown"
-            return {"selected_brand": selected_brand, "brand_top3": brand_top3}
+            return self._brand_from_prediction(pred, model_brand)
+        except Exception:
+            traceback.print_exc()
+            return {"selected_brand": "Unknown", "brand_top3": []}
+
+    async def analyze_gun_brand_batched(self, cropped_image: Any) -> Dict[str, Any]:
+        model_manager = get_model_manager()
+        model_brand = model_manager.get_firearm_brand_model()
+        if model_brand is None:
+            return {"selected_brand": "Unknown", "brand_top3": []}
+
+        try:
+            pred = await model_manager.infer_batched("brand", model_brand, cropped_image)
+            return self._brand_from_prediction(pred, model_brand)
+        except BatchQueueFullError:
+            raise
         except Exception:
             traceback.print_exc()
-            return {"selected_brand": "Unknown", "brand_top3": []}
\ No newline at end of file
+            return {"selected_brand": "Unknown", "brand_top3": []}
@@ -0,0 +1,108 @@
+from __future__ import annotations
+import os
+import shutil
+import hashlib
+import threading
+import traceback
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+SUPPORTED_BACKENDS = ("pytorch", "onnx", "openvino")
+
+
+class ModelExporter:
+    def __init__(self, backend: str = "pytorch", int8: bool = False, export_missing: bool = False, imgsz: Optional[int] = None,
+                 batch: int = 8):
+        backend = (backend or "pytorch").lower()
+        if backend not in SUPPORTED_BACKENDS:
+            raise ValueError(f"Unsupported model backend '{backend}'; expected one of {SUPPORTED_BACKENDS}")
+        self.backend = backend
+        self.int8 = int8
+        self.export_missing = export_missing
+        self.imgsz = imgsz
+        # Exports use a dynamic batch axis so BatchScheduler can send up to
+        # ``batch`` images per call; it is also the export's sample batch.
+        self.batch = max(1, batch)
+        self._hash_cache: Dict[Tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ModelExporter":
+        imgsz = os.environ.get("MODEL_EXPORT_IMGSZ")
+        return cls(
+            backend=os.environ.get("MODEL_BACKEND", "pytorch"),
+            int8=os.environ.get("MODEL_EXPORT_INT8", "false").lower() in ("1", "true", "yes"),
+            export_missing=os.environ.get("MODEL_EXPORT_ON_START", "false").lower() in ("1", "true", "yes"),
+            imgsz=int(imgsz) if imgsz else None,
+            batch=int(os.environ.get("BATCH_MAX_SIZE", "8")),
+        )
+
+    def content_hash(self, path: Path) -> str:
+        st = path.stat()
+        key = (str(path), st.st_size, int(st.st_mtime))
+        with self._lock:
+            cached = self._hash_cache.get(key)
+        if cached:
+            return cached
+
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        digest = h.hexdigest()[:12]
+        with self._lock:
+            self._hash_cache[key] = digest
+        return digest
+
+    def artifact_path(self, pt_path: Path, backend: Optional[str] = None) -> Path:
+        backend = backend or self.backend
+        digest = self.content_hash(pt_path)
+        suffix = "-int8" if self.int8 and backend == "openvino" else ""
+        if backend == "onnx":
+            return pt_path.with_name(f"{pt_path.stem}.{digest}.b{self.batch}.onnx")
+        if backend == "openvino":
+            return pt_path.with_name(f"{pt_path.stem}.{digest}.b{self.batch}{suffix}_openvino_model")
+        return pt_path
+
+    def export(self, pt_path: Path, backend: Optional[str] = None, task: Optional[str] = None) -> Optional[Path]:
+        backend = backend or self.backend
+        if backend == "pytorch":
+            return pt_path
+
+        target = self.artifact_path(pt_path, backend)
+        if target.exists():
+            return target
+
+        from ultralytics import YOLO
+
+        try:
+            model = YOLO(str(pt_path), task=task) if task else YOLO(str(pt_path))
+            kwargs = {"format": backend, "dynamic": True, "batch": self.batch}
+            if self.imgsz:
+                kwargs["imgsz"] = self.imgsz
+            if backend == "openvino" and self.int8:
+                kwargs["int8"] = True
+            exported = Path(model.export(**kwargs))
+            if exported != target:
+                if target.exists():
+                    shutil.rmtree(target) if target.is_dir() else target.unlink()
+                exported.rename(target)
+            return target
+        except Exception:
+            traceback.print_exc()
+            return None
+
+    def resolve(self, pt_path: Path, task: Optional[str] = None) -> Path:
+        if self.backend == "pytorch" or not pt_path.exists():
+            return pt_path
+        try:
+            target = self.artifact_path(pt_path)
+        except OSError:
+            return pt_path
+        if target.exists():
+            return target
+        if self.export_missing:
+            exported = self.export(pt_path, task=task)
+            if exported is not None and exported.exists():
+                return exported
+        return pt_path
@@ -1,8 +1,10 @@
 from typing import Any, Dict, Optional
+import asyncio
 import traceback
 import numpy as np
 
 from .model_manager_service import ModelManager
+from .batch_scheduler_service import BatchQueueFullError
 from .model_brand_service import _get_top3_from_prediction
 
 
@@ -13,6 +15,11 @@ class ModelFirearmModelService:
     def get_model(self, brand: Optional[str] = None) -> Optional[Any]:
         return self.model_manager.get_firearm_model_model(brand)
 
+    def _model_from_prediction(self, pred: Any, model: Any) -> Dict[str, Any]:
+        model_top3 = _get_top3_from_prediction(pred, getattr(model, "names", {}))
+        selected_model = model_top3[0]["label"] if model_top3 else "Unknown"
+        return {"selected_model": selected_model, "model_top3": model_top3}
+
     def classify_firearm_model(self, cropped_image: Any, brand_name: str) -> Dict[str, Any]:
         model = self.get_model(brand_name)
         if model is None:
@@ -21,9 +28,22 @@ class ModelFirearmModelService:
         try:
             pred_all = model(cropped_image)
             pred = pred_all[0]
-            model_top3 = _get_top3_from_prediction(pred, getattr(model, "names", {}))
-            selected_model = model_top3[0]["label"] if model_top3 else "Unknown"
-            return {"selected_model": selected_model, "model_top3": model_top3}
+            return self._model_from_prediction(pred, model)
+        except Exception:
+            traceback.print_exc()
+            return {"selected_model": "Unknown", "model_top3": []}
+
+    async def classify_firearm_model_batched(self, cropped_image: Any, brand_name: str) -> Dict[str, Any]:
+        model = await asyncio.to_thread(self.get_model, brand_name)
+        if model is None:
+            return {"selected_model": "Unknown", "model_top3": []}
+
+        try:
+            key = "firearm_model:" + "".join(ch.lower() for ch in (brand_name or "") if ch.isalnum())
+            pred = await self.model_manager.infer_batched(key, model, cropped_image)
+            return self._model_from_prediction(pred, model)
+        except BatchQueueFullError:
+            raise
         except Exception:
             traceback.print_exc()
-            return {"selected_model": "Unknown", "model_top3": []}
\ No newline at end of file
+            return {"selected_model": "Unknown", "model_top3": []}
@@ -1,15 +1,21 @@
 from __future__ import annotations
 import os
+import time
 import threading
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 import traceback
 import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 
 import numpy as np
 from ultralytics import YOLO
 
+from .batch_scheduler_service import BatchScheduler
+from .model_export_service import ModelExporter
+
 @dataclass(frozen=True)
 class ModelRecord:
     brand_key: str
@@ -17,8 +23,14 @@ class ModelRecord:
     path: Path
 
 class FilesystemRepository:
-    def __init__(self, base_path: Path):
+    def __init__(self, base_path: Path, exporter: Optional[ModelExporter] = None):
         self.base_path = base_path
+        self.exporter = exporter
+
+    def _prefer_optimized(self, path: Path, task: Optional[str] = None) -> Path:
+        if self.exporter is None:
+            return path
+        return self.exporter.resolve(path, task=task)
 
     def _normalize_brand(self, raw: str) -> str:
         return "".join(ch.lower() for ch in (raw or "") if ch.isalnum())
@@ -47,12 +59,12 @@ class FilesystemRepository:
                 if candidate:
                     brand_display = sub.name.replace("_Model", "")
                     brand_key = self._normalize_brand(brand_display)
-                    brand_models.append(ModelRecord(brand_key=brand_key, brand_display=brand_display, path=candidate))
+                    brand_models.append(ModelRecord(brand_key=brand_key, brand_display=brand_display, path=self._prefer_optimized(candidate, task="classify")))
 
         return {
-            "segment": segment,
+            "segment": self._prefer_optimized(segment, task="segment"),
             "narcotic": narcotic,
-            "brand": brand,
+            "brand": self._prefer_optimized(brand, task="classify"),
             "brand_models": brand_models,
         }
 
@@ -68,6 +80,139 @@ class YOLOAdapter:
         return model(image)
 
 
+class BrandModelRegistry:
+    def __init__(self, adapter: YOLOAdapter, max_models: int = 0, max_mb: float = 0.0, pinned: Optional[List[str]] = None, task: Optional[str] = "classify"):
+        self.adapter = adapter
+        self.max_models = max(0, int(max_models))
+        self.max_mb = max(0.0, float(max_mb))
+        self.pinned = {self._normalize_brand(b) for b in (pinned or []) if self._normalize_brand(b)}
+        self.task = task
+
+        self._records: Dict[str, ModelRecord] = {}
+        self._models: "OrderedDict[str, YOLO]" = OrderedDict()
+        self._sizes_mb: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self.load_seconds: Dict[str, float] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.load_failures = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls, adapter: YOLOAdapter) -> "BrandModelRegistry":
+        pinned = [b for b in os.environ.get("BRAND_MODEL_PINNED", "").split(",") if b.strip()]
+        return cls(
+            adapter,
+            max_models=int(os.environ.get("BRAND_MODEL_MAX_RESIDENT", "0")),
+            max_mb=float(os.environ.get("BRAND_MODEL_MAX_MB", "0")),
+            pinned=pinned,
+        )
+
+    def _normalize_brand(self, brand: str) -> str:
+        return "".join(ch.lower() for ch in (brand or "") if ch.isalnum())
+
+    def register(self, records: List[ModelRecord]) -> None:
+        with self._lock:
+            for rec in records:
+                if rec.path.exists():
+                    self._records[rec.brand_key] = rec
+
+    def known_brands(self) -> List[str]:
+        return list(self._records.keys())
+
+    def resident(self) -> Dict[str, YOLO]:
+        with self._lock:
+            return dict(self._models)
+
+    def preload_pinned(self) -> None:
+        for key in list(self.pinned):
+            self.get(key)
+
+    def get(self, brand_key: str) -> Optional[YOLO]:
+        with self._lock:
+            model = self._models.get(brand_key)
+            if model is not None:
+                self._models.move_to_end(brand_key)
+                self.hits += 1
+                return model
+            rec = self._records.get(brand_key)
+            if rec is None:
+                return None
+            key_lock = self._key_locks.setdefault(brand_key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                model = self._models.get(brand_key)
+                if model is not None:
+                    self._models.move_to_end(brand_key)
+                    self.hits += 1
+                    return model
+                self.misses += 1
+
+            t0 = time.perf_counter()
+            try:
+                model = self.adapter.load(rec.path, task=self.task)
+            except Exception:
+                with self._lock:
+                    self.load_failures += 1
+                return None
+
+            with self._lock:
+                self.load_seconds[brand_key] = round(time.perf_counter() - t0, 3)
+                self.loads += 1
+                self._models[brand_key] = model
+                self._sizes_mb[brand_key] = self._artifact_mb(rec.path)
+                self._evict(keep=brand_key)
+            return model
+
+    def _artifact_mb(self, path: Path) -> float:
+        try:
+            if path.is_dir():
+                return sum(p.stat().st_size for p in path.rglob("*") if p.is_file()) / (1024 * 1024)
+            return path.stat().st_size / (1024 * 1024)
+        except OSError:
+            return 0.0
+
+    def _resident_mb(self) -> float:
+        return sum(self._sizes_mb.get(k, 0.0) for k in self._models)
+
+    def _over_budget(self) -> bool:
+        if self.max_models and len(self._models) > self.max_models:
+            return True
+        if self.max_mb and self._resident_mb() > self.max_mb:
+            return True
+        return False
+
+    def _evict(self, keep: str) -> None:
+        while self._over_budget():
+            victim = next((k for k in self._models if k != keep and k not in self.pinned), None)
+            if victim is None:
+                return
+            del self._models[victim]
+            self._sizes_mb.pop(victim, None)
+            self.evictions += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "loads": self.loads,
+                "load_failures": self.load_failures,
+                "evictions": self.evictions,
+                "known": len(self._records),
+                "resident": list(self._models.keys()),
+                "resident_mb": round(self._resident_mb(), 2),
+                "max_models": self.max_models,
+                "max_mb": self.max_mb,
+                "pinned": sorted(self.pinned),
+                "load_seconds": dict(self.load_seconds),
+            }
+
+
 class ModelLoaderUseCase:
     def __init__(self, repo: FilesystemRepository, adapter: YOLOAdapter):
         self.repo = repo
@@ -83,10 +228,15 @@ class ModelLoaderUseCase:
         self.model_segment: Optional[YOLO] = None
         self.model_narcotic: Optional[YOLO] = None
         self.model_firearm_brand: Optional[YOLO] = None
-        self.model_map: Dict[str, YOLO] = {}
+        self.brand_registry = BrandModelRegistry.from_env(adapter)
 
         self.segment_classes: Dict[int, str] = {0: "gun", 1: "pistol", 2: "rifle", 3: "weapon"}
 
+        self.model_fingerprints: Dict[str, str] = {}
+        self.load_workers = max(1, int(os.environ.get("MODEL_LOAD_WORKERS", "4")))
+        self.load_timings: Dict[str, float] = {}
+
+        self._core_ready_event = threading.Event()
         self._loading_event = threading.Event()
         self._load_thread = threading.Thread(target=self._background_load)
         self._load_thread.daemon = True
@@ -98,20 +248,37 @@ class ModelLoaderUseCase:
     def wait_for_models(self, timeout: Optional[float] = None) -> bool:
         return self._loading_event.wait(timeout)
 
+    def wait_for_core_models(self, timeout: Optional[float] = None) -> bool:
+        return self._core_ready_event.wait(timeout)
+
     def is_ready(self) -> bool:
         return bool(self.models_loaded.get("segment")) and bool(self.models_loaded.get("narcotic"))
 
     def _normalize_brand(self, brand: str) -> str:
         return "".join(ch.lower() for ch in (brand or "") if ch.isalnum())
 
-    def _load_single(self, path: Path, model_attr_name: str, model_key: str, update_names: bool = False):
+    def _fingerprint(self, path: Path) -> str:
+        try:
+            st = path.stat()
+            return f"{path.name}:{st.st_size}:{int(st.st_mtime)}"
+        except OSError:
+            return path.name
+
+    def get_model_version(self, keys: Optional[List[str]] = None) -> str:
+        keys = list(keys) if keys else sorted(self.model_fingerprints)
+        return "|".join(f"{k}={self.model_fingerprints.get(k, '-')}" for k in keys)
+
+    def _load_single(self, path: Path, model_attr_name: str, model_key: str, update_names: bool = False,
+                     task: Optional[str] = None):
         if not path.exists():
             self.models_loaded[model_key] = False
             return
         try:
-            model = self.adapter.load(path)
+            # Exported .onnx / _openvino_model artifacts do not record the task.
+            model = self.adapter.load(path, task=task)
             setattr(self, model_attr_name, model)
             self.models_loaded[model_key] = True
+            self.model_fingerprints[model_key] = self._fingerprint(path)
             if update_names and hasattr(model, "names") and getattr(model, "names"):
                 try:
                     self.segment_classes = dict(getattr(model, "names"))
@@ -120,31 +287,60 @@ class ModelLoaderUseCase:
         except Exception as e:
             self.models_loaded[model_key] = False
 
-    def _load_brand_specific_models(self, records: List[ModelRecord], default_task: Optional[str] = "classify"):
-        for rec in records:
-            try:
-                if not rec.path.exists():
-                    continue
-                model = self.adapter.load(rec.path, task=default_task)
-                self.model_map[rec.brand_key] = model
-            except Exception:
-                pass
-        self.models_loaded["brand_specific"] = bool(self.model_map)
+    @property
+    def model_map(self) -> Dict[str, YOLO]:
+        return self.brand_registry.resident()
+
+    def _load_brand_specific_models(self, records: List[ModelRecord], default_task: Optional[str] = "classify", preload: bool = True):
+        self.brand_registry.task = default_task
+        self.brand_registry.register(records)
+        if preload:
+            self.brand_registry.preload_pinned()
+        self.models_loaded["brand_specific"] = bool(self.brand_registry.known_brands())
+
+    def _timed(self, name: str, fn, *args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.load_timings[name] = round(time.perf_counter() - t0, 3)
 
     def _background_load(self):
+        started = time.perf_counter()
         try:
             paths = self.repo.discover_paths()
-            self._load_single(paths["segment"], "model_segment", "segment", update_names=True)
-            self._load_single(paths["narcotic"], "model_narcotic", "narcotic", update_names=False)
-            self._load_single(paths["brand"], "model_firearm_brand", "brand", update_names=False)
-
             brand_models: List[ModelRecord] = paths.get("brand_models", []) or []
             if brand_models:
-                self._load_brand_specific_models(brand_models, default_task="classify")
+                self._load_brand_specific_models(brand_models, default_task="classify", preload=False)
+
+            with ThreadPoolExecutor(max_workers=self.load_workers, thread_name_prefix="model-loader") as pool:
+                core = [
+                    pool.submit(self._timed, "segment", self._load_single, paths["segment"], "model_segment", "segment", update_names=True, task="segment"),
+                    pool.submit(self._timed, "narcotic", self._load_single, paths["narcotic"], "model_narcotic", "narcotic", update_names=False),
+                ]
+                rest = [pool.submit(self._timed, "brand", self._load_single, paths["brand"], "model_firearm_brand", "brand", update_names=False, task="classify")]
+                for key in sorted(self.brand_registry.pinned):
+                    rest.append(pool.submit(self._timed, f"brand_specific:{key}", self.brand_registry.get, key))
+
+                for fut in core:
+                    try:
+                        fut.result()
+                    except Exception:
+                        pass
+                self.load_timings["core_ready"] = round(time.perf_counter() - started, 3)
+                self._core_ready_event.set()
+
+                for fut in rest:
+                    try:
+                        fut.result()
+                    except Exception:
+                        pass
 
         except Exception:
             pass
         finally:
+            self.load_timings["total"] = round(time.perf_counter() - started, 3)
+            self._core_ready_event.set()
             self._loading_event.set()
 
     async def warmup_models(self, timeout_per_model: float = 120.0, retry_interval: float = 5.0, max_retries: int = 5):
@@ -209,12 +405,16 @@ class ModelLoaderUseCase:
         return {
             "models_loaded": self.models_loaded.copy(),
             "loading_complete": self._loading_event.is_set(),
+            "core_loading_complete": self._core_ready_event.is_set(),
             "is_ready": self.is_ready(),
+            "load_timings": dict(self.load_timings),
             "available_models": {
                 "segmentation": self.model_segment is not None,
                 "narcotic": self.model_narcotic is not None,
                 "brand_specific_count": len(self.model_map),
+                "brand_specific_known": len(self.brand_registry.known_brands()),
             },
+            "brand_registry": self.brand_registry.get_stats(),
         }
 
 class ModelManager:
@@ -234,24 +434,31 @@ class ModelManager:
             return
 
         model_root = Path(os.environ.get("MODEL_PATH", "/app/ai_models"))
-        repo = FilesystemRepository(model_root)
+        repo = FilesystemRepository(model_root, exporter=ModelExporter.from_env())
         adapter = YOLOAdapter()
         self._usecase = ModelLoaderUseCase(repo=repo, adapter=adapter)
+        self._batch_scheduler = BatchScheduler.from_env()
 
         self.models_loaded = self._usecase.models_loaded
         self.model_segment = self._usecase.model_segment
         self.model_narcotic = self._usecase.model_narcotic
         self.model_firearm_brand = self._usecase.model_firearm_brand
-        self.model_map = self._usecase.model_map
         self.segment_classes = self._usecase.segment_classes
 
         self._usecase.start_background_load()
 
         self._initialized = True
 
+    @property
+    def model_map(self) -> Dict[str, YOLO]:
+        return self._usecase.model_map
+
     def wait_for_models(self, timeout: Optional[float] = None) -> bool:
         return self._usecase.wait_for_models(timeout)
 
+    def wait_for_core_models(self, timeout: Optional[float] = None) -> bool:
+        return self._usecase.wait_for_core_models(timeout)
+
     def is_ready(self) -> bool:
         return self._usecase.is_ready()
 
@@ -270,7 +477,19 @@ class ModelManager:
         target = "".join(ch.lower() for ch in (brand or "") if ch.isalnum())
         if not target:
             return None
-        return self._usecase.model_map.get(target)
+        return self._usecase.brand_registry.get(target)
+
+    def get_model_version(self, keys=None) -> str:
+        return self._usecase.get_model_version(keys)
+
+    def get_batch_scheduler(self) -> BatchScheduler:
+        return self._batch_scheduler
+
+    async def infer_batched(self, key: str, model: Any, image: Any) -> Any:
+        return await self._batch_scheduler.infer(key, model, image)
+
+    def get_batching_stats(self):
+        return self._batch_scheduler.get_stats()
 
     def get_segment_classes(self):
         return self._usecase.segment_classes or {0: "gun", 1: "pistol", 2: "rifle", 3: "weapon"}
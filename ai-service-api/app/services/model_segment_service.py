@@ -1,18 +1,37 @@
+import os
 import cv2
 import base64
+import asyncio
 import numpy as np
-from typing import Any, Optional, Dict, List
+from typing import Any, Optional, Dict, List, Tuple, Union
 from app.services.model_manager_service import ModelManager
 from app.utils.image_util import crop_mask_on_white
 
 class ModelSegmentService:
-    def __init__(self, model: Optional[Any] = None):
+    def __init__(self, model: Optional[Any] = None, crop_to_bbox: Optional[bool] = None):
         self.model = model
+        # Off by default: the brand/model classifiers were trained on
+        # full-frame masked crops, and bbox crops change what they see.
+        if crop_to_bbox is None:
+            crop_to_bbox = os.environ.get("SEGMENT_CROP_TO_BBOX", "false").lower() in ("1", "true", "yes")
+        self.crop_to_bbox = crop_to_bbox
 
     def set_model(self, model: Any) -> None:
         self.model = model
 
-    def _results_to_dict(self, results: Any, image: Optional[np.ndarray] = None, include_crops: bool = False) -> Dict[str, Any]:
+    def crop_objects(self, results: Any, image: np.ndarray) -> List[Optional[np.ndarray]]:
+        crops: List[Optional[np.ndarray]] = []
+        boxes = getattr(results, "boxes", None)
+        count = len(boxes) if boxes is not None else 0
+        for i in range(count):
+            try:
+                mask = results.masks.data[i].cpu().numpy()
+                crops.append(crop_mask_on_white(image, mask, crop_to_bbox=self.crop_to_bbox))
+            except Exception:
+                crops.append(None)
+        return crops
+
+    def _results_to_dict(self, results: Any, image: Optional[np.ndarray] = None, include_crops: bool = False, crops: Optional[List[Optional[np.ndarray]]] = None) -> Dict[str, Any]:
         out: Dict[str, Any] = {"objects": []}
         boxes = getattr(results, "boxes", None)
         names = getattr(results, "names", None)
@@ -44,8 +63,13 @@ class ModelSegmentService:
                 
                 if include_crops and image is not None:
                     try:
-                        mask = results.masks.data[i].cpu().numpy()
-                        cropped = crop_mask_on_white(image, mask)
+                        if crops is not None:
+                            cropped = crops[i] if i < len(crops) else None
+                        else:
+                            mask = results.masks.data[i].cpu().numpy()
+                            cropped = crop_mask_on_white(image, mask, crop_to_bbox=self.crop_to_bbox)
+                        if cropped is None:
+                            raise ValueError("No crop for object")
                         ok, buf = cv2.imencode('.jpg', cropped)
                         if ok:
                             b64 = base64.b64encode(buf.tobytes()).decode('utf-8')
@@ -58,7 +82,7 @@ class ModelSegmentService:
 
         return out
 
-    def run_segment_model(self, image_path: str, wait_for_model: bool = False, wait_timeout: float = 30.0, include_crops: bool = False) -> Dict[str, Any]:
+    def _ensure_model(self, wait_for_model: bool = False, wait_timeout: float = 30.0) -> Any:
         if self.model is None:
             mgr = ModelManager()
             seg = mgr.get_segmentation_model()
@@ -68,10 +92,39 @@ class ModelSegmentService:
             if seg is None:
                 raise RuntimeError("Segmentation model not available; attach_from_manager() or try again later")
             self.model = seg
+        return self.model
+
+    def _load_image(self, image: Union[str, np.ndarray]) -> np.ndarray:
+        if isinstance(image, np.ndarray):
+            return image
+        loaded = cv2.imread(image)
+        if loaded is None:
+            raise ValueError(f"Cannot load image from {image}")
+        return loaded
 
-        image = cv2.imread(image_path)
-        if image is None:
-            raise ValueError(f"Cannot load image from {image_path}")
+    def run_segment_model(self, image_source: Union[str, np.ndarray], wait_for_model: bool = False, wait_timeout: float = 30.0, include_crops: bool = False) -> Dict[str, Any]:
+        self._ensure_model(wait_for_model, wait_timeout)
+        image = self._load_image(image_source)
 
         results = self.model(image)[0]
-        return self._results_to_dict(results, image=image if include_crops else None, include_crops=include_crops)
\ No newline at end of file
+        return self._results_to_dict(results, image=image if include_crops else None, include_crops=include_crops)
+
+    async def _predict_batched(self, image_source: Union[str, np.ndarray], wait_for_model: bool, wait_timeout: float):
+        model = await asyncio.to_thread(self._ensure_model, wait_for_model, wait_timeout)
+        image = self._load_image(image_source) if isinstance(image_source, np.ndarray) else await asyncio.to_thread(self._load_image, image_source)
+
+        results = await ModelManager().infer_batched("segment", model, image)
+        return results, image
+
+    async def run_segment_model_batched(self, image_source: Union[str, np.ndarray], wait_for_model: bool = False, wait_timeout: float = 30.0, include_crops: bool = False) -> Dict[str, Any]:
+        results, image = await self._predict_batched(image_source, wait_for_model, wait_timeout)
+        return await asyncio.to_thread(self._results_to_dict, results, image if include_crops else None, include_crops)
+
+    async def segment_with_crops_batched(self, image_source: Union[str, np.ndarray], wait_for_model: bool = False, wait_timeout: float = 30.0, include_crops: bool = False) -> Tuple[Dict[str, Any], List[Optional[np.ndarray]]]:
+        results, image = await self._predict_batched(image_source, wait_for_model, wait_timeout)
+
+        def _postprocess():
+            crops = self.crop_objects(results, image)
+            return self._results_to_dict(results, image if include_crops else None, include_crops, crops), crops
+
+        return await asyncio.to_thread(_postprocess)
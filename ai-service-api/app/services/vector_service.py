@@ -3,7 +3,7 @@ import io
 import os
 import uuid
 from pathlib import Path
-from typing import Dict, Tuple, Union, Optional
+from typing import Any, Dict, List, Tuple, Union, Optional
 
 import cv2
 import numpy as np
@@ -17,6 +17,8 @@ from torchvision import transforms as T
 
 from app.utils.image_util import crop_mask_on_white
 from app.services.model_manager_service import ModelManager
+from app.services.embedding_cache_service import EmbeddingCache, get_embedding_cache, hash_image_input
+from app.services.embedding_head_service import EmbeddingHead
 
 
 class VectorService:
@@ -26,8 +28,15 @@ class VectorService:
         debug_dir: Optional[str] = ".",
         segment_classes: Optional[Dict[int, str]] = None,
         model_manager: Optional[ModelManager] = None,
+        cache: Optional[EmbeddingCache] = None,
+        head: Optional[EmbeddingHead] = None,
     ) -> None:
         self.mgr = model_manager or ModelManager()
+        self._head: EmbeddingHead = head or EmbeddingHead.from_env()
+        self._crop_to_bbox = os.environ.get("EMBED_CROP_TO_BBOX", "false").lower() in ("1", "true", "yes")
+        if cache is None and os.environ.get("EMBED_CACHE_ENABLED", "true").lower() in ("1", "true", "yes"):
+            cache = get_embedding_cache()
+        self._cache: Optional[EmbeddingCache] = cache
         self._segment_model: Optional[YOLO] = self.mgr.get_segmentation_model()
         self._narcotic_model: Optional[YOLO] = self.mgr.get_narcotic_model()
         self._segment_classes: Dict[int, str] = segment_classes or {}
@@ -77,12 +86,7 @@ class VectorService:
         if self._narcotic_model is None:
             raise ValueError("Narcotic model is not available (ModelManager did not load it).")
 
-    def process_image_for_vector(
-        self,
-        image: Union[str, Path, Image.Image, np.ndarray, bytes],
-        save_debug_image: bool = True,
-    ) -> Tuple[np.ndarray, Dict]:
-        self._ensure_segment_model()
+    def _refresh_segment_classes(self) -> None:
         try:
             classes = self.mgr.get_segment_classes()
             if classes:
@@ -90,6 +94,7 @@ class VectorService:
         except Exception:
             pass
 
+    def _to_cv_image(self, image: Union[str, Path, Image.Image, np.ndarray, bytes]) -> np.ndarray:
         if isinstance(image, (str, Path)):
             cv_image = cv2.imread(str(image))
             if cv_image is None:
@@ -103,9 +108,9 @@ class VectorService:
             cv_image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
         else:
             raise TypeError("Image must be a file path, PIL Image, numpy array, or bytes")
+        return cv_image
 
-        results = self._segment_model(cv_image)[0]
-
+    def _select_drug_crop(self, results: Any, cv_image: np.ndarray, save_debug_image: bool = False) -> Tuple[np.ndarray, Dict]:
         result_info = {
             "found_drug": False,
             "confidence": 0.0,
@@ -138,7 +143,7 @@ class VectorService:
         idx, cls_name, confidence = drug_indices[0]
 
         mask = results.masks.data[idx].cpu().numpy()
-        cropped = crop_mask_on_white(cv_image, mask)
+        cropped = crop_mask_on_white(cv_image, mask, crop_to_bbox=self._crop_to_bbox)
 
         if save_debug_image:
             os.makedirs(self._debug_dir, exist_ok=True)
@@ -149,6 +154,18 @@ class VectorService:
         result_info.update({"found_drug": True, "confidence": round(confidence, 2), "class_name": cls_name})
         return cropped, result_info
 
+    def process_image_for_vector(
+        self,
+        image: Union[str, Path, Image.Image, np.ndarray, bytes],
+        save_debug_image: bool = True,
+    ) -> Tuple[np.ndarray, Dict]:
+        self._ensure_segment_model()
+        self._refresh_segment_classes()
+
+        cv_image = self._to_cv_image(image)
+        results = self._segment_model(cv_image)[0]
+        return self._select_drug_crop(results, cv_image, save_debug_image=save_debug_image)
+
     def image_to_vector(
         self,
         image: Union[str, Path, Image.Image, np.ndarray, bytes],
@@ -168,28 +185,32 @@ class VectorService:
             except Exception:
                 processed_image = image
 
-        if isinstance(processed_image, np.ndarray):
-            processed_image = Image.fromarray(cv2.cvtColor(processed_image, cv2.COLOR_BGR2RGB))
-        elif isinstance(processed_image, (str, Path)):
-            processed_image = Image.open(processed_image).convert("RGB")
-        elif isinstance(processed_image, (bytes, bytearray)):
-            processed_image = Image.open(io.BytesIO(processed_image)).convert("RGB")
+        tensor = self._to_tensor(processed_image).unsqueeze(0).to(self._device)
+        vector = self._extract_features(tensor)[0]
+
+        if normalize:
+            vector = F.normalize(vector, p=2, dim=0)
+
+        return vector
 
-        tensor = self._transform(processed_image).unsqueeze(0).to(self._device)
+    def _to_tensor(self, image: Union[str, Path, Image.Image, np.ndarray, bytes]) -> torch.Tensor:
+        if isinstance(image, np.ndarray):
+            image = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        elif isinstance(image, (str, Path)):
+            image = Image.open(image).convert("RGB")
+        elif isinstance(image, (bytes, bytearray)):
+            image = Image.open(io.BytesIO(image)).convert("RGB")
+        return self._transform(image)
 
+    def _extract_features(self, batch: torch.Tensor) -> torch.Tensor:
         with torch.no_grad():
             try:
                 backbone = self._narcotic_model.model.model[:-1]
-                features = backbone(tensor)
+                features = backbone(batch)
             except Exception:
-                out = self._narcotic_model.model(tensor)
+                out = self._narcotic_model.model(batch)
                 features = out if isinstance(out, torch.Tensor) else torch.tensor(np.array(out))
-            vector = features.view(features.size(0), -1)[0]
-
-        if normalize:
-            vector = F.normalize(vector, p=2, dim=0)
-
-        return vector
+            return self._head.pool(features)
 
     @staticmethod
     def vector_to_numpy(vector: Union[torch.Tensor, np.ndarray, list], target_dim: int = 16000) -> np.ndarray:
@@ -213,6 +234,50 @@ class VectorService:
         resized = np.interp(new_idx, old_idx, v).astype(np.float32)
         return resized
 
+    def _embed(self, vector: Union[torch.Tensor, np.ndarray]) -> np.ndarray:
+        if isinstance(vector, torch.Tensor):
+            v = vector.detach().cpu().numpy().astype(np.float32).reshape(-1)
+        else:
+            v = np.asarray(vector, dtype=np.float32).reshape(-1)
+        if v.size == 0 or (v.size == 1 and float(v[0]) == 0.0):
+            return self.vector_to_numpy(v, self._head.dim)
+        return self._head.project(v)
+
+    def get_embedding_head(self) -> EmbeddingHead:
+        return self._head
+
+    def probe_embedding_dim(self) -> int:
+        """Run one blank image through the backbone so the head knows its
+        input size; raises EmbeddingDimMismatch if the output cannot match
+        EMBEDDING_DIM."""
+        self._ensure_narcotic_model()
+        blank = self._to_tensor(Image.new("RGB", (256, 256))).unsqueeze(0).to(self._device)
+        return self._head.bind(int(self._extract_features(blank).shape[1]))
+
+    def get_embedding_info(self) -> Dict[str, Any]:
+        return {
+            "dim": self._head.dim,
+            "head": self._head.version(),
+            "bound": self._head.in_dim is not None,
+        }
+
+    def _cache_version(self) -> str:
+        crop = "bbox" if self._crop_to_bbox else "full"
+        return f"{self.mgr.get_model_version(('segment', 'narcotic'))}|{self._head.version()}|{crop}"
+
+    def _cache_key(self, image_data: Any, segment_first: bool) -> Optional[str]:
+        if self._cache is None:
+            return None
+        try:
+            content_hash = hash_image_input(image_data)
+        except OSError:
+            return None
+        if content_hash is None:
+            return None
+        version = self._cache_version()
+        self._cache.set_version(version)
+        return EmbeddingCache.make_key(content_hash, version, segment_first)
+
     def create_vector_embedding(self, image_data: Union[str, Path, Image.Image, np.ndarray, bytes], segment_first: bool = True) -> Dict:
         result_info = {}
 
@@ -220,6 +285,12 @@ class VectorService:
             self._ensure_segment_model()
         self._ensure_narcotic_model()
 
+        cache_key = self._cache_key(image_data, segment_first)
+        if cache_key is not None:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         try:
             if segment_first:
                 processed_image, result_info = self.process_image_for_vector(image_data)
@@ -229,9 +300,99 @@ class VectorService:
         except Exception:
             raise
 
-        vector_np = self.vector_to_numpy(vector)
+        vector_np = self._embed(vector)
         vector_bytes = vector_np.tobytes()
         vector_base64 = base64.b64encode(vector_bytes).decode("utf-8")
 
-        result = {"vector_base64": vector_base64, "vector_dimension": len(vector_np), "segmentation_result": result_info}
-        return result
\ No newline at end of file
+        result = {
+            "vector_base64": vector_base64,
+            "vector_dimension": len(vector_np),
+            "embedding_head": self._head.version(),
+            "segmentation_result": result_info,
+        }
+        if cache_key is not None:
+            self._cache.put(cache_key, result)
+        return result
+
+    def _embed_chunk(self, cv_images: List[np.ndarray], entries: List[Dict], segment_first: bool) -> torch.Tensor:
+        crops: List[np.ndarray] = list(cv_images)
+        if segment_first:
+            seg_results = list(self._segment_model(cv_images))
+            if len(seg_results) != len(cv_images):
+                raise RuntimeError(f"segmentation returned {len(seg_results)} results for {len(cv_images)} images")
+            for i, (seg, cv_image) in enumerate(zip(seg_results, cv_images)):
+                crops[i], entries[i]["segmentation_result"] = self._select_drug_crop(seg, cv_image)
+        else:
+            for entry in entries:
+                entry["segmentation_result"] = {}
+
+        batch = torch.stack([self._to_tensor(crop) for crop in crops]).to(self._device)
+        return F.normalize(self._extract_features(batch), p=2, dim=1)
+
+    def create_vector_embeddings(
+        self,
+        images: List[Union[str, Path, Image.Image, np.ndarray, bytes]],
+        segment_first: bool = True,
+        batch_size: int = 16,
+    ) -> List[Dict]:
+        if segment_first:
+            self._ensure_segment_model()
+            self._refresh_segment_classes()
+        self._ensure_narcotic_model()
+
+        results: List[Dict] = []
+        cache_keys: Dict[int, str] = {}
+        pending: List[int] = []
+        for index, image in enumerate(images):
+            key = self._cache_key(image, segment_first)
+            cached = self._cache.get(key) if key is not None else None
+            if cached is not None:
+                cached["index"] = index
+                results.append(cached)
+                continue
+            if key is not None:
+                cache_keys[index] = key
+            pending.append(index)
+
+        batch_size = max(1, int(batch_size))
+        for start in range(0, len(pending), batch_size):
+            entries: List[Dict] = []
+            cv_images: List[np.ndarray] = []
+            for index in pending[start:start + batch_size]:
+                entry = {"index": index}
+                try:
+                    cv_images.append(self._to_cv_image(images[index]))
+                    entries.append(entry)
+                except Exception as e:
+                    entry["error"] = str(e)
+                    results.append(entry)
+
+            if not cv_images:
+                continue
+
+            # A failed segmentation or forward pass fails this chunk only, with
+            # an error per image; whole frames are never embedded in place of
+            # crops, matching create_vector_embedding.
+            try:
+                vectors = self._embed_chunk(cv_images, entries, segment_first)
+            except Exception as e:
+                for entry in entries:
+                    entry.pop("segmentation_result", None)
+                    entry["error"] = str(e)
+                    results.append(entry)
+                continue
+
+            for entry, vector in zip(entries, vectors):
+                vector_np = self._embed(vector)
+                entry.update({
+                    "vector_base64": base64.b64encode(vector_np.tobytes()).decode("utf-8"),
+                    "vector_dimension": len(vector_np),
+                    "embedding_head": self._head.version(),
+                })
+                key = cache_keys.get(entry["index"])
+                if key is not None:
+                    self._cache.put(key, {k: v for k, v in entry.items() if k != "index"})
+                results.append(entry)
+
+        results.sort(key=lambda r: r["index"])
+        return results
@@ -0,0 +1,44 @@
+import os
+import tarfile
+import zipfile
+from typing import BinaryIO, Iterator, List, Tuple
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+def _is_image_name(name: str) -> bool:
+    base = os.path.basename(name)
+    return not base.startswith(".") and base.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def iter_archive_images(fileobj: BinaryIO, filename: str = "") -> Iterator[Tuple[str, bytes]]:
+    fileobj.seek(0)
+    if zipfile.is_zipfile(fileobj):
+        fileobj.seek(0)
+        with zipfile.ZipFile(fileobj) as zf:
+            for info in zf.infolist():
+                if not info.is_dir() and _is_image_name(info.filename):
+                    yield info.filename, zf.read(info)
+        return
+
+    fileobj.seek(0)
+    try:
+        tf = tarfile.open(fileobj=fileobj, mode="r:*")
+    except tarfile.TarError:
+        raise ValueError(f"Unsupported archive format: {filename or 'upload'}")
+    with tf:
+        for member in tf:
+            if not member.isfile() or not _is_image_name(member.name):
+                continue
+            extracted = tf.extractfile(member)
+            if extracted is not None:
+                yield member.name, extracted.read()
+
+
+def take(iterator: Iterator[Tuple[str, bytes]], count: int) -> List[Tuple[str, bytes]]:
+    chunk: List[Tuple[str, bytes]] = []
+    for item in iterator:
+        chunk.append(item)
+        if len(chunk) >= count:
+            break
+    return chunk
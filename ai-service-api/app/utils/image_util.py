@@ -1,14 +1,36 @@
 import cv2
 import numpy as np
-from typing import Any
+from typing import Any, Optional, Tuple
 
-def crop_mask_on_white(img: np.ndarray, mask: np.ndarray) -> np.ndarray:
+def decode_image_bytes(data: bytes) -> np.ndarray:
+    if not data:
+        raise ValueError("Empty image payload")
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Cannot decode image payload")
+    return image
+
+def mask_bbox(mask: np.ndarray, padding: int = 0) -> Optional[Tuple[int, int, int, int]]:
+    x, y, w, h = cv2.boundingRect(mask)
+    if w == 0 or h == 0:
+        return None
+    x0, y0 = max(0, x - padding), max(0, y - padding)
+    x1, y1 = min(mask.shape[1], x + w + padding), min(mask.shape[0], y + h + padding)
+    return x0, y0, x1, y1
+
+def crop_mask_on_white(img: np.ndarray, mask: np.ndarray, crop_to_bbox: bool = False, padding: int = 0) -> np.ndarray:
     if mask.shape != img.shape[:2]:
         mask = cv2.resize(mask.astype(np.uint8), (img.shape[1], img.shape[0]), interpolation=cv2.INTER_NEAREST)
+    if mask.dtype != np.uint8:
+        mask = (mask != 0).astype(np.uint8)
 
-    white_bg = np.ones_like(img) * 255
-    mask_bool = mask.astype(bool)
+    if crop_to_bbox:
+        bbox = mask_bbox(mask, padding)
+        if bbox is not None:
+            x0, y0, x1, y1 = bbox
+            img = img[y0:y1, x0:x1]
+            mask = mask[y0:y1, x0:x1]
 
-    for c in range(3):
-        white_bg[:, :, c][mask_bool] = img[:, :, c][mask_bool]
-    return white_bg
\ No newline at end of file
+    white_bg = np.full_like(img, 255)
+    cv2.copyTo(img, mask, white_bg)
+    return white_bg
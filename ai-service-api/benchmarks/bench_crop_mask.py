@@ -0,0 +1,80 @@
+import time
+import argparse
+from typing import Callable, Dict, List
+
+import cv2
+import numpy as np
+
+from app.utils.image_util import crop_mask_on_white
+
+
+def crop_mask_on_white_loop(img: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    if mask.shape != img.shape[:2]:
+        mask = cv2.resize(mask.astype(np.uint8), (img.shape[1], img.shape[0]), interpolation=cv2.INTER_NEAREST)
+    white_bg = np.ones_like(img) * 255
+    mask_bool = mask.astype(bool)
+    for c in range(3):
+        white_bg[:, :, c][mask_bool] = img[:, :, c][mask_bool]
+    return white_bg
+
+
+def make_masks(count: int, mask_size: int, object_frac: float, seed: int = 0) -> List[np.ndarray]:
+    rng = np.random.default_rng(seed)
+    radius = max(2, int(mask_size * object_frac / 2))
+    masks = []
+    for _ in range(count):
+        mask = np.zeros((mask_size, mask_size), dtype=np.float32)
+        cx, cy = rng.integers(radius, mask_size - radius, size=2)
+        cv2.circle(mask, (int(cx), int(cy)), radius, 1.0, -1)
+        masks.append(mask)
+    return masks
+
+
+def run(fn: Callable[[np.ndarray, np.ndarray], np.ndarray], img: np.ndarray, masks: List[np.ndarray], rounds: int) -> Dict[str, float]:
+    latencies: List[float] = []
+    encoded = 0
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for mask in masks:
+            crop = fn(img, mask)
+            ok, buf = cv2.imencode(".jpg", crop)
+            encoded += len(buf) if ok else 0
+        latencies.append((time.perf_counter() - t0) * 1000.0)
+    lat = np.asarray(latencies)
+    return {
+        "p50_ms": float(np.percentile(lat, 50)),
+        "p99_ms": float(np.percentile(lat, 99)),
+        "kib_per_crop": encoded / 1024.0 / (rounds * len(masks)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare per-channel loop vs vectorized crop_mask_on_white, full frame vs bbox")
+    parser.add_argument("--width", type=int, default=3024)
+    parser.add_argument("--height", type=int, default=4032)
+    parser.add_argument("--objects", type=int, default=8)
+    parser.add_argument("--mask-size", type=int, default=640, help="model-resolution mask size before resize")
+    parser.add_argument("--object-frac", type=float, default=0.25, help="object diameter as a fraction of the frame")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    img = rng.integers(0, 255, size=(args.height, args.width, 3), dtype=np.uint8)
+    masks = make_masks(args.objects, args.mask_size, args.object_frac)
+
+    ref = crop_mask_on_white_loop(img, masks[0])
+    assert np.array_equal(ref, crop_mask_on_white(img, masks[0])), "vectorized output differs from loop"
+
+    print(f"frame {args.width}x{args.height}, {args.objects} objects/request, {args.rounds} rounds (crop + JPEG encode)")
+    variants = (
+        ("loop full-frame", crop_mask_on_white_loop),
+        ("vectorized full-frame", crop_mask_on_white),
+        ("vectorized bbox", lambda i, m: crop_mask_on_white(i, m, crop_to_bbox=True)),
+    )
+    for name, fn in variants:
+        stats = run(fn, img, masks, args.rounds)
+        print(f"{name:<22} p50 {stats['p50_ms']:8.2f} ms  p99 {stats['p99_ms']:8.2f} ms  {stats['kib_per_crop']:8.1f} KiB/crop")
+
+
+if __name__ == "__main__":
+    main()
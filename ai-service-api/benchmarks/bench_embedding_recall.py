@@ -0,0 +1,107 @@
+import os
+import time
+import base64
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+os.environ.setdefault("EMBED_CACHE_ENABLED", "false")
+
+from app.services.model_manager_service import ModelManager
+from app.services.vector_service import VectorService
+from app.services.embedding_head_service import EmbeddingHead, fit_pca
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+def load_labelled_images(root: str) -> Tuple[List[bytes], List[str]]:
+    images, labels = [], []
+    for label_dir in sorted(p for p in Path(root).iterdir() if p.is_dir()):
+        for p in sorted(label_dir.iterdir()):
+            if p.suffix.lower() in IMAGE_EXTENSIONS:
+                images.append(p.read_bytes())
+                labels.append(label_dir.name)
+    return images, labels
+
+
+def embed_all(service: VectorService, images: List[bytes], segment_first: bool) -> Tuple[np.ndarray, float]:
+    t0 = time.perf_counter()
+    results = service.create_vector_embeddings(images, segment_first=segment_first, batch_size=16)
+    elapsed = time.perf_counter() - t0
+    vectors = []
+    for r in results:
+        if "error" in r:
+            raise RuntimeError(f"image {r['index']} failed: {r['error']}")
+        vectors.append(np.frombuffer(base64.b64decode(r["vector_base64"]), dtype=np.float32))
+    return np.stack(vectors), elapsed
+
+
+def neighbours(vectors: np.ndarray, k: int) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    unit = vectors / np.maximum(norms, 1e-12)
+    sims = unit @ unit.T
+    np.fill_diagonal(sims, -np.inf)
+    return np.argsort(-sims, axis=1)[:, :k]
+
+
+def recall_at_k(nn: np.ndarray, labels: np.ndarray, k: int) -> float:
+    hits = (labels[nn[:, :k]] == labels[:, None]).any(axis=1)
+    return float(hits.mean())
+
+
+def overlap_at_k(nn: np.ndarray, reference: np.ndarray, k: int) -> float:
+    return float(np.mean([len(set(a[:k]) & set(b[:k])) / k for a, b in zip(nn, reference)]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline recall@k of compact embedding heads vs the 16000-dim interpolated vector")
+    parser.add_argument("--images", required=True, help="directory with one sub-directory of reference images per narcotic")
+    parser.add_argument("--heads", default="interp:16000,gap,projection:512,projection:256")
+    parser.add_argument("--fit-pca", default=None, help="fit PCA on GAP features, save to this .npz and evaluate it")
+    parser.add_argument("--pca-dim", type=int, default=256)
+    parser.add_argument("--k", default="1,5,10")
+    parser.add_argument("--no-segment", action="store_true")
+    args = parser.parse_args()
+
+    mgr = ModelManager()
+    if not mgr.wait_for_core_models(300):
+        raise SystemExit("core models did not load")
+
+    images, label_list = load_labelled_images(args.images)
+    if len(images) < 2:
+        raise SystemExit("need at least two labelled images")
+    labels = np.array(label_list)
+    ks = [int(k) for k in args.k.split(",")]
+    max_k = min(max(ks), len(images) - 1)
+    segment_first = not args.no_segment
+
+    heads: List[Tuple[str, EmbeddingHead]] = []
+    for spec in [s.strip() for s in args.heads.split(",") if s.strip()]:
+        mode, _, dim = spec.partition(":")
+        heads.append((spec, EmbeddingHead(mode=mode, dim=int(dim or 16000))))
+
+    if args.fit_pca:
+        gap_vectors, _ = embed_all(VectorService(model_manager=mgr, head=EmbeddingHead("gap")), images, segment_first)
+        np.savez(args.fit_pca, **fit_pca(gap_vectors, args.pca_dim))
+        heads.append((f"pca:{args.pca_dim}", EmbeddingHead("projection", projection_path=args.fit_pca)))
+
+    reference: Optional[np.ndarray] = None
+    print(f"{len(images)} images, {len(set(label_list))} labels")
+    for name, head in heads:
+        vectors, elapsed = embed_all(VectorService(model_manager=mgr, head=head), images, segment_first)
+        nn = neighbours(vectors, max_k)
+        if reference is None:
+            reference = nn
+        row: Dict[str, float] = {f"recall@{k}": recall_at_k(nn, labels, min(k, max_k)) for k in ks}
+        row[f"overlap@{max_k}"] = overlap_at_k(nn, reference, max_k)
+        metrics = "  ".join(f"{key} {value:.3f}" for key, value in row.items())
+        print(
+            f"{name:<18} dim {vectors.shape[1]:>6}  {vectors.nbytes / len(vectors) / 1024:7.1f} KiB/vec  "
+            f"{elapsed / len(images) * 1000:7.2f} ms/img  {metrics}"
+        )
+
+
+if __name__ == "__main__":
+    main()
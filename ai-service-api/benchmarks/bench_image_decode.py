@@ -0,0 +1,81 @@
+import os
+import time
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+import cv2
+import numpy as np
+
+from app.utils.image_util import decode_image_bytes
+
+
+def make_jpeg(width: int, height: int, seed: int = 0) -> bytes:
+    rng = np.random.default_rng(seed)
+    image = rng.integers(0, 255, size=(height, width, 3), dtype=np.uint8)
+    image = cv2.GaussianBlur(image, (15, 15), 0)
+    ok, buf = cv2.imencode(".jpg", image, [int(cv2.IMWRITE_JPEG_QUALITY), 90])
+    if not ok:
+        raise RuntimeError("Failed to encode benchmark image")
+    return buf.tobytes()
+
+
+def load_via_tempfile(contents: bytes) -> np.ndarray:
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as temp:
+        temp_path = temp.name
+        temp.write(contents)
+    try:
+        image = cv2.imread(temp_path)
+        if image is None:
+            raise ValueError(f"Cannot load image from {temp_path}")
+        return image
+    finally:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+
+
+def load_in_memory(contents: bytes) -> np.ndarray:
+    return decode_image_bytes(contents)
+
+
+def run(fn: Callable[[bytes], np.ndarray], contents: bytes, requests: int, concurrency: int) -> Dict[str, float]:
+    latencies: List[float] = []
+
+    def _one(_: int) -> None:
+        t0 = time.perf_counter()
+        fn(contents)
+        latencies.append((time.perf_counter() - t0) * 1000.0)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(_one, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    lat = np.asarray(latencies)
+    return {
+        "req_per_s": requests / elapsed,
+        "p50_ms": float(np.percentile(lat, 50)),
+        "p99_ms": float(np.percentile(lat, 99)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare temp-file vs in-memory image loading for inference uploads")
+    parser.add_argument("--width", type=int, default=3024)
+    parser.add_argument("--height", type=int, default=4032)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    contents = make_jpeg(args.width, args.height)
+    print(f"payload: {len(contents) / 1024:.1f} KiB, {args.width}x{args.height}, {args.requests} requests, concurrency {args.concurrency}")
+
+    for name, fn in (("tempfile+imread", load_via_tempfile), ("imdecode(frombuffer)", load_in_memory)):
+        fn(contents)
+        stats = run(fn, contents, args.requests, args.concurrency)
+        print(f"{name:<22} {stats['req_per_s']:8.1f} req/s  p50 {stats['p50_ms']:7.2f} ms  p99 {stats['p99_ms']:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
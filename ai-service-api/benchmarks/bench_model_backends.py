@@ -0,0 +1,137 @@
+import time
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from ultralytics import YOLO
+
+from app.services.model_manager_service import FilesystemRepository
+from app.services.model_export_service import ModelExporter
+
+
+def load_images(images_dir: Optional[str], count: int, size: int) -> List[np.ndarray]:
+    images: List[np.ndarray] = []
+    if images_dir:
+        for p in sorted(Path(images_dir).iterdir()):
+            img = cv2.imread(str(p))
+            if img is not None:
+                images.append(img)
+            if len(images) >= count:
+                break
+    if not images:
+        rng = np.random.default_rng(0)
+        images = [rng.integers(0, 255, size=(size, size, 3), dtype=np.uint8) for _ in range(count)]
+    return images
+
+
+def summarize(pred: Any) -> Tuple[str, Any]:
+    probs = getattr(pred, "probs", None)
+    if probs is not None:
+        data = probs.data.cpu().numpy() if hasattr(probs.data, "cpu") else np.asarray(probs.data)
+        return "classify", data.astype(np.float32)
+    boxes = getattr(pred, "boxes", None)
+    if boxes is not None and len(boxes):
+        cls = boxes.cls.cpu().numpy().astype(int) if hasattr(boxes.cls, "cpu") else np.asarray(boxes.cls, dtype=int)
+        return "detect", sorted(cls.tolist())
+    return "detect", []
+
+
+def time_model(model: YOLO, images: List[np.ndarray]) -> Tuple[List[float], List[Tuple[str, Any]]]:
+    model(images[0], verbose=False)
+    latencies, outputs = [], []
+    for img in images:
+        t0 = time.perf_counter()
+        pred = model(img, verbose=False)[0]
+        latencies.append((time.perf_counter() - t0) * 1000.0)
+        outputs.append(summarize(pred))
+    return latencies, outputs
+
+
+def time_batched(model: YOLO, images: List[np.ndarray], batch: int) -> List[float]:
+    """Per-image latency when images arrive in BatchScheduler-sized lists;
+    the last chunk is short, as it usually is in the scheduler."""
+    model(images[:batch], verbose=False)
+    latencies = []
+    for start in range(0, len(images), batch):
+        chunk = images[start:start + batch]
+        t0 = time.perf_counter()
+        preds = model(chunk, verbose=False)
+        elapsed = (time.perf_counter() - t0) * 1000.0
+        if len(preds) != len(chunk):
+            raise RuntimeError(f"{len(preds)} results for a batch of {len(chunk)}")
+        latencies.append(elapsed / len(chunk))
+    return latencies
+
+
+def parity(ref: List[Tuple[str, Any]], other: List[Tuple[str, Any]]) -> Dict[str, float]:
+    agree = 0
+    max_diff = 0.0
+    for (kind, a), (_, b) in zip(ref, other):
+        if kind == "classify":
+            agree += int(int(np.argmax(a)) == int(np.argmax(b)))
+            if a.shape == b.shape:
+                max_diff = max(max_diff, float(np.max(np.abs(a - b))))
+        else:
+            agree += int(a == b)
+    return {"agreement": agree / max(1, len(ref)), "max_prob_diff": max_diff}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export models and compare optimized backends against PyTorch")
+    parser.add_argument("--model-root", default="app/ai_models")
+    parser.add_argument("--backends", default="onnx", help="comma separated: onnx,openvino")
+    parser.add_argument("--int8", action="store_true")
+    parser.add_argument("--images", default=None, help="directory of sample images for parity checks")
+    parser.add_argument("--count", type=int, default=20)
+    parser.add_argument("--size", type=int, default=640)
+    parser.add_argument("--batch", type=int, default=8, help="images per call for the batched timings (BATCH_MAX_SIZE)")
+    args = parser.parse_args()
+
+    paths = FilesystemRepository(Path(args.model_root)).discover_paths()
+    targets: List[Tuple[str, Path, Optional[str]]] = [
+        ("segment", paths["segment"], "segment"),
+        ("narcotic", paths["narcotic"], "classify"),
+        ("brand", paths["brand"], "classify"),
+    ]
+    targets += [(f"brand:{rec.brand_key}", rec.path, "classify") for rec in paths["brand_models"]]
+    images = load_images(args.images, args.count, args.size)
+
+    for backend in [b.strip() for b in args.backends.split(",") if b.strip()]:
+        exporter = ModelExporter(backend=backend, int8=args.int8, batch=args.batch)
+        print(f"\n== backend: {backend}{' (int8)' if args.int8 else ''}")
+        for name, pt_path, task in targets:
+            if not pt_path.exists():
+                continue
+            artifact = exporter.export(pt_path, task=task)
+            if artifact is None:
+                print(f"{name:<24} export failed")
+                continue
+
+            ref_model, opt_model = YOLO(str(pt_path), task=task), YOLO(str(artifact), task=task)
+            ref_lat, ref_out = time_model(ref_model, images)
+            opt_lat, opt_out = time_model(opt_model, images)
+            p = parity(ref_out, opt_out)
+            print(
+                f"{name:<24} pytorch p50 {np.percentile(ref_lat, 50):7.2f} ms  "
+                f"{backend} p50 {np.percentile(opt_lat, 50):7.2f} ms  "
+                f"speedup {np.percentile(ref_lat, 50) / max(1e-6, np.percentile(opt_lat, 50)):5.2f}x  "
+                f"agreement {p['agreement']:.3f}  max_prob_diff {p['max_prob_diff']:.4f}  -> {artifact.name}"
+            )
+
+            try:
+                ref_batched = time_batched(ref_model, images, args.batch)
+                opt_batched = time_batched(opt_model, images, args.batch)
+            except Exception as e:
+                print(f"{'':<24} batch {args.batch}: {backend} failed: {e}")
+                continue
+            print(
+                f"{'':<24} batch {args.batch}: pytorch p50 {np.percentile(ref_batched, 50):7.2f} ms/img  "
+                f"{backend} p50 {np.percentile(opt_batched, 50):7.2f} ms/img  "
+                f"speedup {np.percentile(ref_batched, 50) / max(1e-6, np.percentile(opt_batched, 50)):5.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
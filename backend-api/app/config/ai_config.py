@@ -2,4 +2,11 @@ import os
 from typing import Optional
 
 def get_ai_service_url() -> str:
-    return os.getenv("AI_SERVICE_URL")
\ No newline at end of file
+    return os.getenv("AI_SERVICE_URL")
+
+def get_embedding_dim() -> int:
+    return int(os.getenv("EMBEDDING_DIM", "16000"))
+
+
+def get_max_upload_bytes() -> int:
+    return int(float(os.getenv("AI_MAX_UPLOAD_MB", "20")) * 1024 * 1024)
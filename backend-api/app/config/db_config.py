@@ -1,45 +1,152 @@
 import os
+import time
+import threading
+from typing import Any, Dict
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from pgvector import Vector
+from sqlalchemy import event, exc, text
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 
 load_dotenv()
 
-SYNC_DB_URL = (
-    f"postgresql+psycopg2://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
-    f"@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
-)
 ASYNC_DB_URL = (
     f"postgresql+asyncpg://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
     f"@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
 )
 
-# Sync engine/session
-sync_engine = create_engine(
-    SYNC_DB_URL,
-    pool_size=20,
-    max_overflow=0,
-    pool_pre_ping=True,
-    pool_recycle=1800
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+DB_PREPARED_STATEMENT_CACHE_SIZE = int(os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", "256"))
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a free connection.
+    Opening a new connection is timed separately, so ``wait_ms`` is pool
+    contention only and ``connect_ms`` is database connect latency."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.acquisitions = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.connects = 0
+        self.connect_errors = 0
+        self.connect_total = 0.0
+        self.connect_max = 0.0
+
+    def _create_connection(self):
+        started = time.perf_counter()
+        try:
+            record = super()._create_connection()
+        except Exception:
+            with self._stats_lock:
+                self.connect_errors += 1
+            raise
+        elapsed = time.perf_counter() - started
+        record.info["connect_seconds"] = elapsed
+        with self._stats_lock:
+            self.connects += 1
+            self.connect_total += elapsed
+            self.connect_max = max(self.connect_max, elapsed)
+        return record
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self._record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        # A connection opened during this checkout is not time spent waiting.
+        connect = record.info.pop("connect_seconds", 0.0)
+        self._record_wait(max(0.0, time.perf_counter() - started - connect))
+        return record
+
+    def _record_wait(self, waited: float, timed_out: bool = False) -> None:
+        with self._stats_lock:
+            self.acquisitions += 1
+            self.timeouts += int(timed_out)
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            acquisitions, timeouts = self.acquisitions, self.timeouts
+            wait_total, wait_max = self.wait_total, self.wait_max
+            connects, connect_errors = self.connects, self.connect_errors
+            connect_total, connect_max = self.connect_total, self.connect_max
+        return {
+            "pool_size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(0, self.overflow()),
+            "acquisitions": acquisitions,
+            "timeouts": timeouts,
+            "wait_ms_avg": round(wait_total * 1000.0 / acquisitions, 3) if acquisitions else 0.0,
+            "wait_ms_max": round(wait_max * 1000.0, 3),
+            "connects": connects,
+            "connect_errors": connect_errors,
+            "connect_ms_avg": round(connect_total * 1000.0 / connects, 3) if connects else 0.0,
+            "connect_ms_max": round(connect_max * 1000.0, 3),
+            "statement_timeout_ms": DB_STATEMENT_TIMEOUT_MS,
+            "prepared_statement_cache_size": DB_PREPARED_STATEMENT_CACHE_SIZE,
+        }
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
 
-# Async engine/session
+# Single engine for the whole app; keep pool_size + max_overflow (times the
+# number of workers) under the Postgres container's max_connections.
 async_engine = create_async_engine(
     ASYNC_DB_URL,
-    pool_size=20,
-    max_overflow=0,
+    poolclass=InstrumentedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
     pool_pre_ping=True,
-    pool_recycle=1800
+    pool_recycle=DB_POOL_RECYCLE,
+    connect_args={
+        "prepared_statement_cache_size": DB_PREPARED_STATEMENT_CACHE_SIZE,
+        "server_settings": {
+            "application_name": "backend-api",
+            "statement_timeout": str(DB_STATEMENT_TIMEOUT_MS),
+        },
+    },
 )
+
+
+def encode_vector(value: Any) -> bytes:
+    """Binary wire format for pgvector's ``vector``. ndarrays are copied as
+    one float32 buffer; str covers the ORM column type, which binds text."""
+    if isinstance(value, str):
+        value = Vector.from_text(value)
+    elif not isinstance(value, Vector):
+        value = Vector(value)
+    return value.to_binary()
+
+
+async def register_vector_codec(conn) -> None:
+    try:
+        await conn.set_type_codec(
+            "vector", schema="public", encoder=encode_vector, decoder=Vector.from_binary, format="binary"
+        )
+    except ValueError as e:
+        # Extension not created yet (fresh database); text I/O still works.
+        if not str(e).startswith("unknown type"):
+            raise
+
+
+@event.listens_for(async_engine.sync_engine, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    dbapi_connection.run_async(register_vector_codec)
+
+
 AsyncSessionLocal = sessionmaker(
     bind=async_engine,
     class_=AsyncSession,
@@ -50,4 +157,12 @@ AsyncSessionLocal = sessionmaker(
 
 async def get_async_db():
     async with AsyncSessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+async def disable_statement_timeout(db: AsyncSession, local: bool = True) -> None:
+    """Lift DB_STATEMENT_TIMEOUT_MS for maintenance work (index builds,
+    backfills). ``local`` scopes it to the current transaction."""
+    await db.execute(text(f"SET {'LOCAL ' if local else ''}statement_timeout = 0"))
+
+def get_pool_stats() -> Dict[str, Any]:
+    return async_engine.sync_engine.pool.get_stats()
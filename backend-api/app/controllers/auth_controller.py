@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
@@ -6,13 +7,17 @@ from jwt.exceptions import InvalidTokenError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
 from app.schemas.user_schema import TokenData, User, UserInDB
 from app.schemas.role_schema import RoleBase
-from app.config.db_config import get_db
+from app.config.db_config import get_async_db
 from app.config.auth_config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
 from app.models.user_model import User
+from app.models.role_model import Role
+from app.services.auth_cache_service import get_token_cache
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
@@ -23,10 +28,17 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
-def get_user_from_db(email: str, db: Optional[Session] = None) -> Optional[UserInDB]:
-    if db is None:
-        db = next(get_db())
-    user_obj = db.query(User).filter(User.email == email).first()
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    # bcrypt is deliberately slow; keep it off the event loop.
+    return await asyncio.to_thread(pwd_context.verify, plain_password, hashed_password)
+
+async def get_user_from_db(email: str, db: AsyncSession) -> Optional[UserInDB]:
+    # User.role is joined; left alone, Role.users (selectin) would pull every
+    # user of that role on each token lookup.
+    result = await db.execute(
+        select(User).options(joinedload(User.role).raiseload(Role.users)).where(User.email == email)
+    )
+    user_obj = result.scalars().first()
     if user_obj:
         role_dict = {
             "id": user_obj.role.id,
@@ -47,9 +59,13 @@ def get_user_from_db(email: str, db: Optional[Session] = None) -> Optional[UserI
         )
     return None
 
-def authenticate_user(email: str, password: str, db: Optional[Session] = None) -> Optional[UserInDB]:
-    user = get_user_from_db(email, db)
-    if user and verify_password(password, user.hashed_password):
+async def authenticate_user(email: str, password: str, db: AsyncSession) -> Optional[UserInDB]:
+    user = await get_user_from_db(email, db)
+    if not user:
+        # Same bcrypt cost for unknown emails, so response time does not reveal them.
+        await asyncio.to_thread(pwd_context.dummy_verify)
+        return None
+    if await verify_password_async(password, user.hashed_password):
         return user
     return None
 
@@ -59,31 +75,21 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     to_encode.update({"exp": expire, "sub": data.get("sub")})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> UserInDB:
+async def get_user_from_token(token: Optional[str], db: AsyncSession) -> UserInDB:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid token",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email = payload.get("sub")
-        if not email:
-            raise credentials_exception
-        token_data = TokenData(email=email)
-    except InvalidTokenError:
-        raise credentials_exception
-    user = get_user_from_db(token_data.email, db)
-    if not user:
+    if not token:
         raise credentials_exception
-    return user
 
-async def get_current_active_user_from_cookie(token: str, db: Session = Depends(get_db)) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Invalid token",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+    cache = get_token_cache()
+    await cache.check_version()
+    user = cache.get(token)
+    if user is not None:
+        return user
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email = payload.get("sub")
@@ -92,7 +98,14 @@ async def get_current_active_user_from_cookie(token: str, db: Session = Depends(
         token_data = TokenData(email=email)
     except InvalidTokenError:
         raise credentials_exception
-    user = get_user_from_db(token_data.email, db)
+    user = await get_user_from_db(token_data.email, db)
     if not user or getattr(user, "disabled", False):
         raise credentials_exception
-    return user
\ No newline at end of file
+    cache.put(token, user, payload.get("exp"))
+    return user
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> UserInDB:
+    return await get_user_from_token(token, db)
+
+async def get_current_active_user_from_cookie(token: str, db: AsyncSession = Depends(get_async_db)) -> UserInDB:
+    return await get_user_from_token(token, db)
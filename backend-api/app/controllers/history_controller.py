@@ -1,91 +1,291 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional, Dict, Any
-from sqlalchemy import select, func, desc
-from sqlalchemy.orm import joinedload
+from typing import List, Optional, Dict, Any, Tuple, AsyncIterator
+from datetime import datetime
+from sqlalchemy import select, func, desc, text, tuple_, cast, case, literal_column, Text, Float
+from sqlalchemy.orm import joinedload, aliased
 import re
+import json
+import base64
 
 from app.models import history_model
 from app.models.exhibit_model import Exhibit
-from app.services.location_service import get_location_names
-from app.services.user_service import get_discoverer_and_modifier_names
+from app.models.subdistrict_model import Subdistrict
+from app.models.district_model import District
+from app.models.province_model import Province
+from app.models.user_model import User
+from app.schemas.history_schema import HistoryFilter
+from app.services.location_service import get_location_names_bulk
+from app.services.user_service import get_user_names_bulk
+
+EMPTY_LOCATION = {"province_name": None, "district_name": None, "subdistrict_name": None}
+NARCOTIC_CATEGORY = "ยาเสพติด"
+COUNT_CAP = 10000
+
+
+JSON_BATCH_SIZE = 500
+
+# Exhibit payloads built in SQL. Keys mirror the ORM column dicts the list
+# endpoints used to assemble per row; the collections are left out when empty.
+# to_jsonb() writes NUMERIC as a JSON number, so weight_grams is overridden to
+# keep what Pydantic produced: the Decimal as a string ("12.50") in the full
+# listing, and a float in the narcotics listing, which converted it first.
+EXHIBIT_JSON_SQL = """
+CASE WHEN exhibits.id IS NULL THEN NULL ELSE
+    to_jsonb(exhibits)
+    || COALESCE((SELECT jsonb_build_object('narcotics', jsonb_agg(
+                     to_jsonb(n) || jsonb_build_object('weight_grams', n.weight_grams::text) ORDER BY n.id))
+                 FROM narcotics n WHERE n.exhibit_id = exhibits.id HAVING count(*) > 0), '{}'::jsonb)
+    || COALESCE((SELECT jsonb_build_object('firearms', jsonb_agg(to_jsonb(f) ORDER BY f.id))
+                 FROM firearms f WHERE f.exhibit_id = exhibits.id HAVING count(*) > 0), '{}'::jsonb)
+END
+"""
+
+NARCOTIC_EXHIBIT_JSON_SQL = """
+CASE WHEN exhibits.id IS NULL THEN NULL ELSE
+    jsonb_build_object('id', exhibits.id, 'category', exhibits.category, 'subcategory', exhibits.subcategory)
+    || COALESCE((SELECT jsonb_build_object('narcotics', jsonb_build_array(
+                     to_jsonb(n) || jsonb_build_object('weight_grams', n.weight_grams::float8)))
+                 FROM narcotics n WHERE n.exhibit_id = exhibits.id ORDER BY n.id LIMIT 1), '{}'::jsonb)
+END
+"""
+
+
+def _full_name(user):
+    return func.nullif(func.concat_ws(" ", func.nullif(user.firstname, ""), func.nullif(user.lastname, "")), "")
+
+
+def _isoformat(column):
+    """``datetime.isoformat()`` in SQL: the json output of a timestamp trims
+    trailing zeros from the fraction, Python always prints six digits."""
+    return func.to_char(column, 'YYYY-MM-DD"T"HH24:MI:SS', type_=Text) + case(
+        (func.extract("microseconds", column) % 1000000 != 0, func.to_char(column, ".US", type_=Text)),
+        else_="",
+    )
+
+
+def history_json_stmt(
+    user_id: Optional[str] = None,
+    filters: Optional[HistoryFilter] = None,
+    narcotics_only: bool = False,
+):
+    """Select ``(created_at, id, row_json)`` where ``row_json`` is the serialized
+    HistoryWithExhibit payload, so list responses skip ORM hydration and Pydantic."""
+    History = history_model.History
+    discoverer = aliased(User)
+    modifier = aliased(User)
+    exhibit_sql = NARCOTIC_EXHIBIT_JSON_SQL if narcotics_only else EXHIBIT_JSON_SQL
+
+    row_json = func.json_build_object(
+        "exhibit_id", History.exhibit_id,
+        "subdistrict_id", History.subdistrict_id,
+        "discovery_date", History.discovery_date,
+        "discovery_time", func.to_char(History.discovery_time, "HH24:MI:00"),
+        "discovered_by", History.discovered_by,
+        "photo_url", History.photo_url,
+        "quantity", cast(History.quantity, Text),
+        "latitude", func.ST_Y(History.location),
+        "longitude", func.ST_X(History.location),
+        "ai_confidence", cast(History.ai_confidence, Float),
+        "id", History.id,
+        "created_at", _isoformat(History.created_at),
+        "modified_at", _isoformat(History.modified_at),
+        "modified_by", History.modified_by,
+        "exhibit", literal_column(exhibit_sql),
+        "subdistrict_name", Subdistrict.subdistrict_name,
+        "district_name", District.district_name,
+        "province_name", Province.province_name,
+        "discoverer_name", _full_name(discoverer),
+        "modifier_name", _full_name(modifier),
+    )
+
+    stmt = select(History.created_at, History.id, cast(row_json, Text).label("row_json"))
+    return _joined_history_select(stmt, discoverer, modifier, user_id, filters, narcotics_only)
+
+
+def history_flat_stmt(
+    user_id: Optional[str] = None,
+    filters: Optional[HistoryFilter] = None,
+    narcotics_only: bool = False,
+):
+    """One scalar column per field, for tabular exports."""
+    History = history_model.History
+    discoverer = aliased(User)
+    modifier = aliased(User)
+
+    stmt = select(
+        History.id,
+        History.created_at,
+        History.discovery_date,
+        func.to_char(History.discovery_time, "HH24:MI").label("discovery_time"),
+        func.ST_Y(History.location).label("latitude"),
+        func.ST_X(History.location).label("longitude"),
+        History.exhibit_id,
+        Exhibit.category,
+        Exhibit.subcategory,
+        History.quantity,
+        History.ai_confidence,
+        Subdistrict.subdistrict_name,
+        District.district_name,
+        Province.province_name,
+        History.discovered_by,
+        _full_name(discoverer).label("discoverer_name"),
+        History.modified_at,
+        _full_name(modifier).label("modifier_name"),
+        History.photo_url,
+    )
+    return _joined_history_select(stmt, discoverer, modifier, user_id, filters, narcotics_only)
+
+
+def _joined_history_select(stmt, discoverer, modifier, user_id, filters, narcotics_only):
+    History = history_model.History
+    stmt = (
+        stmt.select_from(History)
+        .outerjoin(Exhibit, Exhibit.id == History.exhibit_id)
+        .outerjoin(Subdistrict, Subdistrict.id == History.subdistrict_id)
+        .outerjoin(District, District.id == Subdistrict.district_id)
+        .outerjoin(Province, Province.id == District.province_id)
+        .outerjoin(discoverer, discoverer.user_id == History.discovered_by)
+        .outerjoin(modifier, modifier.user_id == History.modified_by)
+    )
+    if user_id is not None:
+        stmt = stmt.where(History.discovered_by == str(user_id))
+    if narcotics_only:
+        stmt = stmt.where(Exhibit.category == NARCOTIC_CATEGORY)
+    return apply_history_filters(stmt, filters)
+
+
+def encode_cursor(created_at: datetime, history_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), history_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, history_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(history_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def apply_history_filters(stmt, filters: Optional[HistoryFilter]):
+    History = history_model.History
+    if filters is None:
+        return stmt
+
+    if filters.date_from is not None:
+        stmt = stmt.where(History.discovery_date >= filters.date_from)
+    if filters.date_to is not None:
+        stmt = stmt.where(History.discovery_date <= filters.date_to)
+    if filters.category:
+        stmt = stmt.where(History.exhibit.has(Exhibit.category == filters.category))
+    if filters.subdistrict_id is not None:
+        stmt = stmt.where(History.subdistrict_id == filters.subdistrict_id)
+    if filters.district_id is not None:
+        stmt = stmt.where(History.subdistrict_id.in_(
+            select(Subdistrict.id).where(Subdistrict.district_id == filters.district_id)
+        ))
+    if filters.province_id is not None:
+        stmt = stmt.where(History.subdistrict_id.in_(
+            select(Subdistrict.id)
+            .join(District, District.id == Subdistrict.district_id)
+            .where(District.province_id == filters.province_id)
+        ))
+    if filters.discovered_by:
+        stmt = stmt.where(History.discovered_by == filters.discovered_by)
+    if filters.bbox is not None:
+        stmt = stmt.where(History.location.intersects(func.ST_MakeEnvelope(*filters.bbox, 4326)))
+    return stmt
+
+
+def apply_keyset(stmt, cursor: Optional[str], limit: Optional[int]):
+    History = history_model.History
+    if cursor:
+        created_at, history_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(History.created_at, History.id) < tuple_(created_at, history_id))
+    stmt = stmt.order_by(desc(History.created_at), desc(History.id))
+    if limit is not None:
+        stmt = stmt.limit(limit + 1)
+    return stmt
 
 class HistoryController:
     def __init__(self):
         pass
 
-    async def get_all_histories(self, db: AsyncSession, user_id: Optional[int] = None) -> List[Dict[str, Any]]:
-        stmt = select(history_model.History, func.ST_AsText(history_model.History.location).label('location_wkt')).options(
-            joinedload(history_model.History.exhibit).joinedload(Exhibit.narcotics),
-            joinedload(history_model.History.exhibit).joinedload(Exhibit.firearms)
+    async def _attach_names(self, db: AsyncSession, rows: List[tuple]) -> None:
+        locations = await get_location_names_bulk(db, (history.subdistrict_id for _, history in rows))
+        users = await get_user_names_bulk(
+            db, (uid for _, history in rows for uid in (history.discovered_by, history.modified_by))
         )
 
+        for history_dict, history in rows:
+            history_dict.update(locations.get(history.subdistrict_id, EMPTY_LOCATION))
+            history_dict["discoverer_name"] = users.get(str(history.discovered_by)) if history.discovered_by else None
+            history_dict["modifier_name"] = users.get(str(history.modified_by)) if history.modified_by else None
+
+    def _split_page(self, rows: List[Any], limit: Optional[int], key=lambda row: row[0]) -> Tuple[List[Any], Optional[str]]:
+        if limit is None or len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        last = key(rows[-1])
+        return rows, encode_cursor(last.created_at, last.id)
+
+    async def count_histories(
+        self,
+        db: AsyncSession,
+        filters: Optional[HistoryFilter] = None,
+        user_id: Optional[str] = None,
+        narcotics_only: bool = False,
+        cap: int = COUNT_CAP,
+    ) -> Tuple[int, bool]:
+        """Cheap total for paginated listings: the planner's row estimate when
+        unfiltered, otherwise an exact count that stops at ``cap``."""
+        unfiltered = (filters is None or filters.is_empty()) and user_id is None and not narcotics_only
+        if unfiltered:
+            estimate = (await db.execute(text(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = 'history'::regclass"
+            ))).scalar()
+            if estimate is not None and estimate >= 0:
+                return int(estimate), True
+
+        stmt = select(history_model.History.id)
         if user_id is not None:
             stmt = stmt.where(history_model.History.discovered_by == str(user_id))
-
-        stmt = stmt.order_by(desc(history_model.History.created_at))
-
-        result = await db.execute(stmt)
-        histories = result.unique().all()
-
-        enhanced_histories = []
-        for history, location_wkt in histories:
-            history_dict = {c.name: getattr(history, c.name) for c in history.__table__.columns}
-
-            if 'location' in history_dict:
-                del history_dict['location']
-
-            if location_wkt:
-                wkt_match = re.search(r'POINT\(\s*([+-]?\d+\.?\d*)\s+([+-]?\d+\.?\d*)\s*\)', location_wkt)
-                if wkt_match:
-                    history_dict['longitude'] = float(wkt_match.group(1))
-                    history_dict['latitude'] = float(wkt_match.group(2))
-
-            if history_dict.get('discovery_date'):
-                history_dict['discovery_date'] = history_dict['discovery_date'].isoformat()
-            if history_dict.get('discovery_time'):
-                time_obj = history_dict['discovery_time']
-                history_dict['discovery_time'] = f"{time_obj.hour:02d}:{time_obj.minute:02d}"
-            if history_dict.get('created_at'):
-                history_dict['created_at'] = history_dict['created_at'].isoformat()
-            if history_dict.get('modified_at'):
-                history_dict['modified_at'] = history_dict['modified_at'].isoformat()
-
-            if history_dict.get('ai_confidence') is not None:
-                history_dict['ai_confidence'] = float(history_dict['ai_confidence'])
-
-            if history.exhibit:
-                exhibit_dict = {c.name: getattr(history.exhibit, c.name) for c in history.exhibit.__table__.columns}
-
-                # Narcotics
-                if getattr(history.exhibit, 'narcotics', None):
-                    narcotics_list = []
-                    for narc in (history.exhibit.narcotics if hasattr(history.exhibit.narcotics, '__iter__') else [history.exhibit.narcotics]):
-                        if hasattr(narc, '__table__'):
-                            narcotic_dict = {c.name: getattr(narc, c.name) for c in narc.__table__.columns}
-                            narcotics_list.append(narcotic_dict)
-                    exhibit_dict['narcotics'] = narcotics_list
-
-                # Firearms
-                if getattr(history.exhibit, 'firearms', None):
-                    firearms_list = []
-                    for firearm in (history.exhibit.firearms if hasattr(history.exhibit.firearms, '__iter__') else [history.exhibit.firearms]):
-                        if hasattr(firearm, '__table__'):
-                            firearm_dict = {c.name: getattr(firearm, c.name) for c in firearm.__table__.columns}
-                            firearms_list.append(firearm_dict)
-                    exhibit_dict['firearms'] = firearms_list
-
-                history_dict['exhibit'] = exhibit_dict
-
-            location_names = await get_location_names(db, history.subdistrict_id)
-
-            user_names = await get_discoverer_and_modifier_names(db, history.discovered_by, history.modified_by)
-
-            history_dict.update(location_names)
-            history_dict.update(user_names)
-
-            enhanced_histories.append(history_dict)
-
-        return enhanced_histories
+        if narcotics_only:
+            stmt = stmt.where(history_model.History.exhibit.has(Exhibit.category == NARCOTIC_CATEGORY))
+        stmt = apply_history_filters(stmt, filters).limit(cap + 1)
+
+        total = (await db.execute(select(func.count()).select_from(stmt.subquery()))).scalar_one()
+        return min(total, cap), total > cap
+
+    async def get_histories_json(
+        self,
+        db: AsyncSession,
+        user_id: Optional[str] = None,
+        filters: Optional[HistoryFilter] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        narcotics_only: bool = False,
+    ) -> Tuple[bytes, Optional[str]]:
+        stmt = apply_keyset(history_json_stmt(user_id, filters, narcotics_only), cursor, limit)
+        rows, next_cursor = self._split_page((await db.execute(stmt)).all(), limit, key=lambda row: row)
+        return ("[" + ",".join(row.row_json for row in rows) + "]").encode(), next_cursor
+
+    async def stream_histories_json(self, stmt, batch_size: int = JSON_BATCH_SIZE) -> AsyncIterator[bytes]:
+        """Yield a JSON array from ``history_json_stmt`` rows through a
+        server-side cursor. Opens its own session so it can outlive the request
+        dependency while the response streams."""
+        from app.config.db_config import AsyncSessionLocal
+
+        yield b"["
+        first = True
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(stmt.execution_options(yield_per=batch_size))
+            async for partition in result.partitions(batch_size):
+                chunk = ",".join(row.row_json for row in partition)
+                yield (chunk if first else "," + chunk).encode()
+                first = False
+        yield b"]"
 
     async def get_history_by_id(self, db: AsyncSession, history_id: int) -> Optional[Dict[str, Any]]:
         stmt = select(history_model.History, func.ST_AsText(history_model.History.location).label('location_wkt')).options(
@@ -137,83 +337,9 @@ class HistoryController:
 
             history_dict['exhibit'] = exhibit_dict
 
-        location_names = await get_location_names(db, history.subdistrict_id)
-
-        user_names = await get_discoverer_and_modifier_names(db, history.discovered_by, history.modified_by)
-
-        history_dict.update(location_names)
-        history_dict.update(user_names)
-
+        await self._attach_names(db, [(history_dict, history)])
         return history_dict
 
-    async def get_narcotic_histories(self, db: AsyncSession) -> List[Dict[str, Any]]:
-        stmt = select(history_model.History, func.ST_AsText(history_model.History.location).label('location_wkt')).options(
-            joinedload(history_model.History.exhibit).joinedload(Exhibit.narcotics)
-        ).where(history_model.History.exhibit.has(Exhibit.category == "ยาเสพติด"))
-
-        stmt = stmt.order_by(desc(history_model.History.created_at))
-
-        result = await db.execute(stmt)
-        histories = result.unique().all()
-
-        enhanced_histories = []
-        for history, location_wkt in histories:
-            history_dict = {c.name: getattr(history, c.name) for c in history.__table__.columns}
-
-            if 'location' in history_dict:
-                del history_dict['location']
-
-            if location_wkt:
-                wkt_match = re.search(r'POINT\(\s*([+-]?\d+\.?\d*)\s+([+-]?\d+\.?\d*)\s*\)', location_wkt)
-                if wkt_match:
-                    history_dict['longitude'] = float(wkt_match.group(1))
-                    history_dict['latitude'] = float(wkt_match.group(2))
-
-            if history_dict.get('discovery_date'):
-                history_dict['discovery_date'] = history_dict['discovery_date'].isoformat()
-            if history_dict.get('discovery_time'):
-                time_obj = history_dict['discovery_time']
-                history_dict['discovery_time'] = f"{time_obj.hour:02d}:{time_obj.minute:02d}"
-            if history_dict.get('created_at'):
-                history_dict['created_at'] = history_dict['created_at'].isoformat()
-            if history_dict.get('modified_at'):
-                history_dict['modified_at'] = history_dict['modified_at'].isoformat()
-
-            if history_dict.get('ai_confidence') is not None:
-                history_dict['ai_confidence'] = float(history_dict['ai_confidence'])
-
-            exhibit_dict = None
-            if history.exhibit:
-                exhibit_dict = {
-                    'id': history.exhibit.id,
-                    'category': history.exhibit.category,
-                    'subcategory': history.exhibit.subcategory,
-                }
-
-                narcotic_data = getattr(history.exhibit, 'narcotics', None) or None
-                if narcotic_data:
-                    narc = narcotic_data[0] if hasattr(narcotic_data, '__iter__') and len(narcotic_data) > 0 else narcotic_data
-                    if narc and hasattr(narc, '__table__'):
-                        narc_dict = {c.name: getattr(narc, c.name) for c in narc.__table__.columns}
-                        if narc_dict.get('weight_grams') is not None:
-                            try:
-                                narc_dict['weight_grams'] = float(narc_dict['weight_grams'])
-                            except Exception:
-                                pass
-                        exhibit_dict['narcotics'] = [narc_dict]
-
-                history_dict['exhibit'] = exhibit_dict
-
-            location_names = await get_location_names(db, history.subdistrict_id)
-            user_names = await get_discoverer_and_modifier_names(db, history.discovered_by, history.modified_by)
-
-            history_dict.update(location_names)
-            history_dict.update(user_names)
-
-            enhanced_histories.append(history_dict)
-
-        return enhanced_histories
-
     async def delete_history(self, db: AsyncSession, history_id: int) -> bool:
         stmt = select(history_model.History).where(history_model.History.id == history_id)
         result = await db.execute(stmt)
@@ -0,0 +1,102 @@
+import math
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, desc, cast, Date, Float
+from typing import List, Dict, Any, Optional
+
+from app.models.history_summary_model import HistorySummary
+from app.models.subdistrict_model import Subdistrict
+from app.models.district_model import District
+from app.models.province_model import Province
+from app.schemas.history_schema import HistoryFilter
+from app.services.history_summary_service import SUMMARY_CELL_DEGREES
+
+AREA_LEVELS = ("province", "district", "subdistrict")
+TIME_BUCKETS = ("day", "week", "month", "year")
+
+
+def apply_summary_filters(stmt, filters: Optional[HistoryFilter]):
+    S = HistorySummary
+    if filters is None:
+        return stmt
+
+    if filters.date_from is not None:
+        stmt = stmt.where(S.day >= filters.date_from)
+    if filters.date_to is not None:
+        stmt = stmt.where(S.day <= filters.date_to)
+    if filters.category:
+        stmt = stmt.where(S.category == filters.category)
+    if filters.subdistrict_id is not None:
+        stmt = stmt.where(S.subdistrict_id == filters.subdistrict_id)
+    if filters.district_id is not None:
+        stmt = stmt.where(S.subdistrict_id.in_(
+            select(Subdistrict.id).where(Subdistrict.district_id == filters.district_id)
+        ))
+    if filters.province_id is not None:
+        stmt = stmt.where(S.subdistrict_id.in_(
+            select(Subdistrict.id)
+            .join(District, District.id == Subdistrict.district_id)
+            .where(District.province_id == filters.province_id)
+        ))
+    if filters.bbox is not None:
+        # Cell-aligned: a cell counts when its south-west corner falls in the box.
+        min_lon, min_lat, max_lon, max_lat = filters.bbox
+        stmt = stmt.where(
+            S.cell_x.between(math.floor(min_lon / SUMMARY_CELL_DEGREES), math.floor(max_lon / SUMMARY_CELL_DEGREES)),
+            S.cell_y.between(math.floor(min_lat / SUMMARY_CELL_DEGREES), math.floor(max_lat / SUMMARY_CELL_DEGREES)),
+        )
+    return stmt
+
+
+async def count_by_area(db: AsyncSession, level: str, filters: Optional[HistoryFilter] = None) -> List[Dict[str, Any]]:
+    S = HistorySummary
+    incidents = func.sum(S.incidents).label("count")
+
+    if level == "subdistrict":
+        area_id, name = Subdistrict.id, Subdistrict.subdistrict_name
+    elif level == "district":
+        area_id, name = District.id, District.district_name
+    else:
+        area_id, name = Province.id, Province.province_name
+
+    stmt = select(area_id.label("id"), name.label("name"), incidents).join(Subdistrict, Subdistrict.id == S.subdistrict_id)
+    if level in ("district", "province"):
+        stmt = stmt.join(District, District.id == Subdistrict.district_id)
+    if level == "province":
+        stmt = stmt.join(Province, Province.id == District.province_id)
+
+    stmt = apply_summary_filters(stmt, filters).group_by(area_id, name).order_by(desc(incidents), area_id)
+    result = await db.execute(stmt)
+    return [{"id": row.id, "name": row.name, "count": int(row.count)} for row in result.all()]
+
+
+async def count_by_grid(db: AsyncSession, resolution: int = 1, filters: Optional[HistoryFilter] = None) -> Dict[str, Any]:
+    S = HistorySummary
+    gx = func.floor(cast(S.cell_x, Float) / resolution).label("gx")
+    gy = func.floor(cast(S.cell_y, Float) / resolution).label("gy")
+    incidents = func.sum(S.incidents).label("count")
+
+    stmt = apply_summary_filters(select(gx, gy, incidents), filters).group_by(gx, gy)
+    result = await db.execute(stmt)
+
+    size = SUMMARY_CELL_DEGREES * resolution
+    return {
+        "cell_degrees": size,
+        "cells": [
+            {
+                "longitude": round((row.gx + 0.5) * size, 6),
+                "latitude": round((row.gy + 0.5) * size, 6),
+                "count": int(row.count),
+            }
+            for row in result.all()
+        ],
+    }
+
+
+async def count_by_time(db: AsyncSession, bucket: str = "month", filters: Optional[HistoryFilter] = None) -> List[Dict[str, Any]]:
+    S = HistorySummary
+    period = cast(func.date_trunc(bucket, S.day), Date).label("period")
+    incidents = func.sum(S.incidents).label("count")
+
+    stmt = apply_summary_filters(select(period, incidents), filters).group_by(period).order_by(period)
+    result = await db.execute(stmt)
+    return [{"period": row.period.isoformat(), "count": int(row.count)} for row in result.all()]
@@ -1,31 +1,77 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from app.services.vector_service import VectorService
-import re
+import asyncio
+from app.services.vector_service import VectorService, VectorLike
+from app.services.vector_index_service import exact_order_expression, get_vector_index
+from app.services.vector_memory_index_service import get_memory_index
+
+# The ndarray is bound as-is and sent in pgvector's binary format by the codec
+# registered in db_config, so the vector never becomes Python floats or text.
+QUERY_VECTOR_SQL = "CAST(:query_vector AS vector)"
+
+def _result_row(narcotic_id: int, drug_type, drug_category, description, similarity: float) -> Dict[str, Any]:
+    return {
+        "narcotic_id": narcotic_id,
+        "name": drug_type or f"ยาเสพติด #{narcotic_id}",
+        "drug_type": drug_type,
+        "drug_category": drug_category,
+        "description": description,
+        "similarity": similarity
+    }
+
+async def _with_narcotic_details(db: AsyncSession, hits: List[Tuple[int, float]]) -> List[Dict[str, Any]]:
+    if not hits:
+        return []
+    rows = await db.execute(
+        text("SELECT id, drug_type, drug_category, effect FROM narcotics WHERE id = ANY(:ids)"),
+        {"ids": sorted({narcotic_id for narcotic_id, _ in hits})}
+    )
+    details = {row[0]: row[1:] for row in rows.all()}
+    return [
+        _result_row(narcotic_id, *details[narcotic_id], similarity)
+        for narcotic_id, similarity in hits
+        if narcotic_id in details
+    ]
 
 async def search_similar_narcotics_with_vector(
     db: AsyncSession,
-    vector: Optional[List[float]] = None,
+    vector: Optional[VectorLike] = None,
     vector_base64: Optional[str] = None,
     top_k: int = 3,
     similarity_threshold: float = 0.05,
-    debug: bool = False
+    debug: bool = False,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+    exact: bool = False
 ) -> List[Dict[str, Any]]:
-    if vector_base64:
-        vector = VectorService.decode_base64_vector(vector_base64)
+    query_vector = VectorService.build_vector_from_inputs(vector=vector, vector_base64=vector_base64)
 
-    if not vector or len(vector) == 0:
-        raise ValueError("Either vector or vector_base64 is required")
+    memory_index = get_memory_index()
+    if memory_index is not None:
+        if memory_index.ready:
+            hits = await asyncio.to_thread(memory_index.search, query_vector, top_k, similarity_threshold)
+            return await _with_narcotic_details(db, hits)
+        memory_index.fallbacks += 1
 
-    vector_str = VectorService.vector_to_pg_literal(vector)
-
-    if not re.match(r'^\[\s*-?\d+(\.\d+)?(?:\s*,\s*-?\d+(\.\d+)?)*\s*\]$', vector_str):
-        raise ValueError("Invalid vector format")
+    index = get_vector_index()
+    if exact or not await index.use_ann(db):
+        order_by = exact_order_expression("niv.image_vector", "(SELECT v FROM query_vector)")
+        candidates = top_k
+    else:
+        await index.apply_search_params(db, ef_search=ef_search, probes=probes)
+        order_by = index.order_expression("niv.image_vector", "(SELECT v FROM query_vector)")
+        candidates = index.candidate_limit(top_k)
 
     query = text(f"""
         WITH query_vector AS (
-            SELECT '{vector_str}'::vector AS v
+            SELECT {QUERY_VECTOR_SQL} AS v
+        ),
+        candidates AS MATERIALIZED (
+            SELECT niv.narcotic_id, niv.image_vector
+            FROM narcotics_image_vectors niv
+            ORDER BY {order_by}
+            LIMIT :candidates
         ),
         similarity_calc AS (
             SELECT 
@@ -33,13 +79,13 @@ async def search_similar_narcotics_with_vector(
                 n.drug_type as drug_type,
                 n.drug_category as drug_category,
                 n.effect as description,
-                1 - (niv.image_vector <=> (SELECT v FROM query_vector)) as similarity
+                1 - (c.image_vector <=> (SELECT v FROM query_vector)) as similarity
             FROM 
-                narcotics_image_vectors niv
+                candidates c
             JOIN 
-                narcotics n ON niv.narcotic_id = n.id
+                narcotics n ON c.narcotic_id = n.id
             ORDER BY 
-                niv.image_vector <=> (SELECT v FROM query_vector)
+                similarity DESC
             LIMIT :top_k
         )
         SELECT * FROM similarity_calc
@@ -48,20 +94,124 @@ async def search_similar_narcotics_with_vector(
 
     result = await db.execute(
         query,
-        {"top_k": top_k, "threshold": similarity_threshold}
+        {
+            "query_vector": query_vector,
+            "top_k": top_k,
+            "candidates": candidates,
+            "threshold": similarity_threshold
+        }
     )
     rows = result.mappings().all()
 
     similar_items = [
+        _result_row(row["narcotic_id"], row["drug_type"], row["drug_category"], row["description"], float(row["similarity"]))
+        for row in rows
+    ]
+
+    return similar_items
+
+AGGREGATES = {"max": "MAX", "mean": "AVG"}
+
+async def search_narcotics_aggregated(
+    db: AsyncSession,
+    vectors: List[VectorLike],
+    top_k: int = 3,
+    similarity_threshold: float = 0.05,
+    aggregate: str = "max",
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+    exact: bool = False
+) -> List[Dict[str, Any]]:
+    if aggregate not in AGGREGATES:
+        raise ValueError(f"aggregate must be one of {sorted(AGGREGATES)}")
+    if not vectors:
+        raise ValueError("At least one query vector is required")
+
+    queries = [VectorService.build_vector_from_inputs(vector=v) for v in vectors]
+    dim = len(queries[0])
+    if any(len(q) != dim for q in queries):
+        raise ValueError("All query vectors must have the same dimension")
+
+    index = get_vector_index()
+    if exact or not await index.use_ann(db):
+        order_by = exact_order_expression("niv.image_vector", "q.v")
+    else:
+        await index.apply_search_params(db, ef_search=ef_search, probes=probes)
+        order_by = index.order_expression("niv.image_vector", "q.v")
+    candidates = max(index.candidate_limit(top_k), top_k * 10)
+
+    # Every query vector is its own binary vector parameter, so the whole batch
+    # is a single statement and round trip. hits holds each query's nearest
+    # images; the aggregate is then taken over every stored image of the
+    # narcotics those hits belong to.
+    values = ", ".join(f"({i}, CAST(:q{i} AS vector))" for i in range(len(queries)))
+    query = text(f"""
+        WITH query_vectors AS (
+            SELECT q.query_index, q.v FROM (VALUES {values}) AS q(query_index, v)
+        ),
+        hits AS (
+            SELECT DISTINCT q.query_index, c.narcotic_id
+            FROM query_vectors q
+            CROSS JOIN LATERAL (
+                SELECT niv.narcotic_id
+                FROM narcotics_image_vectors niv
+                ORDER BY {order_by}
+                LIMIT :candidates
+            ) c
+        ),
+        aggregated AS (
+            SELECT
+                h.query_index,
+                h.narcotic_id,
+                {AGGREGATES[aggregate]}(1 - (niv.image_vector <=> q.v)) AS similarity,
+                MAX(1 - (niv.image_vector <=> q.v)) AS best_similarity,
+                COUNT(*) AS image_count
+            FROM hits h
+            JOIN query_vectors q ON q.query_index = h.query_index
+            JOIN narcotics_image_vectors niv ON niv.narcotic_id = h.narcotic_id
+            GROUP BY h.query_index, h.narcotic_id
+        ),
+        ranked AS (
+            SELECT a.*, ROW_NUMBER() OVER (PARTITION BY a.query_index ORDER BY a.similarity DESC) AS rank
+            FROM aggregated a
+            WHERE a.similarity > :threshold
+        )
+        SELECT
+            r.query_index,
+            r.narcotic_id,
+            n.drug_type,
+            n.drug_category,
+            n.effect AS description,
+            r.similarity,
+            r.best_similarity,
+            r.image_count
+        FROM ranked r
+        JOIN narcotics n ON n.id = r.narcotic_id
+        WHERE r.rank <= :top_k
+        ORDER BY r.query_index, r.rank
+    """)
+
+    result = await db.execute(
+        query,
         {
+            **{f"q{i}": q for i, q in enumerate(queries)},
+            "candidates": candidates,
+            "top_k": top_k,
+            "threshold": similarity_threshold
+        }
+    )
+
+    grouped: List[Dict[str, Any]] = [{"query_index": i, "results": []} for i in range(len(queries))]
+    for row in result.mappings().all():
+        grouped[row["query_index"]]["results"].append({
             "narcotic_id": row["narcotic_id"],
             "name": row["drug_type"] or f"ยาเสพติด #{row['narcotic_id']}",
             "drug_type": row["drug_type"],
             "drug_category": row["drug_category"],
             "description": row["description"],
-            "similarity": float(row["similarity"])
-        }
-        for row in rows
-    ]
+            "similarity": float(row["similarity"]),
+            "best_similarity": float(row["best_similarity"]),
+            "image_count": int(row["image_count"])
+        })
 
-    return similar_items
\ No newline at end of file
+    return grouped
@@ -1,28 +1,16 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Dict, Any
+from typing import Optional, Tuple
 from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from app.models.province_model import Province
-import json
+from app.services.geojson_service import geometry_json, json_array_text
 
-async def get_provinces(db: AsyncSession) -> List[Dict[str, Any]]:
-    query = (
-        select(
-            Province,
-            func.ST_AsGeoJSON(Province.geom).label("geometry_json")
-        )
-        .order_by(Province.province_name)
+async def get_provinces(db: AsyncSession, tolerance: Optional[float] = None) -> Tuple[str, int]:
+    row = func.json_build_object(
+        "id", Province.id,
+        "province_name", Province.province_name,
+        "geometry", geometry_json(Province.geom, tolerance),
     )
+    query = select(json_array_text(aggregate_order_by(row, Province.province_name)), func.count())
     result = await db.execute(query)
-    rows = result.all()
-
-    provinces_data = []
-    for province, geometry_json in rows:
-        province_dict = province.to_dict()
-        if geometry_json:
-            try:
-                province_dict["geometry"] = json.loads(geometry_json)
-            except json.JSONDecodeError:
-                province_dict["geometry"] = None
-        provinces_data.append(province_dict)
-
-    return provinces_data
+    return tuple(result.one())
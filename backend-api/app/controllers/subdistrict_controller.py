@@ -1,53 +1,32 @@
-import json
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from sqlalchemy.orm import selectinload
-from typing import List, Dict, Any, Optional
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from typing import Optional, Tuple
 from app.models.subdistrict_model import Subdistrict
 from app.models.district_model import District
+from app.services.geojson_service import geometry_json, json_array_text
 
 async def get_subdistricts(
     db: AsyncSession,
     district_id: Optional[int] = None,
-    province_id: Optional[int] = None
-) -> List[Dict[str, Any]]:
-    query = select(Subdistrict).options(
-        selectinload(Subdistrict.district).selectinload(District.province)
+    province_id: Optional[int] = None,
+    tolerance: Optional[float] = None
+) -> Tuple[str, int]:
+    row = func.json_build_object(
+        "id", Subdistrict.id,
+        "subdistrict_name", Subdistrict.subdistrict_name,
+        "district_id", Subdistrict.district_id,
+        "geometry", geometry_json(Subdistrict.geom, tolerance),
     )
+    query = select(
+        json_array_text(aggregate_order_by(row, Subdistrict.district_id, Subdistrict.subdistrict_name)),
+        func.count()
+    ).select_from(Subdistrict)
 
     if district_id is not None:
         query = query.where(Subdistrict.district_id == district_id)
     elif province_id is not None:
-        query = query.join(District).where(District.province_id == province_id)
-
-    query = query.order_by(
-        Subdistrict.district_id,
-        Subdistrict.subdistrict_name
-    )
+        query = query.join(District, District.id == Subdistrict.district_id).where(District.province_id == province_id)
 
     result = await db.execute(query)
-    subdistricts = result.scalars().all()
-
-    subdistricts_data = []
-
-    subdistrict_ids_with_geom = [s.id for s in subdistricts if s.geom]
-    geom_map = {}
-    if subdistrict_ids_with_geom:
-        geom_query = select(
-            Subdistrict.id,
-            func.ST_AsGeoJSON(Subdistrict.geom)
-        ).where(Subdistrict.id.in_(subdistrict_ids_with_geom))
-        geom_result = await db.execute(geom_query)
-        for sid, geom_json in geom_result.all():
-            try:
-                geom_map[sid] = json.loads(geom_json) if geom_json else None
-            except json.JSONDecodeError:
-                geom_map[sid] = None
-
-    for subdistrict in subdistricts:
-        subdistrict_dict = subdistrict.to_dict()
-        if subdistrict.geom:
-            subdistrict_dict["geometry"] = geom_map.get(subdistrict.id)
-        subdistricts_data.append(subdistrict_dict)
-
-    return subdistricts_data
\ No newline at end of file
+    return tuple(result.one())
@@ -1,3 +1,5 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import app.models
@@ -6,11 +8,44 @@ from app.routes import (
     province_router, district_router, subdistrict_router, 
     exhibit_router, narcotic_router, drug_form_router,
     inference_router, vector_router, history_router,
-    firearm_router
+    firearm_router, tiles_router, history_stats_router
 )
+from app.services.ai_client_service import AIServiceClient
+from app.services.vector_service import verify_embedding_dim
+from app.services.vector_memory_index_service import warm_memory_index
+from app.services.geometry_cache_service import get_geometry_cache, warm_geometry_cache
+from app.services.history_summary_service import install_history_summary_on_startup
+from app.services.auth_cache_service import get_token_cache
+from app.config.db_config import async_engine, get_pool_stats
+from app.middleware import UploadSizeLimitMiddleware
+from app.config.ai_config import get_max_upload_bytes
+
+AI_PROXY_PATHS = (
+    "/api/object-classify",
+    "/api/firearm-brand-classify",
+    "/api/firearm-model-classify",
+    "/api/firearm-analyze",
+    "/api/convert_image_ref_to_vector",
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.ai_client = AIServiceClient.from_env()
+    await verify_embedding_dim(app.state.ai_client)
+    warm_task = asyncio.create_task(warm_memory_index())
+    geometry_task = asyncio.create_task(warm_geometry_cache())
+    summary_task = asyncio.create_task(install_history_summary_on_startup())
+    try:
+        yield
+    finally:
+        warm_task.cancel()
+        geometry_task.cancel()
+        summary_task.cancel()
+        await app.state.ai_client.aclose()
+        await async_engine.dispose()
 
 def create_app() -> FastAPI:
-    app = FastAPI()
+    app = FastAPI(lifespan=lifespan)
 
     allowed_origins = [
         "http://localhost",
@@ -21,12 +56,16 @@ def create_app() -> FastAPI:
         "http://ai-service:8080"
     ]
 
+    # Registered before CORS so CORS wraps it (the last middleware added is
+    # the outermost): an early 413 still carries the CORS headers browsers need.
+    app.add_middleware(UploadSizeLimitMiddleware, max_bytes=get_max_upload_bytes(), paths=AI_PROXY_PATHS)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=allowed_origins,
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "X-Total-Count", "X-Total-Is-Estimate"],
     )
 
     app.include_router(auth_router, prefix="/api")
@@ -40,13 +79,37 @@ def create_app() -> FastAPI:
     app.include_router(drug_form_router, prefix="/api")
     app.include_router(inference_router, prefix="/api")
     app.include_router(vector_router, prefix="/api")
+    app.include_router(history_stats_router, prefix="/api")
     app.include_router(history_router, prefix="/api")
     app.include_router(firearm_router, prefix="/api")
+    app.include_router(tiles_router, prefix="/api")
 
     @app.get("/", tags=["Health"])
     async def main():
         return {"message": "Raven API เริ่มต้นทำงานแล้ว"}
 
+    @app.get("/metrics/ai-client", tags=["Health"])
+    async def ai_client_metrics():
+        return app.state.ai_client.get_stats()
+
+    @app.get("/metrics/db-pool", tags=["Health"])
+    async def db_pool_metrics():
+        return get_pool_stats()
+
+    @app.get("/metrics/auth-cache", tags=["Health"])
+    async def auth_cache_metrics():
+        return get_token_cache().get_stats()
+
+    @app.get("/metrics/geometry-cache", tags=["Health"])
+    async def geometry_cache_metrics():
+        return get_geometry_cache().get_stats()
+
+    @app.post("/metrics/geometry-cache/invalidate", tags=["Health"])
+    async def invalidate_geometry_cache():
+        cache = get_geometry_cache()
+        cache.invalidate()
+        return cache.get_stats()
+
     return app
 
 app = create_app()
\ No newline at end of file
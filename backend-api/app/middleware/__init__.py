@@ -0,0 +1 @@
+from .upload_limit import UploadSizeLimitMiddleware
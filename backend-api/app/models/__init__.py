@@ -1,5 +1,6 @@
 from .exhibit_model import Exhibit
 from .history_model import History
+from .history_summary_model import HistorySummary
 from .narcotic_model import (
     Narcotic,
     ChemicalCompound,
@@ -22,6 +23,7 @@ from .user_permission_model import UserPermission
 __all__ = [
     "Exhibit",
     "History",
+    "HistorySummary",
     "Narcotic",
     "ChemicalCompound",
     "NarcoticExampleImage",
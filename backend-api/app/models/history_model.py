@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Time, ForeignKey, Text, DateTime, func, DECIMAL
+from sqlalchemy import Column, Integer, String, Date, Time, ForeignKey, Text, DateTime, func, DECIMAL, Index
 from sqlalchemy.orm import relationship
 from geoalchemy2 import Geometry
 from app.models.base import Base
@@ -20,6 +20,16 @@ class History(Base):
     location = Column(Geometry('POINT', srid=4326), nullable=False)
     ai_confidence = Column(DECIMAL(5, 2), nullable=True)
 
+    # Keyset pagination orders by (created_at DESC, id DESC); the filtered
+    # listings reuse the same ordering behind their equality prefix.
+    __table_args__ = (
+        Index("ix_history_created_at_id", "created_at", "id"),
+        Index("ix_history_discovered_by_created_at_id", "discovered_by", "created_at", "id"),
+        Index("ix_history_subdistrict_created_at_id", "subdistrict_id", "created_at", "id"),
+        Index("ix_history_exhibit_id", "exhibit_id"),
+        Index("ix_history_discovery_date", "discovery_date"),
+    )
+
     # Relationships
     exhibit = relationship("Exhibit", back_populates="histories")
     subdistrict = relationship("Subdistrict", back_populates="histories")
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, Date, Index
+from app.models.base import Base
+
+class HistorySummary(Base):
+    """Incident counts per (day, subdistrict, category, grid cell), kept in sync
+    with ``history`` by database triggers (see history_summary_service)."""
+    __tablename__ = "history_summary"
+
+    day = Column(Date, primary_key=True)
+    subdistrict_id = Column(Integer, primary_key=True)
+    category = Column(String, primary_key=True)
+    cell_x = Column(Integer, primary_key=True)
+    cell_y = Column(Integer, primary_key=True)
+    incidents = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_history_summary_subdistrict_day", "subdistrict_id", "day"),
+        Index("ix_history_summary_cell", "cell_x", "cell_y"),
+    )
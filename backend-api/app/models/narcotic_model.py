@@ -4,6 +4,7 @@ from sqlalchemy import (
 )
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from pgvector.sqlalchemy import Vector
+from app.config.ai_config import get_embedding_dim
 
 class ChemicalCompound(Base):
     __tablename__ = "chemical_compounds"
@@ -89,7 +90,7 @@ class NarcoticImageVector(Base):
     image_id: Mapped[int] = mapped_column(
         ForeignKey("narcotic_example_images.id", ondelete="CASCADE"), nullable=False
     )
-    image_vector: Mapped[bytes | None] = mapped_column(Vector(16000))
+    image_vector: Mapped[bytes | None] = mapped_column(Vector(get_embedding_dim()))
 
     narcotic = relationship("Narcotic", back_populates="image_vectors")
     image = relationship("NarcoticExampleImage", back_populates="image_vectors")
@@ -10,4 +10,6 @@ from .exhibit import router as exhibit_router
 from .inference import router as inference_router
 from .vector import router as vector_router
 from .history import router as history_router
-from .firearm import router as firearm_router
\ No newline at end of file
+from .firearm import router as firearm_router
+from .tiles import router as tiles_router
+from .history_stats import router as history_stats_router
\ No newline at end of file
@@ -1,16 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Response
 from fastapi.security import OAuth2PasswordRequestForm
 from datetime import timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.schemas.user_schema import Token
 from app.controllers.auth_controller import authenticate_user, create_access_token
 from app.config.auth_config import ACCESS_TOKEN_EXPIRE_MINUTES
+from app.config.db_config import get_async_db
 
 router = APIRouter(tags=["auth"])
 
 @router.post("/token", response_model=Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), response: Response = None):
-    user = authenticate_user(form_data.username, form_data.password)
+async def login(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    response: Response = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    user = await authenticate_user(form_data.username, form_data.password, db)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1,9 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from app.config.db_config import get_async_db
 from app.schemas.district_schema import District
-from app.controllers.district_controller import get_districts
+from app.services.geometry_cache_service import get_geometry_cache
 
 router = APIRouter(tags=["geography"])
 
@@ -15,16 +15,19 @@ router = APIRouter(tags=["geography"])
     description="ดึงข้อมูลอำเภอทั้งหมด หรือคัดกรองจาก ID ของจังหวัด"
 )
 async def read_districts(
+    request: Request,
     province_id: Optional[int] = Query(
         default=None,
         description="คัดกรองอำเภอด้วย ID ของจังหวัด"
     ),
+    zoom: Optional[int] = Query(None, ge=0, le=22, description="ระดับซูมของแผนที่ เพื่อใช้ขอบเขตแบบย่อ (ไม่ระบุ = ความละเอียดเต็ม)"),
     db: AsyncSession = Depends(get_async_db)
-) -> List[District]:
-    districts = await get_districts(db, province_id)
-    if province_id is not None and not districts:
+):
+    cache = get_geometry_cache()
+    districts = await cache.get(db, "districts", zoom, province_id=province_id)
+    if province_id is not None and not districts.count:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"ไม่พบข้อมูลอำเภอจาก ID จังหวัดที่ส่งมา: {province_id}"
         )
-    return districts
\ No newline at end of file
+    return districts.respond(request, cache.max_age)
\ No newline at end of file
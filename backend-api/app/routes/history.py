@@ -1,24 +1,127 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import desc
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from typing import Dict, List, Optional
+from datetime import date
 
-from app.schemas.history_schema import HistoryWithExhibit
+from app.schemas.history_schema import HistoryWithExhibit, HistoryFilter
 from app.config.db_config import get_async_db
-from app.controllers.history_controller import HistoryController
+from app.controllers.history_controller import HistoryController, history_json_stmt, apply_keyset
+from app.models.history_model import History as HistoryModel
+from app.services.history_export_service import EXPORT_FORMATS
+from app.services.tile_service import get_tile_service
 
 router = APIRouter(tags=["history"])
 
 history_controller = HistoryController()
 
+MAX_PAGE_SIZE = 500
+
+
+def history_filters(
+    date_from: Optional[date] = Query(None, description="discovery_date >= date_from"),
+    date_to: Optional[date] = Query(None, description="discovery_date <= date_to"),
+    category: Optional[str] = Query(None, description="Exhibit category"),
+    subdistrict_id: Optional[int] = Query(None),
+    district_id: Optional[int] = Query(None),
+    province_id: Optional[int] = Query(None),
+    discovered_by: Optional[str] = Query(None, description="user_id of the discoverer"),
+    bbox: Optional[str] = Query(None, description="minLon,minLat,maxLon,maxLat (EPSG:4326)"),
+) -> HistoryFilter:
+    try:
+        return HistoryFilter(
+            date_from=date_from,
+            date_to=date_to,
+            category=category,
+            subdistrict_id=subdistrict_id,
+            district_id=district_id,
+            province_id=province_id,
+            discovered_by=discovered_by,
+            bbox=bbox,
+        )
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+
+
+def page_headers(next_cursor: Optional[str], total: Optional[tuple] = None) -> Dict[str, str]:
+    headers = {}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if total is not None:
+        headers["X-Total-Count"] = str(total[0])
+        headers["X-Total-Is-Estimate"] = "true" if total[1] else "false"
+    return headers
+
+
+async def list_histories_response(
+    db: AsyncSession,
+    filters: HistoryFilter,
+    limit: Optional[int],
+    cursor: Optional[str],
+    include_total: bool,
+    user_id: Optional[str] = None,
+    narcotics_only: bool = False,
+) -> Response:
+    # Rows are serialized by PostgreSQL (history_json_stmt) and passed through
+    # as bytes; response_model only documents the shape.
+    total = None
+    if include_total:
+        total = await history_controller.count_histories(db, filters, user_id=user_id, narcotics_only=narcotics_only)
+    try:
+        if limit is not None:
+            body, next_cursor = await history_controller.get_histories_json(
+                db, user_id, filters, limit=limit, cursor=cursor, narcotics_only=narcotics_only
+            )
+            return Response(content=body, media_type="application/json", headers=page_headers(next_cursor, total))
+        stmt = apply_keyset(history_json_stmt(user_id, filters, narcotics_only), cursor, None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(
+        history_controller.stream_histories_json(stmt),
+        media_type="application/json",
+        headers=page_headers(None, total),
+    )
+
+
 @router.get("/history", response_model=List[HistoryWithExhibit])
-async def get_all_histories(user_id: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
-    histories = await history_controller.get_all_histories(db, user_id)
-    return histories
+async def get_all_histories(
+    user_id: Optional[str] = None,
+    filters: HistoryFilter = Depends(history_filters),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; omit to return every row"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    include_total: bool = Query(False, description="Add X-Total-Count (estimated for large results)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await list_histories_response(db, filters, limit, cursor, include_total, user_id=user_id)
 
 @router.get("/history/narcotics", response_model=List[HistoryWithExhibit])
-async def get_narcotic_histories(db: AsyncSession = Depends(get_async_db)):
-    histories = await history_controller.get_narcotic_histories(db)
-    return histories
+async def get_narcotic_histories(
+    filters: HistoryFilter = Depends(history_filters),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; omit to return every row"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    include_total: bool = Query(False, description="Add X-Total-Count (estimated for large results)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await list_histories_response(db, filters, limit, cursor, include_total, narcotics_only=True)
+
+@router.get("/history/export")
+async def export_histories(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|geojson)$"),
+    user_id: Optional[str] = None,
+    narcotics_only: bool = False,
+    filters: HistoryFilter = Depends(history_filters),
+):
+    build_stmt, writer, media_type, extension = EXPORT_FORMATS[format]
+    stmt = build_stmt(user_id, filters, narcotics_only).order_by(
+        desc(HistoryModel.created_at), desc(HistoryModel.id)
+    )
+    return StreamingResponse(
+        writer(stmt),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="history-{date.today().isoformat()}.{extension}"'},
+    )
 
 @router.get("/history/{history_id}", response_model=HistoryWithExhibit)
 async def get_history_by_id(history_id: int, db: AsyncSession = Depends(get_async_db)):
@@ -32,5 +135,6 @@ async def delete_history_endpoint(history_id: int, db: AsyncSession = Depends(ge
     deleted = await history_controller.delete_history(db, history_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="History record not found")
+    get_tile_service().invalidate("history")
     
     return {"message": "History record deleted successfully"}
\ No newline at end of file
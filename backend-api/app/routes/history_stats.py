@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.db_config import get_async_db
+from app.schemas.history_schema import HistoryFilter
+from app.routes.history import history_filters
+from app.controllers.history_stats_controller import count_by_area, count_by_grid, count_by_time
+from app.services.history_summary_service import history_summary_installed
+
+
+async def require_history_summary(db: AsyncSession = Depends(get_async_db)) -> None:
+    if not await history_summary_installed(db):
+        raise HTTPException(
+            status_code=503,
+            detail="History statistics are unavailable: the history_summary table is not installed yet. "
+                   "It is created at startup, or run `python -m scripts.install_history_summary`."
+        )
+
+
+router = APIRouter(tags=["history-stats"], dependencies=[Depends(require_history_summary)])
+
+
+def summary_filters(filters: HistoryFilter = Depends(history_filters)) -> HistoryFilter:
+    if filters.discovered_by:
+        raise HTTPException(status_code=400, detail="discovered_by is not supported by aggregated statistics")
+    return filters
+
+
+@router.get("/history/stats/areas")
+async def get_counts_by_area(
+    level: str = Query("province", pattern="^(province|district|subdistrict)$"),
+    filters: HistoryFilter = Depends(summary_filters),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await count_by_area(db, level, filters)
+
+
+@router.get("/history/stats/grid")
+async def get_counts_by_grid(
+    resolution: int = Query(1, ge=1, le=100, description="Cell size as a multiple of the base summary cell"),
+    filters: HistoryFilter = Depends(summary_filters),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await count_by_grid(db, resolution, filters)
+
+
+@router.get("/history/stats/timeline")
+async def get_counts_by_time(
+    bucket: str = Query("month", pattern="^(day|week|month|year)$"),
+    filters: HistoryFilter = Depends(summary_filters),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await count_by_time(db, bucket, filters)
@@ -1,163 +1,98 @@
 import httpx
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
 from typing import Dict, Any
-from app.config.ai_config import get_ai_service_url
+from app.services.ai_client_service import AIServiceClient, AIServiceBusyError, get_ai_client, upload_part
 
 router = APIRouter(tags=["inference"])
 
-@router.post("/object-classify", response_model=Dict[str, Any])
-async def analyze_image(image: UploadFile = File(...)):
-    ai_service_url = get_ai_service_url()
-    target_url = f"{ai_service_url}/api/object-classify"
-    
+async def _forward(client: AIServiceClient, path: str, **kwargs: Any) -> Dict[str, Any]:
     try:
-        file_content = await image.read()
-        
-        async with httpx.AsyncClient(timeout=300.0) as client:
-            try:
-                response = await client.post(
-                    target_url,
-                    files={"image": (image.filename, file_content, image.content_type)},
-                    headers={
-                        "Accept": "application/json",
-                        "User-Agent": "Backend-API/1.0"
-                    },
-                    timeout=300.0
-                )
-            except httpx.TimeoutException:
-                raise HTTPException(
-                    status_code=504,
-                    detail="AI service request timed out after 300 seconds"
-                )
-            except httpx.ConnectError as conn_exc:
-                raise HTTPException(
-                    status_code=503,
-                    detail=f"Could not connect to AI service: {str(conn_exc)}"
-                )
-            
-            if response.status_code != 200:
-                text = (response.text or "")[:1000]
-                raise HTTPException(
-                    status_code=response.status_code, 
-                    detail=f"AI service returned {response.status_code}: {text}"
-                )
-            
-            try:
-                response_data = response.json()
-            except ValueError:
-                snippet = (response.text or "")[:1000]
-                raise HTTPException(
-                    status_code=502,
-                    detail=f"AI service returned non-JSON response: {snippet}"
-                )
-
-            if not isinstance(response_data, dict):
-                raise HTTPException(status_code=502, detail="AI service returned unexpected response type")
-
-            return response_data
-            
-    except httpx.RequestError as exc:
+        response = await client.post(path, headers={"Accept": "application/json"}, **kwargs)
+    except AIServiceBusyError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    except httpx.TimeoutException:
         raise HTTPException(
-            status_code=503, 
-            detail=f"AI service unavailable: {str(exc)}"
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail="Internal server error"
+            status_code=504,
+            detail=f"AI service request timed out after {client.timeout_for(path):.0f} seconds"
         )
+    except httpx.ConnectError as conn_exc:
+        raise HTTPException(status_code=503, detail=f"Could not connect to AI service: {str(conn_exc)}")
+    except httpx.RequestError as exc:
+        raise HTTPException(status_code=503, detail=f"AI service unavailable: {str(exc)}")
 
-@router.post("/firearm-brand-classify", response_model=Dict[str, Any])
-async def firearm_brand_classify(image: UploadFile = File(...)):
-    ai_service_url = get_ai_service_url()
-    target_url = f"{ai_service_url}/api/firearm-brand-classify"
+    if response.status_code != 200:
+        text = (response.text or "")[:1000]
+        raise HTTPException(status_code=response.status_code, detail=f"AI service returned {response.status_code}: {text}")
 
     try:
-        file_content = await image.read()
+        response_data = response.json()
+    except ValueError:
+        snippet = (response.text or "")[:1000]
+        raise HTTPException(status_code=502, detail=f"AI service returned non-JSON response: {snippet}")
 
-        async with httpx.AsyncClient(timeout=300.0) as client:
-            try:
-                response = await client.post(
-                    target_url,
-                    files={"image": (image.filename, file_content, image.content_type)},
-                    headers={
-                        "Accept": "application/json",
-                        "User-Agent": "Backend-API/1.0"
-                    },
-                    timeout=300.0
-                )
-            except httpx.TimeoutException:
-                raise HTTPException(status_code=504, detail="AI service request timed out after 300 seconds")
-            except httpx.ConnectError as conn_exc:
-                raise HTTPException(status_code=503, detail=f"Could not connect to AI service: {str(conn_exc)}")
+    if not isinstance(response_data, dict):
+        raise HTTPException(status_code=502, detail="AI service returned unexpected response type")
 
-            if response.status_code != 200:
-                text = (response.text or "")[:1000]
-                raise HTTPException(status_code=response.status_code, detail=f"AI service returned {response.status_code}: {text}")
+    return response_data
 
-            try:
-                response_data = response.json()
-            except ValueError:
-                snippet = (response.text or "")[:1000]
-                raise HTTPException(status_code=502, detail=f"AI service returned non-JSON response: {snippet}")
-
-            if not isinstance(response_data, dict):
-                raise HTTPException(status_code=502, detail="AI service returned unexpected response type")
-
-            return response_data
+@router.post("/object-classify", response_model=Dict[str, Any])
+async def analyze_image(image: UploadFile = File(...), client: AIServiceClient = Depends(get_ai_client)):
+    try:
+        return await _forward(
+            client,
+            "/api/object-classify",
+            files={"image": upload_part(image)}
+        )
+    except HTTPException:
+        raise
+    except Exception:
+        raise HTTPException(status_code=500, detail="Internal server error")
 
-    except httpx.RequestError as exc:
-        raise HTTPException(status_code=503, detail=f"AI service unavailable: {str(exc)}")
+@router.post("/firearm-brand-classify", response_model=Dict[str, Any])
+async def firearm_brand_classify(image: UploadFile = File(...), client: AIServiceClient = Depends(get_ai_client)):
+    try:
+        return await _forward(
+            client,
+            "/api/firearm-brand-classify",
+            files={"image": upload_part(image)}
+        )
     except HTTPException:
         raise
     except Exception:
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/firearm-model-classify", response_model=Dict[str, Any])
-async def firearm_model_classify(brand: str = Form(...), file: UploadFile = File(...)):
-    ai_service_url = get_ai_service_url()
-    target_url = f"{ai_service_url}/api/firearm-model-classify"
-
+async def firearm_model_classify(
+    brand: str = Form(...),
+    file: UploadFile = File(...),
+    client: AIServiceClient = Depends(get_ai_client)
+):
     try:
-        file_content = await file.read()
-
-        async with httpx.AsyncClient(timeout=300.0) as client:
-            try:
-                response = await client.post(
-                    target_url,
-                    data={"brand": brand},
-                    files={"file": (file.filename, file_content, file.content_type)},
-                    headers={
-                        "Accept": "application/json",
-                        "User-Agent": "Backend-API/1.0"
-                    },
-                    timeout=300.0
-                )
-            except httpx.TimeoutException:
-                raise HTTPException(status_code=504, detail="AI service request timed out after 300 seconds")
-            except httpx.ConnectError as conn_exc:
-                raise HTTPException(status_code=503, detail=f"Could not connect to AI service: {str(conn_exc)}")
-
-            if response.status_code != 200:
-                text = (response.text or "")[:1000]
-                raise HTTPException(status_code=response.status_code, detail=f"AI service returned {response.status_code}: {text}")
-
-            try:
-                response_data = response.json()
-            except ValueError:
-                snippet = (response.text or "")[:1000]
-                raise HTTPException(status_code=502, detail=f"AI service returned non-JSON response: {snippet}")
-
-            if not isinstance(response_data, dict):
-                raise HTTPException(status_code=502, detail="AI service returned unexpected response type")
-
-            return response_data
+        return await _forward(
+            client,
+            "/api/firearm-model-classify",
+            data={"brand": brand},
+            files={"file": upload_part(file)}
+        )
+    except HTTPException:
+        raise
+    except Exception:
+        raise HTTPException(status_code=500, detail="Internal server error")
 
-    except httpx.RequestError as exc:
-        raise HTTPException(status_code=503, detail=f"AI service unavailable: {str(exc)}")
+@router.post("/firearm-analyze", response_model=Dict[str, Any])
+async def firearm_analyze(
+    image: UploadFile = File(...),
+    include_crops: bool = Form(True),
+    client: AIServiceClient = Depends(get_ai_client)
+):
+    try:
+        return await _forward(
+            client,
+            "/api/firearm-analyze",
+            data={"include_crops": str(include_crops).lower()},
+            files={"image": upload_part(image)}
+        )
     except HTTPException:
         raise
     except Exception:
-        raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal server error")
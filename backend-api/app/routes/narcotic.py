@@ -1,4 +1,4 @@
-from fastapi import APIRouter, status, Depends, HTTPException, Body
+from fastapi import APIRouter, status, Depends, HTTPException, Body, Request, Query
 from typing import List, Optional, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.config.db_config import get_async_db
@@ -6,7 +6,9 @@ from app.schemas.narcotic_pill_schema import NarcoticPill
 from app.schemas.narcotic_schema import NarcoticWithRelations, NarcoticCreate
 from app.controllers.exhibit_controller import ExhibitController
 from app.controllers.narcotic_controller import NarcoticController
-from app.controllers.narcotic_image_vector_controller import search_similar_narcotics_with_vector
+from app.controllers.narcotic_image_vector_controller import search_similar_narcotics_with_vector, search_narcotics_aggregated
+from app.services.vector_service import VectorService
+from app.services.vector_memory_index_service import get_memory_index
 
 router = APIRouter(tags=["narcotics"])
 
@@ -123,6 +125,9 @@ async def search_similar_narcotics(
     vector_base64: str = Body(None),
     top_k: int = Body(3),
     similarity_threshold: float = Body(0.05),
+    ef_search: Optional[int] = Body(None, gt=0, le=1000),
+    probes: Optional[int] = Body(None, gt=0, le=1000),
+    exact: bool = Body(False),
     db: AsyncSession = Depends(get_async_db)
 ):
     try:
@@ -131,7 +136,71 @@ async def search_similar_narcotics(
             vector=vector,
             vector_base64=vector_base64,
             top_k=top_k,
-            similarity_threshold=similarity_threshold
+            similarity_threshold=similarity_threshold,
+            ef_search=ef_search,
+            probes=probes,
+            exact=exact
+        )
+        return {"results": results}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/search-vector/raw", response_model=Dict[str, List[Dict[str, Any]]])
+async def search_similar_narcotics_raw(
+    request: Request,
+    top_k: int = Query(3, gt=0),
+    similarity_threshold: float = Query(0.05),
+    ef_search: Optional[int] = Query(None, gt=0, le=1000),
+    probes: Optional[int] = Query(None, gt=0, le=1000),
+    exact: bool = Query(False),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if not request.headers.get("content-type", "").startswith("application/octet-stream"):
+        raise HTTPException(status_code=415, detail="Body must be application/octet-stream (little-endian float32)")
+    try:
+        vector = VectorService.decode_vector_bytes(await request.body())
+        results = await search_similar_narcotics_with_vector(
+            db=db,
+            vector=vector,
+            top_k=top_k,
+            similarity_threshold=similarity_threshold,
+            ef_search=ef_search,
+            probes=probes,
+            exact=exact
+        )
+        return {"results": results}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/search-vector/aggregate", response_model=Dict[str, List[Dict[str, Any]]])
+async def search_similar_narcotics_aggregated(
+    vectors: Optional[List[List[float]]] = Body(None),
+    vectors_base64: Optional[List[str]] = Body(None),
+    top_k: int = Body(3, gt=0),
+    similarity_threshold: float = Body(0.05),
+    aggregate: str = Body("max"),
+    ef_search: Optional[int] = Body(None, gt=0, le=1000),
+    probes: Optional[int] = Body(None, gt=0, le=1000),
+    exact: bool = Body(False),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        queries = [VectorService.decode_base64_vector(v) for v in vectors_base64 or []] + list(vectors or [])
+        if len(queries) > 32:
+            raise ValueError("At most 32 query vectors per request")
+        results = await search_narcotics_aggregated(
+            db=db,
+            vectors=queries,
+            top_k=top_k,
+            similarity_threshold=similarity_threshold,
+            aggregate=aggregate,
+            ef_search=ef_search,
+            probes=probes,
+            exact=exact
         )
         return {"results": results}
     except ValueError as e:
@@ -148,6 +217,9 @@ async def delete_narcotic_by_id(
     success = await narcotic_controller.delete_narcotic(narcotic_id)
     if not success:
         raise HTTPException(status_code=404, detail="Narcotic not found")
+    memory_index = get_memory_index()
+    if memory_index is not None:
+        memory_index.remove_narcotic(narcotic_id)
     return None
 
 @router.post("/narcotics/images/vector/save", status_code=status.HTTP_201_CREATED)
@@ -174,6 +246,9 @@ async def save_image_vector(
 
     try:
         db_vector = await narcotic_controller.add_image_vector(int(narcotic_id), int(image_id), vector_data)
+        memory_index = get_memory_index()
+        if memory_index is not None:
+            memory_index.add(db_vector.id, int(narcotic_id), vector_data)
         return {
             "success": True,
             "vector_id": getattr(db_vector, "id", None),
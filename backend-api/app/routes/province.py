@@ -1,24 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 from app.config.db_config import get_async_db
 from app.schemas.province_schema import Province
-from app.controllers.province_controller import get_provinces
+from app.services.geometry_cache_service import get_geometry_cache
 
 router = APIRouter(tags=["geography"])
 
 @router.get(
     "/provinces",
-    response_model=list[Province],
+    response_model=List[Province],
     status_code=status.HTTP_200_OK,
     summary="ดึงข้อมูลจังหวัดทั้งหมด",
     response_description="แสดงรายการจังหวัด"
 )
-async def read_provinces(db: AsyncSession = Depends(get_async_db)) -> list[Province]:
-    provinces = await get_provinces(db)
-    if provinces is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="ไม่พบข้อมูลจังหวัด"
-        )
-    return provinces
\ No newline at end of file
+async def read_provinces(
+    request: Request,
+    zoom: Optional[int] = Query(None, ge=0, le=22, description="ระดับซูมของแผนที่ เพื่อใช้ขอบเขตแบบย่อ (ไม่ระบุ = ความละเอียดเต็ม)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    cache = get_geometry_cache()
+    provinces = await cache.get(db, "provinces", zoom)
+    return provinces.respond(request, cache.max_age)
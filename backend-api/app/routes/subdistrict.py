@@ -1,9 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from app.config.db_config import get_async_db
 from app.schemas.subdistrict_schema import Subdistrict
-from app.controllers.subdistrict_controller import get_subdistricts
+from app.services.geometry_cache_service import get_geometry_cache
 
 router = APIRouter(tags=["geography"])
 
@@ -15,12 +15,15 @@ router = APIRouter(tags=["geography"])
     description="ดึงข้อมูลตำบลทั้งหมดจาก Database หรือคัดกรองจาก ID ของอำเภอ หรือจังหวัด"
 )
 async def read_subdistricts(
+    request: Request,
     district_id: Optional[int] = Query(None, description="คัดกรองตำบลด้วย ID ของอำเภอ"),
     province_id: Optional[int] = Query(None, description="คัดกรองตำบลด้วย ID ของจังหวัด"),
+    zoom: Optional[int] = Query(None, ge=0, le=22, description="ระดับซูมของแผนที่ เพื่อใช้ขอบเขตแบบย่อ (ไม่ระบุ = ความละเอียดเต็ม)"),
     db: AsyncSession = Depends(get_async_db)
-) -> list[Subdistrict]:
-    subdistricts = await get_subdistricts(db, district_id, province_id)
-    if (district_id or province_id) and not subdistricts:
+):
+    cache = get_geometry_cache()
+    subdistricts = await cache.get(db, "subdistricts", zoom, district_id=district_id, province_id=province_id)
+    if (district_id or province_id) and not subdistricts.count:
         filters = []
         if district_id:
             filters.append(f"ID ของอำเภอ: {district_id}")
@@ -30,4 +33,4 @@ async def read_subdistricts(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"ไม่พบข้อมูลตำบลสำหรับ {' และ '.join(filters)}"
         )
-    return subdistricts
+    return subdistricts.respond(request, cache.max_age)
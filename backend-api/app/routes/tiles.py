@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from app.config.db_config import get_async_db
+from app.services.tile_service import LAYERS, get_tile_service, tile_bounds_valid
+
+router = APIRouter(tags=["tiles"])
+
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+
+
+@router.get("/tiles/{layer}/{z}/{x}/{y}.mvt")
+async def get_tile(
+    layer: str,
+    z: int,
+    x: int,
+    y: int,
+    category: Optional[str] = Query(None, description="history layer only: filter by exhibit category"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if layer not in LAYERS:
+        raise HTTPException(status_code=404, detail=f"Unknown tile layer '{layer}'. Available: {', '.join(LAYERS)}")
+    if not tile_bounds_valid(z, x, y):
+        raise HTTPException(status_code=400, detail="Tile coordinates out of range")
+
+    service = get_tile_service()
+    tile = await service.get_tile(db, layer, z, x, y, category if layer == "history" else None)
+    max_age = 30 if layer == "history" else 3600
+    return Response(content=tile, media_type=MVT_MEDIA_TYPE, headers={"Cache-Control": f"public, max-age={max_age}"})
+
+
+@router.get("/tiles/stats")
+async def get_tile_stats():
+    return get_tile_service().get_stats()
@@ -1,41 +1,46 @@
-from fastapi import APIRouter, UploadFile, File, Body, Depends, HTTPException
+from fastapi import APIRouter, UploadFile, File, Body, Depends, HTTPException, Query
 from typing import List, Dict, Any, Optional
 from fastapi.responses import JSONResponse
 import httpx
-from app.config.ai_config import get_ai_service_url
+from app.services.ai_client_service import AIServiceClient, AIServiceBusyError, get_ai_client, upload_part
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.config.db_config import get_async_db
+from app.config.ai_config import get_embedding_dim
 from app.services.vector_service import VectorService
+from app.services.vector_memory_index_service import get_memory_index
 from app.controllers.narcotic_image_vector_controller import search_similar_narcotics_with_vector
 
 router = APIRouter(tags=["vectors"])
 
 @router.post("/convert_image_ref_to_vector")
-async def convert_image_to_vector(image: UploadFile = File(...)):
-    ai_service_url = get_ai_service_url()
-    target_url = f"{ai_service_url}/api/convert_image_ref_to_vector"
-
+async def convert_image_to_vector(image: UploadFile = File(...), client: AIServiceClient = Depends(get_ai_client)):
     try:
-        file_bytes = await image.read()
+        files = {'image': upload_part(image)}
     except Exception as exc:
         return JSONResponse(status_code=400, content={"error": "Failed to read uploaded file", "detail": str(exc)})
 
-    files = {'image': (image.filename or 'image.jpg', file_bytes, image.content_type or 'application/octet-stream')}
-
-    async with httpx.AsyncClient(timeout=600.0) as client:
-        try:
-            resp = await client.post(target_url, files=files)
-        except httpx.RequestError as exc:
-            return JSONResponse(status_code=503, content={
-                "error": "Failed to contact AI service",
-                "detail": str(exc)
-            })
+    try:
+        resp = await client.post("/api/convert_image_ref_to_vector", files=files)
+    except AIServiceBusyError as exc:
+        return JSONResponse(status_code=503, content={"error": "AI service is busy", "detail": str(exc)})
+    except httpx.RequestError as exc:
+        return JSONResponse(status_code=503, content={
+            "error": "Failed to contact AI service",
+            "detail": str(exc)
+        })
 
     try:
         content = resp.json()
     except ValueError:
         content = {"raw": resp.text}
 
+    dim = content.get("vector_dimension") if isinstance(content, dict) else None
+    if dim is not None and dim != get_embedding_dim():
+        return JSONResponse(status_code=502, content={
+            "error": "AI service returned a vector of the wrong dimension",
+            "detail": f"got {dim}, expected {get_embedding_dim()} (EMBEDDING_DIM)"
+        })
+
     return JSONResponse(status_code=resp.status_code, content=content)
 
 @router.post("/search-vector", response_model=Dict[str, List[Dict[str, Any]]])
@@ -44,6 +49,9 @@ async def search_similar_narcotics(
     vector_base64: Optional[str] = Body(None),
     top_k: int = Body(3, gt=0),
     similarity_threshold: float = Body(0.05, ge=0.0, le=1.0),
+    ef_search: Optional[int] = Body(None, gt=0, le=1000),
+    probes: Optional[int] = Body(None, gt=0, le=1000),
+    exact: bool = Body(False),
     db: AsyncSession = Depends(get_async_db)
 ):
     try:
@@ -56,7 +64,10 @@ async def search_similar_narcotics(
             db=db,
             vector=vec,
             top_k=top_k,
-            similarity_threshold=similarity_threshold
+            similarity_threshold=similarity_threshold,
+            ef_search=ef_search,
+            probes=probes,
+            exact=exact
         )
 
         return {"results": similar_items}
@@ -65,4 +76,26 @@ async def search_similar_narcotics(
     except Exception as e:
         import traceback
         traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Error searching similar narcotics: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error searching similar narcotics: {str(e)}")
+
+@router.get("/vector-index/memory")
+async def memory_index_status():
+    memory_index = get_memory_index()
+    if memory_index is None:
+        return {"enabled": False}
+    return {"enabled": True, **memory_index.get_stats()}
+
+@router.post("/vector-index/memory/verify")
+async def verify_memory_index(
+    sample: int = Query(20, ge=0, le=1000),
+    repair: bool = Query(False),
+    db: AsyncSession = Depends(get_async_db)
+):
+    memory_index = get_memory_index()
+    if memory_index is None:
+        raise HTTPException(status_code=404, detail="In-memory vector index is disabled")
+
+    report = await memory_index.verify(db, sample=sample)
+    if repair and not report["consistent"]:
+        report["reloaded"] = await memory_index.load(db)
+    return report
@@ -1,6 +1,6 @@
 from datetime import date, time, datetime
 from decimal import Decimal
-from typing import Optional, Union, Dict, Any
+from typing import Optional, Union, Dict, Any, Tuple
 from pydantic import BaseModel, field_validator, ConfigDict
 
 class HistoryBase(BaseModel):
@@ -61,4 +61,34 @@ class HistoryWithExhibit(History):
     district_name: Optional[str] = None
     province_name: Optional[str] = None
     discoverer_name: Optional[str] = None
-    modifier_name: Optional[str] = None
\ No newline at end of file
+    modifier_name: Optional[str] = None
+
+class HistoryFilter(BaseModel):
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    category: Optional[str] = None
+    subdistrict_id: Optional[int] = None
+    district_id: Optional[int] = None
+    province_id: Optional[int] = None
+    discovered_by: Optional[str] = None
+    bbox: Optional[Tuple[float, float, float, float]] = None
+
+    @field_validator('bbox', mode='before')
+    @classmethod
+    def parse_bbox(cls, value):
+        if isinstance(value, str):
+            parts = [p for p in value.split(",") if p.strip()]
+            if len(parts) != 4:
+                raise ValueError("bbox must be minLon,minLat,maxLon,maxLat")
+            try:
+                value = tuple(float(p) for p in parts)
+            except ValueError:
+                raise ValueError("bbox must contain four numbers")
+        if value is not None:
+            min_lon, min_lat, max_lon, max_lat = value
+            if min_lon > max_lon or min_lat > max_lat:
+                raise ValueError("bbox min values must not exceed max values")
+        return value
+
+    def is_empty(self) -> bool:
+        return not any(v is not None for v in self.model_dump().values())
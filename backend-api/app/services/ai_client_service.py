@@ -0,0 +1,133 @@
+import os
+import asyncio
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+
+import httpx
+from fastapi import Request, UploadFile
+
+from app.config.ai_config import get_ai_service_url
+
+# path -> (env var, default read timeout in seconds)
+ENDPOINT_TIMEOUTS: Dict[str, Tuple[str, float]] = {
+    "/api/object-classify": ("AI_TIMEOUT_OBJECT_CLASSIFY", 60.0),
+    "/api/firearm-brand-classify": ("AI_TIMEOUT_FIREARM_BRAND_CLASSIFY", 30.0),
+    "/api/firearm-model-classify": ("AI_TIMEOUT_FIREARM_MODEL_CLASSIFY", 30.0),
+    "/api/firearm-analyze": ("AI_TIMEOUT_FIREARM_ANALYZE", 120.0),
+    "/api/convert_image_ref_to_vector": ("AI_TIMEOUT_VECTOR", 600.0),
+}
+
+
+def endpoint_timeouts_from_env() -> Dict[str, float]:
+    return {path: float(os.getenv(env, str(default))) for path, (env, default) in ENDPOINT_TIMEOUTS.items()}
+
+
+class AIServiceBusyError(Exception):
+    pass
+
+
+class AIServiceClient:
+    def __init__(
+        self,
+        base_url: str,
+        max_connections: int = 16,
+        max_keepalive: int = 8,
+        keepalive_expiry: float = 30.0,
+        max_concurrency: int = 4,
+        queue_timeout: float = 10.0,
+        connect_timeout: float = 5.0,
+        default_timeout: float = 60.0,
+        timeouts: Optional[Dict[str, float]] = None,
+    ):
+        self.base_url = (base_url or "").rstrip("/")
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.queue_timeout = queue_timeout
+        self.connect_timeout = connect_timeout
+        self.default_timeout = default_timeout
+        self.timeouts = {path: default for path, (_, default) in ENDPOINT_TIMEOUTS.items()}
+        self.timeouts.update(timeouts or {})
+
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(default_timeout, connect=connect_timeout),
+            headers={"User-Agent": "Backend-API/1.0"},
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self.requests = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_env(cls) -> "AIServiceClient":
+        return cls(
+            base_url=get_ai_service_url(),
+            max_connections=int(os.getenv("AI_CLIENT_MAX_CONNECTIONS", "16")),
+            max_keepalive=int(os.getenv("AI_CLIENT_MAX_KEEPALIVE", "8")),
+            keepalive_expiry=float(os.getenv("AI_CLIENT_KEEPALIVE_EXPIRY", "30")),
+            max_concurrency=int(os.getenv("AI_CLIENT_MAX_CONCURRENCY", "4")),
+            queue_timeout=float(os.getenv("AI_CLIENT_QUEUE_TIMEOUT", "10")),
+            default_timeout=float(os.getenv("AI_CLIENT_TIMEOUT", "60")),
+            timeouts=endpoint_timeouts_from_env(),
+        )
+
+    def timeout_for(self, path: str) -> float:
+        return self.timeouts.get(path, self.default_timeout)
+
+    async def post(self, path: str, timeout: Optional[float] = None, **kwargs: Any) -> httpx.Response:
+        read_timeout = timeout if timeout is not None else self.timeout_for(path)
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise AIServiceBusyError(f"AI service is busy ({self.max_concurrency} requests in flight)")
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        self.requests += 1
+        try:
+            return await self._client.post(
+                path,
+                timeout=httpx.Timeout(read_timeout, connect=self.connect_timeout),
+                **kwargs,
+            )
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    async def get(self, path: str, timeout: Optional[float] = None, **kwargs: Any) -> httpx.Response:
+        # Metadata calls are cheap and skip the inference concurrency limit.
+        return await self._client.get(
+            path,
+            timeout=httpx.Timeout(timeout or self.default_timeout, connect=self.connect_timeout),
+            **kwargs,
+        )
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "base_url": self.base_url,
+            "max_concurrency": self.max_concurrency,
+            "timeouts": dict(self.timeouts),
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "requests": self.requests,
+            "rejected": self.rejected,
+        }
+
+
+def upload_part(upload: UploadFile, default_name: str = "image.jpg") -> Tuple[str, BinaryIO, str]:
+    upload.file.seek(0)
+    return (upload.filename or default_name, upload.file, upload.content_type or "application/octet-stream")
+
+
+def get_ai_client(request: Request) -> AIServiceClient:
+    return request.app.state.ai_client
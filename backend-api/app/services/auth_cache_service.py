@@ -0,0 +1,111 @@
+import os
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.schemas.user_schema import UserInDB
+from app.services.table_stamp_service import table_write_stamp
+
+AUTH_TABLES = ("users", "roles", "user_permissions")
+
+
+class TokenUserCache:
+    """Decoded access token -> UserInDB, for at most ``ttl`` seconds and never
+    past the token's own expiry. Entries are keyed by a hash of the token."""
+
+    def __init__(self, ttl: float = 60.0, max_entries: int = 10000, check_interval: float = 5.0):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.check_interval = check_interval
+
+        self._entries: "OrderedDict[str, Tuple[float, UserInDB]]" = OrderedDict()
+        self._stamp: Optional[int] = None
+        self._checked_at = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_env(cls) -> "TokenUserCache":
+        return cls(
+            ttl=float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60")),
+            max_entries=int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000")),
+            check_interval=float(os.getenv("AUTH_CACHE_CHECK_SECONDS", "5")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[UserInDB]:
+        if not self.enabled:
+            return None
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.time():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, token: str, user: UserInDB, token_exp: Optional[float] = None) -> None:
+        if not self.enabled:
+            return
+        expires_at = time.time() + self.ttl
+        if token_exp is not None:
+            expires_at = min(expires_at, float(token_exp))
+        self._entries[self._key(token)] = (expires_at, user)
+        self._entries.move_to_end(self._key(token))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.invalidations += 1
+
+    async def check_version(self) -> None:
+        # Users and roles are also edited outside this process; a moved write
+        # counter on any auth table drops every entry.
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+
+        from app.config.db_config import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as db:
+            stamp = await table_write_stamp(db, AUTH_TABLES)
+        if self._stamp is not None and stamp != self._stamp:
+            self.clear()
+        self._stamp = stamp
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+_token_cache: Optional[TokenUserCache] = None
+
+
+def get_token_cache() -> TokenUserCache:
+    global _token_cache
+    if _token_cache is None:
+        _token_cache = TokenUserCache.from_env()
+    return _token_cache
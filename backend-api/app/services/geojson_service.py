@@ -0,0 +1,15 @@
+from typing import Optional
+from sqlalchemy import func, cast, literal_column, Text, JSON
+
+FULL_PRECISION = 9
+SIMPLIFIED_PRECISION = 6
+
+
+def geometry_json(geom, tolerance: Optional[float] = None):
+    if tolerance is None:
+        return cast(func.ST_AsGeoJSON(geom, FULL_PRECISION), JSON)
+    return cast(func.ST_AsGeoJSON(func.ST_SimplifyPreserveTopology(geom, tolerance), SIMPLIFIED_PRECISION), JSON)
+
+
+def json_array_text(ordered_row):
+    return cast(func.coalesce(func.json_agg(ordered_row), literal_column("'[]'::json")), Text)
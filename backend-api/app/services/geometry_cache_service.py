@@ -0,0 +1,219 @@
+import os
+import gzip
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.controllers.province_controller import get_provinces
+from app.controllers.district_controller import get_districts
+from app.controllers.subdistrict_controller import get_subdistricts
+from app.services.table_stamp_service import table_write_stamp
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Precomputed simplification levels. A request for zoom z is served from the
+# first level >= z, simplified to roughly one 256px-tile pixel at that level;
+# anything above the last level (or no zoom at all) gets full resolution.
+SIMPLIFY_ZOOMS = (5, 8, 11)
+
+LAYERS: Dict[str, Callable[..., Awaitable[Tuple[str, int]]]] = {
+    "provinces": get_provinces,
+    "districts": get_districts,
+    "subdistricts": get_subdistricts,
+}
+
+BOUNDARY_TABLES = ("provinces", "districts", "subdistricts")
+
+
+def zoom_level(zoom: Optional[int]) -> Optional[int]:
+    if zoom is None:
+        return None
+    for level in SIMPLIFY_ZOOMS:
+        if zoom <= level:
+            return level
+    return None
+
+
+def zoom_tolerance(level: Optional[int]) -> Optional[float]:
+    return None if level is None else 360.0 / (256 * 2 ** level)
+
+
+def accepted_encodings(request: Request) -> set:
+    encodings = set()
+    for part in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        if name and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            encodings.add(name.lower())
+    return encodings
+
+
+@dataclass
+class CachedGeometry:
+    body: bytes
+    gzip_body: bytes
+    br_body: Optional[bytes]
+    etag: str
+    count: int
+
+    @classmethod
+    def build(cls, body: str, count: int, version: str) -> "CachedGeometry":
+        raw = body.encode()
+        digest = hashlib.sha1(raw).hexdigest()[:16]
+        return cls(
+            body=raw,
+            gzip_body=gzip.compress(raw, compresslevel=9, mtime=0),
+            br_body=brotli.compress(raw, quality=11) if brotli is not None else None,
+            etag=f'"{version}-{digest}"',
+            count=count,
+        )
+
+    def encoded_etag(self, encoding: Optional[str]) -> str:
+        # The encoded bodies differ byte for byte, so each gets its own strong tag.
+        return f'{self.etag[:-1]}-{encoding}"' if encoding else self.etag
+
+    def respond(self, request: Request, max_age: int) -> Response:
+        encodings = accepted_encodings(request)
+        if self.br_body is not None and "br" in encodings:
+            encoding, content = "br", self.br_body
+        elif "gzip" in encodings:
+            encoding, content = "gzip", self.gzip_body
+        else:
+            encoding, content = None, self.body
+
+        etag = self.encoded_etag(encoding)
+        headers = {
+            "ETag": etag,
+            "Vary": "Accept-Encoding",
+            "Cache-Control": f"public, max-age={max_age}",
+        }
+        # If-None-Match uses weak comparison (RFC 9110 13.1.2).
+        if_none_match = request.headers.get("if-none-match", "")
+        tags = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+        if etag in tags or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=headers)
+
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        return Response(content=content, media_type="application/json", headers=headers)
+
+
+class GeometryCache:
+    def __init__(self, max_entries: int = 256, check_interval: float = 60.0, static_version: str = "1", max_age: int = 300):
+        self.max_entries = max_entries
+        self.check_interval = check_interval
+        self.static_version = static_version
+        self.max_age = max_age
+
+        self._entries: "OrderedDict[tuple, CachedGeometry]" = OrderedDict()
+        self._locks: Dict[tuple, asyncio.Lock] = {}
+        self._generation = 0
+        self._stamp: Optional[int] = None
+        self._checked_at = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.builds_ms = 0.0
+
+    @classmethod
+    def from_env(cls) -> "GeometryCache":
+        return cls(
+            max_entries=int(os.getenv("GEOMETRY_CACHE_MAX_ENTRIES", "256")),
+            check_interval=float(os.getenv("GEOMETRY_CACHE_CHECK_SECONDS", "60")),
+            static_version=os.getenv("GEOMETRY_VERSION", "1"),
+            max_age=int(os.getenv("GEOMETRY_CACHE_MAX_AGE", "300")),
+        )
+
+    @property
+    def version(self) -> str:
+        return f"{self.static_version}.{self._generation}.{self._stamp or 0}"
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+
+    async def _check_version(self, db: AsyncSession) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        stamp = await table_write_stamp(db, BOUNDARY_TABLES)
+        if self._stamp is not None and stamp != self._stamp:
+            self._entries.clear()
+        self._stamp = stamp
+
+    async def get(self, db: AsyncSession, layer: str, zoom: Optional[int] = None, **filters: Any) -> CachedGeometry:
+        await self._check_version(db)
+        level = zoom_level(zoom)
+        key = (layer, level) + tuple(sorted(filters.items()))
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                started = time.perf_counter()
+                body, count = await LAYERS[layer](db, tolerance=zoom_tolerance(level), **filters)
+                entry = await asyncio.to_thread(CachedGeometry.build, body, count, self.version)
+                self.builds_ms += (time.perf_counter() - started) * 1000.0
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            else:
+                self.hits += 1
+        self._locks.pop(key, None)
+        return entry
+
+    async def warm(self, db: AsyncSession) -> None:
+        for layer in LAYERS:
+            for level in SIMPLIFY_ZOOMS + (None,):
+                await self.get(db, layer, level)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": sum(len(e.body) + len(e.gzip_body) + len(e.br_body or b"") for e in self._entries.values()),
+            "brotli": brotli is not None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "build_ms": round(self.builds_ms, 1),
+        }
+
+
+_geometry_cache: Optional[GeometryCache] = None
+
+
+def get_geometry_cache() -> GeometryCache:
+    global _geometry_cache
+    if _geometry_cache is None:
+        _geometry_cache = GeometryCache.from_env()
+    return _geometry_cache
+
+
+async def warm_geometry_cache() -> None:
+    from app.config.db_config import AsyncSessionLocal
+
+    cache = get_geometry_cache()
+    try:
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            await cache.warm(db)
+        print(f"[geometry-cache] warmed {cache.get_stats()['entries']} bodies in {time.perf_counter() - started:.1f}s")
+    except Exception as e:
+        print(f"[geometry-cache] warm-up failed, bodies will be built on demand: {e}")
@@ -0,0 +1,63 @@
+import io
+import csv
+from typing import AsyncIterator, Callable, Dict, Iterable, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.sql import Select
+
+from app.config.db_config import AsyncSessionLocal
+from app.models.history_model import History
+from app.controllers.history_controller import history_json_stmt, history_flat_stmt
+
+EXPORT_BATCH_SIZE = 1000
+
+
+async def _stream_partitions(stmt: Select, batch_size: int) -> AsyncIterator[Iterable]:
+    # A dedicated session keeps the server-side cursor open for as long as the
+    # response streams, independent of the request-scoped session.
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(stmt.execution_options(yield_per=batch_size))
+        async for partition in result.partitions(batch_size):
+            yield partition
+
+
+async def export_ndjson(stmt: Select, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[bytes]:
+    async for partition in _stream_partitions(stmt, batch_size):
+        yield "".join(row.row_json + "\n" for row in partition).encode()
+
+
+async def export_geojson(stmt: Select, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[bytes]:
+    stmt = stmt.add_columns(func.ST_AsGeoJSON(History.location).label("geometry"))
+    yield b'{"type":"FeatureCollection","features":['
+    first = True
+    async for partition in _stream_partitions(stmt, batch_size):
+        features = ",".join(
+            f'{{"type":"Feature","id":{row.id},"geometry":{row.geometry or "null"},"properties":{row.row_json}}}'
+            for row in partition
+        )
+        yield (features if first else "," + features).encode()
+        first = False
+    yield b"]}"
+
+
+async def export_csv(stmt: Select, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # UTF-8 BOM so spreadsheet tools pick up the Thai place names correctly.
+    buffer.write("\ufeff")
+    writer.writerow([c.name for c in stmt.selected_columns])
+    async for partition in _stream_partitions(stmt, batch_size):
+        writer.writerows(partition)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+# format -> (statement builder, stream writer, media type, file extension)
+EXPORT_FORMATS: Dict[str, Tuple[Callable, Callable, str, str]] = {
+    "ndjson": (history_json_stmt, export_ndjson, "application/x-ndjson", "ndjson"),
+    "geojson": (history_json_stmt, export_geojson, "application/geo+json", "geojson"),
+    "csv": (history_flat_stmt, export_csv, "text/csv; charset=utf-8", "csv"),
+}
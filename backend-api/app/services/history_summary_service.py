@@ -0,0 +1,188 @@
+import os
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.db_config import disable_statement_timeout
+from app.models.history_summary_model import HistorySummary
+
+# Side of the base grid cell in degrees (~1.1 km at the equator). Coarser grids
+# are served by merging base cells, so this is fixed once the summary is built.
+SUMMARY_CELL_DEGREES = float(os.getenv("HISTORY_SUMMARY_CELL_DEGREES", "0.01"))
+# Create the table and triggers at startup when they are missing.
+SUMMARY_AUTO_INSTALL = os.getenv("HISTORY_SUMMARY_AUTO_INSTALL", "true").strip().lower() in ("1", "true", "yes")
+SUMMARY_TRIGGER_NAMES = ("history_summary_sync", "history_summary_truncate", "history_summary_exhibit_category")
+
+SUMMARY_FUNCTIONS = [
+    """
+CREATE OR REPLACE FUNCTION history_summary_apply(h history, cat text, delta integer) RETURNS void AS $$
+DECLARE
+    d date := COALESCE(h.discovery_date, h.created_at::date);
+    sid integer := COALESCE(h.subdistrict_id, 0);
+    cx integer := floor(ST_X(h.location) / {cell})::integer;
+    cy integer := floor(ST_Y(h.location) / {cell})::integer;
+BEGIN
+    INSERT INTO history_summary AS s (day, subdistrict_id, category, cell_x, cell_y, incidents)
+    VALUES (d, sid, COALESCE(cat, ''), cx, cy, delta)
+    ON CONFLICT (day, subdistrict_id, category, cell_x, cell_y)
+    DO UPDATE SET incidents = s.incidents + EXCLUDED.incidents;
+
+    IF delta < 0 THEN
+        DELETE FROM history_summary
+        WHERE day = d AND subdistrict_id = sid AND category = COALESCE(cat, '')
+          AND cell_x = cx AND cell_y = cy AND incidents <= 0;
+    END IF;
+END $$ LANGUAGE plpgsql
+""",
+    """
+CREATE OR REPLACE FUNCTION history_summary_history_trigger() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        PERFORM history_summary_apply(OLD, (SELECT category FROM exhibits WHERE id = OLD.exhibit_id), -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM history_summary_apply(NEW, (SELECT category FROM exhibits WHERE id = NEW.exhibit_id), 1);
+    END IF;
+    RETURN NULL;
+END $$ LANGUAGE plpgsql
+""",
+    """
+CREATE OR REPLACE FUNCTION history_summary_truncate_trigger() RETURNS trigger AS $$
+BEGIN
+    TRUNCATE history_summary;
+    RETURN NULL;
+END $$ LANGUAGE plpgsql
+""",
+    """
+CREATE OR REPLACE FUNCTION history_summary_exhibit_trigger() RETURNS trigger AS $$
+DECLARE
+    h history;
+BEGIN
+    FOR h IN SELECT * FROM history WHERE exhibit_id = NEW.id LOOP
+        PERFORM history_summary_apply(h, OLD.category, -1);
+        PERFORM history_summary_apply(h, NEW.category, 1);
+    END LOOP;
+    RETURN NULL;
+END $$ LANGUAGE plpgsql
+""",
+]
+
+SUMMARY_TRIGGERS = [
+    """
+DROP TRIGGER IF EXISTS history_summary_sync ON history
+""",
+    """
+CREATE TRIGGER history_summary_sync
+    AFTER INSERT OR DELETE OR UPDATE OF exhibit_id, subdistrict_id, discovery_date, location ON history
+    FOR EACH ROW EXECUTE FUNCTION history_summary_history_trigger()
+""",
+    """
+DROP TRIGGER IF EXISTS history_summary_truncate ON history
+""",
+    """
+CREATE TRIGGER history_summary_truncate
+    AFTER TRUNCATE ON history
+    FOR EACH STATEMENT EXECUTE FUNCTION history_summary_truncate_trigger()
+""",
+    """
+DROP TRIGGER IF EXISTS history_summary_exhibit_category ON exhibits
+""",
+    """
+CREATE TRIGGER history_summary_exhibit_category
+    AFTER UPDATE OF category ON exhibits
+    FOR EACH ROW WHEN (OLD.category IS DISTINCT FROM NEW.category)
+    EXECUTE FUNCTION history_summary_exhibit_trigger()
+""",
+]
+
+INSTALLED_SQL = """
+SELECT to_regclass('history_summary') IS NOT NULL
+   AND (SELECT count(*) FROM pg_trigger WHERE NOT tgisinternal AND tgname = ANY(:triggers)) = :expected
+"""
+
+REBUILD_SQL = """
+INSERT INTO history_summary (day, subdistrict_id, category, cell_x, cell_y, incidents)
+SELECT COALESCE(h.discovery_date, h.created_at::date),
+       COALESCE(h.subdistrict_id, 0),
+       COALESCE(e.category, ''),
+       floor(ST_X(h.location) / :cell)::integer,
+       floor(ST_Y(h.location) / :cell)::integer,
+       count(*)
+FROM history h
+LEFT JOIN exhibits e ON e.id = h.exhibit_id
+GROUP BY 1, 2, 3, 4, 5
+"""
+
+
+async def install_history_summary(db: AsyncSession, rebuild: bool = True) -> Dict[str, Any]:
+    """Create the summary table and triggers (idempotent), optionally
+    repopulating the table from ``history``. Runs in one transaction with
+    ``history`` locked against writes so the backfill and triggers line up."""
+    await disable_statement_timeout(db)
+    conn = await db.connection()
+    await conn.run_sync(lambda sync_conn: HistorySummary.__table__.create(sync_conn, checkfirst=True))
+    for index in HistorySummary.__table__.indexes:
+        await conn.run_sync(lambda sync_conn, index=index: index.create(sync_conn, checkfirst=True))
+
+    await db.execute(text("LOCK TABLE history IN SHARE ROW EXCLUSIVE MODE"))
+    # asyncpg prepares one statement per execute, hence the statement lists.
+    for statement in SUMMARY_FUNCTIONS:
+        await db.execute(text(statement.replace("{cell}", repr(SUMMARY_CELL_DEGREES))))
+    for statement in SUMMARY_TRIGGERS:
+        await db.execute(text(statement))
+
+    if rebuild:
+        await db.execute(text("TRUNCATE history_summary"))
+        await db.execute(text(REBUILD_SQL), {"cell": SUMMARY_CELL_DEGREES})
+    await db.commit()
+
+    rows, incidents = (await db.execute(text(
+        "SELECT count(*), COALESCE(sum(incidents), 0) FROM history_summary"
+    ))).one()
+    return {"summary_rows": int(rows), "incidents": int(incidents), "cell_degrees": SUMMARY_CELL_DEGREES}
+
+
+_installed = False
+
+
+async def history_summary_installed(db: AsyncSession) -> bool:
+    """True once the table and all of its triggers exist. Only a positive
+    answer is cached; the stats routes check this before every query."""
+    global _installed
+    if not _installed:
+        _installed = bool((await db.execute(text(INSTALLED_SQL), {
+            "triggers": list(SUMMARY_TRIGGER_NAMES), "expected": len(SUMMARY_TRIGGER_NAMES)
+        })).scalar())
+    return _installed
+
+
+async def ensure_history_summary(db: AsyncSession) -> Optional[Dict[str, Any]]:
+    """Install and backfill the summary unless it is already in place.
+    Returns the install report, or None when there was nothing to do."""
+    # Serializes workers that start at the same time; released on commit.
+    await db.execute(text("SELECT pg_advisory_xact_lock(hashtext('history_summary'))"))
+    if await history_summary_installed(db):
+        await db.commit()
+        return None
+    if (await db.execute(text("SELECT to_regclass('history')"))).scalar() is None:
+        await db.commit()
+        raise RuntimeError("history table does not exist yet")
+    return await install_history_summary(db)
+
+
+async def install_history_summary_on_startup() -> None:
+    from app.config.db_config import AsyncSessionLocal
+
+    if not SUMMARY_AUTO_INSTALL:
+        return
+    try:
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            report = await ensure_history_summary(db)
+        if report is not None:
+            print(f"[history-summary] installed {report['summary_rows']} rows "
+                  f"({report['incidents']} incidents) in {time.perf_counter() - started:.1f}s")
+    except Exception as e:
+        print(f"[history-summary] install failed, /history/stats/* will return 503: {e}")
@@ -0,0 +1,18 @@
+from typing import Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def table_write_stamp(db: AsyncSession, tables: Tuple[str, ...]) -> int:
+    """Sum of the insert/update/delete counters PostgreSQL keeps for ``tables``.
+    Any write moves it, which makes it a cheap cross-process cache version."""
+    result = await db.execute(
+        text("""
+            SELECT COALESCE(SUM(n_tup_ins + n_tup_upd + n_tup_del), 0)
+            FROM pg_stat_user_tables
+            WHERE relname = ANY(:tables)
+        """),
+        {"tables": list(tables)},
+    )
+    return int(result.scalar() or 0)
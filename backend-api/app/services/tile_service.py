@@ -0,0 +1,249 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.geometry_cache_service import BOUNDARY_TABLES
+from app.services.table_stamp_service import table_write_stamp
+
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+WEB_MERCATOR_WIDTH = 40075016.68557849
+
+# layer -> (table, name column, parent id column)
+BOUNDARY_LAYERS: Dict[str, Tuple[str, str, Optional[str]]] = {
+    "provinces": ("provinces", "province_name", None),
+    "districts": ("districts", "district_name", "province_id"),
+    "subdistricts": ("subdistricts", "subdistrict_name", "district_id"),
+}
+LAYERS = ("history",) + tuple(BOUNDARY_LAYERS)
+
+HISTORY_POINTS_SQL = """
+WITH bounds AS (
+    SELECT ST_TileEnvelope(:z, :x, :y) AS geom,
+           ST_Transform(ST_TileEnvelope(:z, :x, :y, margin => :margin), 4326) AS filter_geom
+),
+pts AS (
+    SELECT h.id, h.discovery_date, e.category, e.subcategory,
+           ST_AsMVTGeom(ST_Transform(h.location, 3857), bounds.geom, :extent, :buffer, true) AS geom
+    FROM history h
+    CROSS JOIN bounds
+    LEFT JOIN exhibits e ON e.id = h.exhibit_id
+    WHERE h.location && bounds.filter_geom {category_filter}
+)
+"""
+
+HISTORY_RAW_SQL = HISTORY_POINTS_SQL + """
+SELECT ST_AsMVT(t, 'history', :extent, 'geom', 'id') FROM (
+    SELECT id, to_char(discovery_date, 'YYYY-MM-DD') AS discovery_date, category, subcategory, geom
+    FROM pts WHERE geom IS NOT NULL
+) t
+"""
+
+# Low zooms: points are bucketed into :cell x :cell squares of tile space and
+# each bucket becomes one feature at its centroid carrying point_count.
+HISTORY_CLUSTER_SQL = HISTORY_POINTS_SQL + """
+SELECT ST_AsMVT(t, 'history', :extent, 'geom') FROM (
+    SELECT count(*) AS point_count,
+           CASE WHEN count(*) = 1 THEN min(id) END AS history_id,
+           ST_SnapToGrid(ST_Centroid(ST_Collect(geom)), 1) AS geom
+    FROM pts WHERE geom IS NOT NULL
+    GROUP BY floor(ST_X(geom) / :cell), floor(ST_Y(geom) / :cell)
+) t
+"""
+
+BOUNDARY_SQL = """
+WITH bounds AS (
+    SELECT ST_TileEnvelope(:z, :x, :y) AS geom,
+           ST_TileEnvelope(:z, :x, :y, margin => :margin) AS filter_geom
+)
+SELECT ST_AsMVT(t, :layer, :extent, 'geom', 'id') FROM (
+    SELECT b.id, b.{name_column} AS name{parent_column},
+           ST_AsMVTGeom(ST_SimplifyPreserveTopology({geom_3857}, :tolerance), bounds.geom, :extent, :buffer, true) AS geom
+    FROM {table} b
+    CROSS JOIN bounds
+    WHERE b.geom && {filter_geom}
+) t
+WHERE t.geom IS NOT NULL
+"""
+
+
+def tile_bounds_valid(z: int, x: int, y: int) -> bool:
+    return 0 <= z <= 22 and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+class TileCache:
+    """LRU of encoded tiles bounded by total bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._tiles: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        tile = self._tiles.get(key)
+        if tile is None:
+            self.misses += 1
+            return None
+        self._tiles.move_to_end(key)
+        self.hits += 1
+        return tile
+
+    def put(self, key: tuple, tile: bytes) -> None:
+        if len(tile) > self.max_bytes:
+            return
+        old = self._tiles.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old)
+        self._tiles[key] = tile
+        self._bytes += len(tile)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._tiles.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    def invalidate(self, layer: Optional[str] = None) -> None:
+        if layer is None:
+            self._tiles.clear()
+            self._bytes = 0
+            return
+        for key in [k for k in self._tiles if k[0] == layer]:
+            self._bytes -= len(self._tiles.pop(key))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "tiles": len(self._tiles),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class TileService:
+    def __init__(
+        self,
+        cache: TileCache,
+        cluster_max_zoom: int = 12,
+        cluster_cell: int = 256,
+        check_interval: float = 5.0,
+    ):
+        self.cache = cache
+        self.cluster_max_zoom = cluster_max_zoom
+        self.cluster_cell = cluster_cell
+        self.check_interval = check_interval
+
+        self._srids: Dict[str, int] = {}
+        self._stamps: Dict[str, Optional[int]] = {"history": None, "boundaries": None}
+        self._checked_at = 0.0
+
+    @classmethod
+    def from_env(cls) -> "TileService":
+        return cls(
+            cache=TileCache(int(float(os.getenv("TILE_CACHE_MAX_MB", "64")) * 2 ** 20)),
+            cluster_max_zoom=int(os.getenv("TILE_CLUSTER_MAX_ZOOM", "12")),
+            cluster_cell=int(os.getenv("TILE_CLUSTER_CELL", "256")),
+            check_interval=float(os.getenv("TILE_CACHE_CHECK_SECONDS", "5")),
+        )
+
+    async def _check_versions(self, db: AsyncSession) -> None:
+        # Rows are also written outside this process (and in other workers), so
+        # the table write counters decide staleness; invalidate() covers
+        # writes made through this process without waiting for the next check.
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        for name, tables, layers in (("history", ("history", "exhibits"), ("history",)),
+                                     ("boundaries", BOUNDARY_TABLES, tuple(BOUNDARY_LAYERS))):
+            stamp = await table_write_stamp(db, tables)
+            if self._stamps[name] is not None and stamp != self._stamps[name]:
+                for layer in layers:
+                    self.cache.invalidate(layer)
+            self._stamps[name] = stamp
+
+    def invalidate(self, layer: Optional[str] = None) -> None:
+        self.cache.invalidate(layer)
+
+    async def _srid(self, db: AsyncSession, table: str) -> int:
+        if table not in self._srids:
+            self._srids[table] = int((await db.execute(
+                text("SELECT Find_SRID('public', :table, 'geom')"), {"table": table}
+            )).scalar() or 0)
+        return self._srids[table]
+
+    async def _history_tile(self, db: AsyncSession, z: int, x: int, y: int, category: Optional[str]) -> bytes:
+        template = HISTORY_CLUSTER_SQL if z < self.cluster_max_zoom else HISTORY_RAW_SQL
+        params = {
+            "z": z, "x": x, "y": y,
+            "extent": TILE_EXTENT, "buffer": TILE_BUFFER,
+            "margin": TILE_BUFFER / TILE_EXTENT, "cell": self.cluster_cell,
+        }
+        category_filter = ""
+        if category:
+            category_filter = "AND e.category = :category"
+            params["category"] = category
+        sql = text(template.format(category_filter=category_filter))
+        return bytes((await db.execute(sql, params)).scalar() or b"")
+
+    async def _boundary_tile(self, db: AsyncSession, layer: str, z: int, x: int, y: int) -> bytes:
+        table, name_column, parent_column = BOUNDARY_LAYERS[layer]
+        srid = await self._srid(db, table)
+        if srid == 0:
+            # Boundaries loaded without an SRID are stored as lon/lat degrees.
+            geom_3857 = "ST_Transform(ST_SetSRID(b.geom, 4326), 3857)"
+            filter_geom = "ST_SetSRID(ST_Transform(bounds.filter_geom, 4326), 0)"
+        else:
+            geom_3857 = "ST_Transform(b.geom, 3857)"
+            filter_geom = f"ST_Transform(bounds.filter_geom, {srid})"
+        sql = text(BOUNDARY_SQL.format(
+            name_column=name_column,
+            parent_column=f", b.{parent_column}" if parent_column else "",
+            geom_3857=geom_3857,
+            table=table,
+            filter_geom=filter_geom,
+        ))
+        params = {
+            "z": z, "x": x, "y": y, "layer": layer,
+            "extent": TILE_EXTENT, "buffer": TILE_BUFFER, "margin": TILE_BUFFER / TILE_EXTENT,
+            "tolerance": WEB_MERCATOR_WIDTH / (256 * 2 ** z),
+        }
+        return bytes((await db.execute(sql, params)).scalar() or b"")
+
+    async def get_tile(self, db: AsyncSession, layer: str, z: int, x: int, y: int, category: Optional[str] = None) -> bytes:
+        await self._check_versions(db)
+        key = (layer, z, x, y, category)
+        tile = self.cache.get(key)
+        if tile is not None:
+            return tile
+        if layer == "history":
+            tile = await self._history_tile(db, z, x, y, category)
+        else:
+            tile = await self._boundary_tile(db, layer, z, x, y)
+        self.cache.put(key, tile)
+        return tile
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.cache.get_stats(),
+            "cluster_max_zoom": self.cluster_max_zoom,
+            "cluster_cell": self.cluster_cell,
+            "stamps": dict(self._stamps),
+        }
+
+
+_tile_service: Optional[TileService] = None
+
+
+def get_tile_service() -> TileService:
+    global _tile_service
+    if _tile_service is None:
+        _tile_service = TileService.from_env()
+    return _tile_service
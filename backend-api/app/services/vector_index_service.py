@@ -0,0 +1,202 @@
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.ai_config import get_embedding_dim
+from app.config.db_config import disable_statement_timeout
+
+# pgvector can index `vector` up to 2000 dims and `halfvec` up to 4000; wider
+# vectors are indexed through their binary quantization and re-ranked exactly.
+VECTOR_INDEX_MAX_DIM = 2000
+HALFVEC_INDEX_MAX_DIM = 4000
+
+
+def exact_order_expression(column_ref: str, query_ref: str) -> str:
+    """Cosine distance that no ANN index can serve (the index only matches a
+    bare ``column <=> query``), so ordering by it is always an exact scan of
+    the vectors while the rest of the statement keeps its index scans."""
+    return f"(({column_ref} <=> {query_ref}) + 0)"
+
+
+class VectorIndexService:
+    def __init__(
+        self,
+        table: str = "narcotics_image_vectors",
+        column: str = "image_vector",
+        dim: Optional[int] = None,
+        index_type: Optional[str] = None,
+        m: Optional[int] = None,
+        ef_construction: Optional[int] = None,
+        lists: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        rerank_factor: Optional[int] = None,
+        ann: Optional[str] = None,
+    ):
+        self.table = table
+        self.column = column
+        self.dim = dim or get_embedding_dim()
+        self.index_type = (index_type or os.getenv("VECTOR_INDEX_TYPE", "hnsw")).lower()
+        if self.index_type not in ("hnsw", "ivfflat", "none"):
+            raise ValueError(f"Unsupported VECTOR_INDEX_TYPE: {self.index_type}")
+        self.m = m or int(os.getenv("VECTOR_INDEX_M", "16"))
+        self.ef_construction = ef_construction or int(os.getenv("VECTOR_INDEX_EF_CONSTRUCTION", "64"))
+        self.lists = lists or int(os.getenv("VECTOR_INDEX_LISTS", "100"))
+        self.ef_search = ef_search or int(os.getenv("VECTOR_SEARCH_EF", "40"))
+        self.probes = probes or int(os.getenv("VECTOR_SEARCH_PROBES", "10"))
+        self.rerank_factor = rerank_factor or int(os.getenv("VECTOR_RERANK_FACTOR", "10"))
+        # auto: approximate search only once the index has been built;
+        # true/false force it on or off. Exact search is the fallback.
+        self.ann = (ann or os.getenv("VECTOR_SEARCH_ANN", "auto")).lower()
+        if self.ann not in ("auto", "true", "false"):
+            raise ValueError(f"Unsupported VECTOR_SEARCH_ANN: {self.ann}")
+        self.check_interval = float(os.getenv("VECTOR_INDEX_CHECK_SECONDS", "60"))
+        self._index_exists: Optional[bool] = None
+        self._checked_at = 0.0
+
+    @property
+    def index_name(self) -> str:
+        return f"ix_{self.table}_{self.column}_ann"
+
+    @property
+    def mode(self) -> str:
+        if self.index_type == "none":
+            return "exact"
+        if self.dim <= VECTOR_INDEX_MAX_DIM:
+            return "vector"
+        if self.dim <= HALFVEC_INDEX_MAX_DIM:
+            return "halfvec"
+        return "binary"
+
+    def index_expression(self) -> str:
+        if self.mode == "halfvec":
+            return f"({self.column}::halfvec({self.dim}))"
+        if self.mode == "binary":
+            return f"(binary_quantize({self.column})::bit({self.dim}))"
+        return self.column
+
+    def _opclass(self) -> str:
+        return {"vector": "vector_cosine_ops", "halfvec": "halfvec_cosine_ops", "binary": "bit_hamming_ops"}[self.mode]
+
+    def order_expression(self, column_ref: str, query_ref: str) -> str:
+        if self.mode == "halfvec":
+            return f"({column_ref}::halfvec({self.dim})) <=> ({query_ref}::halfvec({self.dim}))"
+        if self.mode == "binary":
+            return f"(binary_quantize({column_ref})::bit({self.dim})) <~> binary_quantize({query_ref})"
+        return f"{column_ref} <=> {query_ref}"
+
+    def create_index_sql(self) -> str:
+        expr = self.index_expression()
+        if self.index_type == "ivfflat":
+            return (
+                f"CREATE INDEX {self.index_name} ON {self.table} "
+                f"USING ivfflat ({expr} {self._opclass()}) WITH (lists = {int(self.lists)})"
+            )
+        return (
+            f"CREATE INDEX {self.index_name} ON {self.table} USING hnsw ({expr} {self._opclass()}) "
+            f"WITH (m = {int(self.m)}, ef_construction = {int(self.ef_construction)})"
+        )
+
+    def candidate_limit(self, top_k: int) -> int:
+        return top_k * self.rerank_factor if self.mode in ("binary", "halfvec") else top_k
+
+    async def index_exists(self, db: AsyncSession) -> bool:
+        now = time.monotonic()
+        if self._index_exists is None or now - self._checked_at >= self.check_interval:
+            self._index_exists = bool((await db.execute(
+                text("SELECT 1 FROM pg_indexes WHERE tablename = :table AND indexname = :index"),
+                {"table": self.table, "index": self.index_name},
+            )).scalar())
+            self._checked_at = now
+        return self._index_exists
+
+    async def use_ann(self, db: AsyncSession) -> bool:
+        if self.mode == "exact" or self.ann == "false":
+            return False
+        if self.ann == "true":
+            return True
+        return await self.index_exists(db)
+
+    async def apply_search_params(self, db: AsyncSession, ef_search: Optional[int] = None, probes: Optional[int] = None) -> None:
+        if self.mode == "exact":
+            return
+        if self.index_type == "hnsw":
+            await db.execute(text(f"SET LOCAL hnsw.ef_search = {int(ef_search or self.ef_search)}"))
+        else:
+            await db.execute(text(f"SET LOCAL ivfflat.probes = {int(probes or self.probes)}"))
+
+    async def rebuild(self, db: AsyncSession) -> Dict[str, Any]:
+        await disable_statement_timeout(db)
+        await db.execute(text(f"DROP INDEX IF EXISTS {self.index_name}"))
+        if self.mode != "exact":
+            await db.execute(text(self.create_index_sql()))
+        await db.execute(text(f"ANALYZE {self.table}"))
+        await db.commit()
+        self._index_exists = self.mode != "exact"
+        self._checked_at = time.monotonic()
+        return self.describe()
+
+    async def _neighbours(self, db: AsyncSession, query_id: int, k: int, ann: bool) -> List[int]:
+        query_ref = f"(SELECT {self.column} FROM {self.table} WHERE id = :qid)"
+        if ann:
+            await self.apply_search_params(db)
+            order_by, candidates = self.order_expression(self.column, query_ref), self.candidate_limit(k + 1)
+        else:
+            order_by, candidates = exact_order_expression(self.column, query_ref), k + 1
+        sql = text(f"""
+            WITH c AS MATERIALIZED (SELECT id, {self.column} FROM {self.table} ORDER BY {order_by} LIMIT :candidates)
+            SELECT id FROM c WHERE id <> :qid ORDER BY {self.column} <=> {query_ref} LIMIT :k
+        """)
+        ids = (await db.execute(sql, {"qid": query_id, "candidates": candidates, "k": k})).scalars().all()
+        await db.rollback()
+        return list(ids)
+
+    async def measure_recall(self, db: AsyncSession, queries: int = 20, k: int = 10) -> Dict[str, Any]:
+        """recall@k of the approximate path against an exact scan, using
+        randomly sampled stored vectors as queries (each excluded from its
+        own results)."""
+        if self.mode == "exact":
+            return {"mode": self.mode, "recall": 1.0, "queries": 0}
+        ids = (await db.execute(
+            text(f"SELECT id FROM {self.table} WHERE {self.column} IS NOT NULL ORDER BY random() LIMIT :n"),
+            {"n": queries},
+        )).scalars().all()
+        await db.rollback()
+        hits = expected = 0
+        for query_id in ids:
+            truth = set(await self._neighbours(db, query_id, k, ann=False))
+            found = set(await self._neighbours(db, query_id, k, ann=True))
+            hits += len(truth & found)
+            expected += len(truth)
+        return {
+            "mode": self.mode,
+            "k": k,
+            "queries": len(ids),
+            "recall": round(hits / expected, 4) if expected else None,
+        }
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "index": self.index_name if self.mode != "exact" else None,
+            "type": self.index_type,
+            "mode": self.mode,
+            "dim": self.dim,
+            "ef_search": self.ef_search,
+            "probes": self.probes,
+            "rerank_factor": self.rerank_factor,
+            "ann": self.ann,
+            "index_exists": self._index_exists,
+        }
+
+
+_index_service: Optional[VectorIndexService] = None
+
+
+def get_vector_index() -> VectorIndexService:
+    global _index_service
+    if _index_service is None:
+        _index_service = VectorIndexService()
+    return _index_service
@@ -0,0 +1,270 @@
+import os
+import time
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pgvector import Vector
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.ai_config import get_embedding_dim
+
+VECTORS_SQL = "SELECT id, narcotic_id, image_vector FROM narcotics_image_vectors WHERE image_vector IS NOT NULL"
+
+
+class InMemoryVectorIndex:
+    """Normalized copies of narcotics_image_vectors for brute-force cosine
+    search. Only ids and vectors are held; narcotic details are read from the
+    database for the hits so they are never stale."""
+
+    def __init__(self, dim: int, mmap_path: Optional[str] = None, initial_capacity: int = 64):
+        self.dim = dim
+        self.mmap_path = mmap_path
+        self.ready = False
+        self.loaded_at: Optional[float] = None
+        self.load_seconds: Optional[float] = None
+
+        self._lock = threading.RLock()
+        self._reset(initial_capacity)
+        self._loading = False
+        self._pending: List[Tuple[str, tuple]] = []
+
+        self.searches = 0
+        self.fallbacks = 0
+
+    @classmethod
+    def from_env(cls) -> "InMemoryVectorIndex":
+        return cls(dim=get_embedding_dim(), mmap_path=os.getenv("VECTOR_MEMORY_INDEX_MMAP") or None)
+
+    def _reset(self, capacity: int) -> None:
+        self._matrix = self._allocate(max(1, capacity))
+        self._ids = np.zeros(self._matrix.shape[0], dtype=np.int64)
+        self._narcotic_ids = np.zeros(self._matrix.shape[0], dtype=np.int64)
+        self._size = 0
+        self._rows: Dict[int, int] = {}
+
+    def _allocate(self, capacity: int) -> np.ndarray:
+        if not self.mmap_path:
+            return np.zeros((capacity, self.dim), dtype=np.float32)
+        tmp_path = f"{self.mmap_path}.tmp"
+        matrix = np.memmap(tmp_path, dtype=np.float32, mode="w+", shape=(capacity, self.dim))
+        os.replace(tmp_path, self.mmap_path)
+        return matrix
+
+    def _grow(self, needed: int) -> None:
+        # Rows are dim * 4 bytes (64 KB at 16000 dims), so grow in small steps
+        # rather than doubling; load() preallocates for the table up front.
+        capacity = self._matrix.shape[0]
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity + max(64, capacity // 8))
+        matrix = self._allocate(capacity)
+        matrix[:self._size] = self._matrix[:self._size]
+        self._matrix = matrix
+        self._ids = np.resize(self._ids, capacity)
+        self._narcotic_ids = np.resize(self._narcotic_ids, capacity)
+
+    @staticmethod
+    def _normalize(vector: Any) -> np.ndarray:
+        if isinstance(vector, Vector):
+            vector = vector.to_numpy()
+        arr = np.asarray(vector, dtype=np.float32).reshape(-1)
+        norm = float(np.linalg.norm(arr))
+        return arr / norm if norm > 0 else arr
+
+    def _upsert(self, vector_id: int, narcotic_id: int, vector: Any) -> None:
+        arr = self._normalize(vector)
+        if arr.shape[0] != self.dim:
+            raise ValueError(f"Vector dimension {arr.shape[0]} does not match index dimension {self.dim}")
+        row = self._rows.get(vector_id)
+        if row is None:
+            self._grow(self._size + 1)
+            row = self._size
+            self._size += 1
+            self._rows[vector_id] = row
+        self._matrix[row] = arr
+        self._ids[row] = vector_id
+        self._narcotic_ids[row] = narcotic_id
+
+    def _apply(self, op: str, *args: Any) -> None:
+        # While load() builds a replacement, mutations are logged and replayed
+        # onto it before the swap. The live copy is updated too unless it was
+        # released for the reload.
+        with self._lock:
+            if self._loading:
+                self._pending.append((op, args))
+            if self.ready or not self._loading:
+                getattr(self, op)(*args)
+
+    def _add(self, vector_id: int, narcotic_id: int, vector: Any) -> None:
+        self._upsert(vector_id, narcotic_id, vector)
+
+    def add(self, vector_id: int, narcotic_id: int, vector: Any) -> None:
+        self._apply("_add", int(vector_id), int(narcotic_id), np.asarray(vector, dtype=np.float32))
+
+    def _remove_rows(self, rows: List[int]) -> None:
+        for row in sorted(rows, reverse=True):
+            last = self._size - 1
+            removed_id = int(self._ids[row])
+            if row != last:
+                self._matrix[row] = self._matrix[last]
+                self._ids[row] = self._ids[last]
+                self._narcotic_ids[row] = self._narcotic_ids[last]
+                self._rows[int(self._ids[row])] = row
+            del self._rows[removed_id]
+            self._size -= 1
+
+    def _remove(self, vector_ids: Tuple[int, ...]) -> None:
+        self._remove_rows([self._rows[v] for v in vector_ids if v in self._rows])
+
+    def remove(self, vector_ids: Sequence[int]) -> None:
+        self._apply("_remove", tuple(int(v) for v in vector_ids))
+
+    def _remove_narcotic(self, narcotic_id: int) -> None:
+        self._remove_rows(np.flatnonzero(self._narcotic_ids[:self._size] == narcotic_id).tolist())
+
+    def remove_narcotic(self, narcotic_id: int) -> None:
+        self._apply("_remove_narcotic", int(narcotic_id))
+
+    def search(self, query: Any, top_k: int, similarity_threshold: float) -> List[Tuple[int, float]]:
+        """(narcotic_id, similarity) for the top_k closest vectors."""
+        q = self._normalize(query)
+        with self._lock:
+            if q.shape[0] != self.dim:
+                raise ValueError(f"Query dimension {q.shape[0]} does not match index dimension {self.dim}")
+            self.searches += 1
+            if self._size == 0:
+                return []
+            scores = self._matrix[:self._size] @ q
+            k = min(top_k, self._size)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [
+                (int(self._narcotic_ids[row]), float(scores[row]))
+                for row in top
+                if scores[row] > similarity_threshold
+            ]
+
+    async def load(self, db: AsyncSession, batch_size: int = 1000) -> Dict[str, Any]:
+        started = time.perf_counter()
+        count = (await db.execute(text(f"SELECT COUNT(*) FROM ({VECTORS_SQL}) v"))).scalar_one()
+        with self._lock:
+            if self._loading:
+                raise RuntimeError("in-memory vector index is already loading")
+            self._loading = True
+            self._pending = []
+            if not self.mmap_path:
+                # Never hold two in-RAM copies: drop the live one and let
+                # searches fall back to SQL until the rebuild is swapped in.
+                self.ready = False
+                self._reset(1)
+
+        loading_path = f"{self.mmap_path}.loading" if self.mmap_path else None
+        try:
+            fresh = InMemoryVectorIndex(self.dim, mmap_path=loading_path, initial_capacity=count + max(64, count // 100))
+            result = await db.stream(text(f"{VECTORS_SQL} ORDER BY id").execution_options(yield_per=batch_size))
+            async for partition in result.partitions(batch_size):
+                for vector_id, narcotic_id, vector in partition:
+                    fresh._upsert(int(vector_id), int(narcotic_id), vector)
+
+            with self._lock:
+                for op, args in self._pending:
+                    getattr(fresh, op)(*args)
+                if loading_path:
+                    # The live memmap keeps its (now unlinked) file until released.
+                    os.replace(loading_path, self.mmap_path)
+                self._matrix, self._ids, self._narcotic_ids = fresh._matrix, fresh._ids, fresh._narcotic_ids
+                self._size, self._rows = fresh._size, fresh._rows
+                self.ready = True
+                self.loaded_at = time.time()
+                self.load_seconds = round(time.perf_counter() - started, 3)
+        finally:
+            with self._lock:
+                self._loading = False
+                self._pending = []
+        return self.get_stats()
+
+    async def verify(self, db: AsyncSession, sample: int = 20) -> Dict[str, Any]:
+        rows = (await db.execute(text(
+            "SELECT id, narcotic_id FROM narcotics_image_vectors WHERE image_vector IS NOT NULL"
+        ))).all()
+        table = {int(r[0]): int(r[1]) for r in rows}
+        with self._lock:
+            indexed = {vid: int(self._narcotic_ids[row]) for vid, row in self._rows.items()}
+
+        missing = sorted(set(table) - set(indexed))
+        stale = sorted(set(indexed) - set(table))
+        moved = sorted(vid for vid in set(table) & set(indexed) if table[vid] != indexed[vid])
+
+        mismatched: List[int] = []
+        common = sorted(set(table) & set(indexed))
+        if common and sample > 0:
+            picked = np.random.default_rng().choice(common, size=min(sample, len(common)), replace=False).tolist()
+            stored = await db.execute(
+                text("SELECT id, image_vector FROM narcotics_image_vectors WHERE id = ANY(:ids)"), {"ids": picked}
+            )
+            for vid, vector in stored.all():
+                with self._lock:
+                    row = self._rows.get(int(vid))
+                    current = None if row is None else np.array(self._matrix[row])
+                if current is None or not np.allclose(current, self._normalize(vector), atol=1e-5):
+                    mismatched.append(int(vid))
+
+        return {
+            "consistent": not (missing or stale or moved or mismatched),
+            "table_rows": len(table),
+            "indexed_rows": len(indexed),
+            "missing": missing[:100],
+            "stale": stale[:100],
+            "moved": moved[:100],
+            "sampled": min(sample, len(common)),
+            "mismatched": mismatched,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "dim": self.dim,
+                "vectors": self._size,
+                "narcotics": int(np.unique(self._narcotic_ids[:self._size]).size),
+                "capacity": int(self._matrix.shape[0]),
+                "bytes": int(self._size * self.dim * 4),
+                "mmap_path": self.mmap_path,
+                "loading": self._loading,
+                "loaded_at": self.loaded_at,
+                "load_seconds": self.load_seconds,
+                "searches": self.searches,
+                "fallbacks": self.fallbacks,
+            }
+
+
+_memory_index: Optional[InMemoryVectorIndex] = None
+
+
+def memory_index_enabled() -> bool:
+    return os.getenv("VECTOR_MEMORY_INDEX", "false").lower() in ("1", "true", "yes")
+
+
+def get_memory_index() -> Optional[InMemoryVectorIndex]:
+    global _memory_index
+    if not memory_index_enabled():
+        return None
+    if _memory_index is None:
+        _memory_index = InMemoryVectorIndex.from_env()
+    return _memory_index
+
+
+async def warm_memory_index() -> None:
+    from app.config.db_config import AsyncSessionLocal
+
+    index = get_memory_index()
+    if index is None:
+        return
+    try:
+        async with AsyncSessionLocal() as db:
+            stats = await index.load(db)
+        print(f"[vector-index] loaded {stats['vectors']} vectors in {stats['load_seconds']}s")
+    except Exception as e:
+        print(f"[vector-index] load failed, searches fall back to SQL: {e}")
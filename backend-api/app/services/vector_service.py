@@ -1,26 +1,85 @@
-from typing import List, Optional
+from typing import Optional, Sequence, Union
 import base64
 import numpy as np
+import httpx
+from sqlalchemy import text
+
+from app.config.ai_config import get_embedding_dim
+
+VectorLike = Union[np.ndarray, Sequence[float]]
 
 class VectorService:
     @staticmethod
-    def decode_base64_vector(vector_base64: str) -> List[float]:
+    def decode_vector_bytes(raw: bytes) -> np.ndarray:
+        if not raw:
+            raise ValueError("vector payload is empty")
+        if len(raw) % 4 != 0:
+            raise ValueError("vector payload must be little-endian float32")
+        vector = np.frombuffer(raw, dtype="<f4")
+        if not np.isfinite(vector).all():
+            raise ValueError("vector contains non-finite values")
+        return vector
+
+    @staticmethod
+    def decode_base64_vector(vector_base64: str) -> np.ndarray:
         if not vector_base64:
             raise ValueError("vector_base64 is required")
-        raw = base64.b64decode(vector_base64)
-        return np.frombuffer(raw, dtype=np.float32).tolist()
+        return VectorService.decode_vector_bytes(base64.b64decode(vector_base64))
 
     @staticmethod
-    def vector_to_pg_literal(vector: List[float]) -> str:
-        if not isinstance(vector, (list, tuple)):
-            raise ValueError("vector must be a list or tuple")
-        return "[" + ",".join(format(float(x), ".8f") for x in vector) + "]"
+    def check_dim(vector: np.ndarray, expected: Optional[int] = None) -> np.ndarray:
+        expected = expected or get_embedding_dim()
+        if vector.shape[0] != expected:
+            raise ValueError(f"vector has {vector.shape[0]} dimensions, expected {expected} (EMBEDDING_DIM)")
+        return vector
 
     @staticmethod
-    def build_vector_from_inputs(vector: Optional[List[float]] = None, vector_base64: Optional[str] = None) -> List[float]:
+    def build_vector_from_inputs(vector: Optional[VectorLike] = None, vector_base64: Optional[str] = None) -> np.ndarray:
         if vector_base64:
-            return VectorService.decode_base64_vector(vector_base64)
-        if vector and isinstance(vector, (list, tuple)) and len(vector) > 0:
-            return [float(x) for x in vector]
+            return VectorService.check_dim(VectorService.decode_base64_vector(vector_base64))
+        if vector is not None and len(vector) > 0:
+            arr = np.asarray(vector, dtype=np.float32).reshape(-1)
+            if not np.isfinite(arr).all():
+                raise ValueError("vector contains non-finite values")
+            return VectorService.check_dim(arr)
+
+        raise ValueError("Either vector or vector_base64 is required")
+
+
+async def verify_embedding_dim(client) -> None:
+    """Compare EMBEDDING_DIM with the stored column and with what the AI
+    service's embedding head produces. A definite mismatch raises so the app
+    does not start; an unreachable AI service or database is only logged."""
+    from app.config.db_config import AsyncSessionLocal
+
+    expected = get_embedding_dim()
+    try:
+        async with AsyncSessionLocal() as db:
+            column_dim = (await db.execute(text("""
+                SELECT atttypmod FROM pg_attribute
+                WHERE attrelid = to_regclass('narcotics_image_vectors') AND attname = 'image_vector'
+            """))).scalar()
+    except Exception as e:
+        print(f"[embedding-dim] could not read image_vector column: {e}")
+        column_dim = None
+    if column_dim is not None and column_dim > 0 and column_dim != expected:
+        raise RuntimeError(
+            f"narcotics_image_vectors.image_vector is vector({column_dim}) but EMBEDDING_DIM={expected}"
+        )
 
-        raise ValueError("Either vector or vector_base64 is required")
\ No newline at end of file
+    try:
+        resp = await client.get("/api/embedding-info", timeout=5.0)
+        resp.raise_for_status()
+        info = resp.json()
+    except (httpx.HTTPError, ValueError) as e:
+        print(f"[embedding-dim] AI service not reachable, dimension not verified: {e}")
+        return
+    if not info.get("bound"):
+        print("[embedding-dim] AI service has not probed its embedding head yet")
+        return
+    if int(info["dim"]) != expected:
+        raise RuntimeError(
+            f"AI service embedding head {info.get('head')} outputs {info['dim']}-dim vectors "
+            f"but EMBEDDING_DIM={expected}"
+        )
+    print(f"[embedding-dim] AI service head {info.get('head')} matches EMBEDDING_DIM={expected}")
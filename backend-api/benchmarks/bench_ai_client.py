@@ -0,0 +1,110 @@
+import time
+import socket
+import asyncio
+import argparse
+import threading
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, File, Request, UploadFile
+
+from app.services.ai_client_service import AIServiceClient
+
+PATH = "/api/object-classify"
+
+
+def start_stub(port: int, peers: Set[str]) -> uvicorn.Server:
+    stub = FastAPI()
+
+    @stub.post(PATH)
+    async def classify(request: Request, image: UploadFile = File(...)):
+        peers.add(f"{request.client.host}:{request.client.port}")
+        await image.read()
+        await asyncio.sleep(0.005)
+        return {"objects": []}
+
+    server = uvicorn.Server(uvicorn.Config(stub, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def run(send: Callable[[], Awaitable[httpx.Response]], requests: int, concurrency: int) -> Dict[str, float]:
+    latencies: List[float] = []
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+
+    async def worker() -> None:
+        while not queue.empty():
+            queue.get_nowait()
+            t0 = time.perf_counter()
+            response = await send()
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "req_per_s": requests / elapsed,
+        "p50_ms": latencies[len(latencies) // 2],
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+
+async def main_async(url: Optional[str], requests: int, concurrency: int, payload_kb: int) -> None:
+    peers: Set[str] = set()
+    server = None
+    if url is None:
+        port = free_port()
+        server = start_stub(port, peers)
+        url = f"http://127.0.0.1:{port}"
+
+    payload = b"\xff" * (payload_kb * 1024)
+    files = lambda: {"image": ("bench.jpg", payload, "image/jpeg")}
+
+    async def per_request() -> httpx.Response:
+        async with httpx.AsyncClient(timeout=300.0) as client:
+            return await client.post(f"{url}{PATH}", files=files())
+
+    shared = AIServiceClient(base_url=url, max_concurrency=concurrency, max_connections=concurrency, max_keepalive=concurrency)
+
+    async def pooled() -> httpx.Response:
+        return await shared.post(PATH, files=files())
+
+    print(f"{url}{PATH}: {requests} requests, concurrency {concurrency}, payload {payload_kb} KiB")
+    try:
+        for name, send in (("client per request", per_request), ("shared pooled client", pooled)):
+            peers.clear()
+            await send()
+            stats = await run(send, requests, concurrency)
+            conns = f"{len(peers):5d} connections" if server is not None else ""
+            print(f"{name:<22} {stats['req_per_s']:8.1f} req/s  p50 {stats['p50_ms']:7.2f} ms  p99 {stats['p99_ms']:7.2f} ms  {conns}")
+    finally:
+        await shared.aclose()
+        if server is not None:
+            server.should_exit = True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test per-request httpx clients vs the shared AI-service client")
+    parser.add_argument("--url", default=None, help="AI service base URL; defaults to a local stub server")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--payload-kb", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.url, args.requests, args.concurrency, args.payload_kb))
+
+
+if __name__ == "__main__":
+    main()
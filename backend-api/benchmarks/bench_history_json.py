@@ -0,0 +1,137 @@
+import time
+import asyncio
+import argparse
+import tracemalloc
+from typing import Awaitable, Callable, List
+
+from pydantic import TypeAdapter
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.config.db_config import AsyncSessionLocal
+from app.controllers.history_controller import HistoryController, apply_keyset, history_json_stmt
+from app.models import History
+from app.models.exhibit_model import Exhibit
+from app.schemas.history_schema import HistoryWithExhibit
+
+MARKER = "bench://history"
+controller = HistoryController()
+adapter = TypeAdapter(List[HistoryWithExhibit])
+
+
+async def seed(db, n: int) -> None:
+    ids = (await db.execute(text(
+        "SELECT (SELECT id FROM exhibits ORDER BY id LIMIT 1), (SELECT id FROM subdistricts ORDER BY id LIMIT 1)"
+    ))).one()
+    if ids[0] is None or ids[1] is None:
+        raise SystemExit("need at least one exhibit and one subdistrict to seed history rows")
+    await db.execute(text("""
+        INSERT INTO history (exhibit_id, subdistrict_id, discovery_date, discovery_time, discovered_by,
+                             photo_url, created_at, modified_at, quantity, location, ai_confidence)
+        SELECT :exhibit_id, :subdistrict_id, CURRENT_DATE - (g % 365), TIME '08:00' + (g % 600) * INTERVAL '1 minute',
+               NULL, :marker, now() - g * INTERVAL '1 minute', now(), (g % 50) + 0.5,
+               ST_SetSRID(ST_MakePoint(98 + random() * 7, 6 + random() * 14), 4326), (g % 100)
+        FROM generate_series(1, :n) g
+    """), {"exhibit_id": ids[0], "subdistrict_id": ids[1], "marker": MARKER, "n": n})
+    await db.execute(text("ANALYZE history"))
+    await db.commit()
+
+
+async def cleanup(db) -> None:
+    await db.execute(text("DELETE FROM history WHERE photo_url = :marker"), {"marker": MARKER})
+    await db.commit()
+
+
+def columns(obj) -> dict:
+    return {c.name: getattr(obj, c.name) for c in obj.__table__.columns}
+
+
+async def orm_page(db, limit: int) -> List[dict]:
+    """The list endpoint before it built JSON in SQL: hydrate ORM rows, then
+    assemble one dict per history for Pydantic to validate and serialize."""
+    stmt = select(History, func.ST_X(History.location), func.ST_Y(History.location)).options(
+        joinedload(History.exhibit).selectinload(Exhibit.narcotics),
+        joinedload(History.exhibit).selectinload(Exhibit.firearms),
+    )
+    rows = (await db.execute(apply_keyset(stmt, None, limit))).unique().all()
+
+    items = []
+    for history, longitude, latitude in rows:
+        item = columns(history)
+        del item["location"]
+        item.update(longitude=longitude, latitude=latitude)
+        if history.exhibit:
+            exhibit = columns(history.exhibit)
+            if history.exhibit.narcotics:
+                exhibit["narcotics"] = [columns(n) for n in history.exhibit.narcotics]
+            if history.exhibit.firearms:
+                exhibit["firearms"] = [columns(f) for f in history.exhibit.firearms]
+            item["exhibit"] = exhibit
+        items.append((item, history))
+
+    await controller._attach_names(db, items)
+    return [item for item, _ in items]
+
+
+async def orm_pydantic(limit: int) -> int:
+    async with AsyncSessionLocal() as db:
+        items = await orm_page(db, limit)
+    return len(adapter.dump_json(adapter.validate_python(items)))
+
+
+async def sql_json_page(limit: int) -> int:
+    async with AsyncSessionLocal() as db:
+        body, _ = await controller.get_histories_json(db, limit=limit)
+    return len(body)
+
+
+async def sql_json_stream(limit: int) -> int:
+    size = 0
+    async for chunk in controller.stream_histories_json(history_json_stmt().limit(limit)):
+        size += len(chunk)
+    return size
+
+
+async def measure(name: str, fn: Callable[[int], Awaitable[int]], limit: int, rounds: int) -> None:
+    await fn(limit)
+    timings = []
+    tracemalloc.start()
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        size = await fn(limit)
+        timings.append((time.perf_counter() - t0) * 1000.0)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    timings.sort()
+    print(f"{name:<22} median {timings[len(timings) // 2]:9.1f} ms  min {timings[0]:9.1f} ms  "
+          f"body {size / 2**20:6.2f} MiB  peak py mem {peak / 2**20:7.1f} MiB")
+
+
+async def run(args: argparse.Namespace) -> None:
+    async with AsyncSessionLocal() as db:
+        if args.seed:
+            await seed(db, args.seed)
+        total = (await db.execute(text("SELECT count(*) FROM history"))).scalar_one()
+    print(f"history rows: {total}, exporting {args.rows} per request, {args.rounds} rounds")
+
+    try:
+        await measure("orm + pydantic", orm_pydantic, args.rows, args.rounds)
+        await measure("sql json (buffered)", sql_json_page, args.rows, args.rounds)
+        await measure("sql json (streamed)", sql_json_stream, args.rows, args.rounds)
+    finally:
+        if args.seed and not args.keep:
+            async with AsyncSessionLocal() as db:
+                await cleanup(db)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="History list serialization: ORM + Pydantic vs PostgreSQL-built JSON")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=10000, help="insert this many synthetic rows first (0 to skip)")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded rows")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import time
+import asyncio
+import argparse
+from typing import List
+
+import numpy as np
+
+from app.config.db_config import AsyncSessionLocal, disable_statement_timeout
+from app.config.ai_config import get_embedding_dim
+from app.services.vector_index_service import VectorIndexService
+from app.services.vector_memory_index_service import InMemoryVectorIndex
+from benchmarks.bench_vector_index import TABLE, make_vectors, load_table, search
+
+
+def percentiles(latencies: List[float]) -> str:
+    return f"p50 {np.percentile(latencies, 50):8.3f} ms  p99 {np.percentile(latencies, 99):8.3f} ms"
+
+
+async def run(args: argparse.Namespace) -> None:
+    rng = np.random.default_rng(0)
+    for n in [int(s) for s in args.sizes.split(",")]:
+        print(f"\n== {n} vectors x {args.dim} dims")
+        vectors = make_vectors(n, args.dim, args.clusters, rng)
+        queries = vectors[rng.choice(n, size=args.queries, replace=False)]
+
+        index = InMemoryVectorIndex(args.dim, mmap_path=args.mmap, initial_capacity=n)
+        t0 = time.perf_counter()
+        for i, v in enumerate(vectors):
+            index.add(i + 1, i % 500, v)
+        print(f"  memory index built in {time.perf_counter() - t0:.2f} s ({n * args.dim * 4 / 2**20:.0f} MiB)")
+
+        lat = []
+        for q in queries:
+            t0 = time.perf_counter()
+            await asyncio.to_thread(index.search, q, args.k, 0.0)
+            lat.append((time.perf_counter() - t0) * 1000.0)
+        print(f"  {'in-memory matmul':<22} {percentiles(lat)}")
+
+        if args.no_db:
+            continue
+        async with AsyncSessionLocal() as db:
+            await disable_statement_timeout(db, local=False)
+            await load_table(db, vectors)
+            for name, ann in (("pgvector exact", None), ("pgvector ann", VectorIndexService(table=TABLE, dim=args.dim))):
+                if ann is not None:
+                    await ann.rebuild(db)
+                lat = []
+                for q in queries:
+                    _, ms = await search(db, ann, q, args.k, None)
+                    lat.append(ms)
+                print(f"  {name:<22} {percentiles(lat)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="In-process vector index vs pgvector search latency")
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--dim", type=int, default=get_embedding_dim())
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--mmap", default=None, help="back the matrix with a memory-mapped file")
+    parser.add_argument("--no-db", action="store_true", help="only measure the in-memory index")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
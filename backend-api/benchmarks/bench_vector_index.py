@@ -0,0 +1,143 @@
+import time
+import asyncio
+import argparse
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import text
+
+from app.config.db_config import AsyncSessionLocal, disable_statement_timeout
+from app.config.ai_config import get_embedding_dim
+from app.services.vector_index_service import VectorIndexService, exact_order_expression
+
+TABLE = "bench_narcotic_vectors"
+
+
+def make_vectors(n: int, dim: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    # Stored embeddings are post-activation backbone features, so mostly
+    # non-negative; zero-mean data would flatter the binary-quantized index.
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=n)
+    vectors = np.maximum(centers[labels] + 0.35 * rng.standard_normal((n, dim)).astype(np.float32), 0.0) + 1e-3
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+async def copy_stored(db, limit: Optional[int]) -> int:
+    await db.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+    await db.execute(text(
+        f"CREATE UNLOGGED TABLE {TABLE} AS SELECT id, narcotic_id, image_vector FROM narcotics_image_vectors "
+        f"WHERE image_vector IS NOT NULL ORDER BY id" + (f" LIMIT {int(limit)}" if limit else "")
+    ))
+    await db.execute(text(f"ALTER TABLE {TABLE} ADD PRIMARY KEY (id)"))
+    await db.execute(text(f"ANALYZE {TABLE}"))
+    await db.commit()
+    return (await db.execute(text(f"SELECT COUNT(*) FROM {TABLE}"))).scalar_one()
+
+
+async def load_table(db, vectors: np.ndarray, chunk: int = 500) -> None:
+    dim = vectors.shape[1]
+    await db.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+    await db.execute(text(f"CREATE UNLOGGED TABLE {TABLE} (id serial PRIMARY KEY, narcotic_id int, image_vector vector({dim}))"))
+    insert = text(f"INSERT INTO {TABLE} (narcotic_id, image_vector) VALUES (0, CAST(:v AS vector))")
+    for start in range(0, len(vectors), chunk):
+        await db.execute(insert, [{"v": v} for v in vectors[start:start + chunk]])
+    await db.execute(text(f"ANALYZE {TABLE}"))
+    await db.commit()
+
+
+async def search(db, index: Optional[VectorIndexService], query: np.ndarray, k: int, setting: Optional[int]) -> Tuple[List[int], float]:
+    if index is None:
+        order_by, candidates = exact_order_expression("image_vector", "(SELECT v FROM q)"), k
+    else:
+        await index.apply_search_params(db, ef_search=setting, probes=setting)
+        order_by, candidates = index.order_expression("image_vector", "(SELECT v FROM q)"), index.candidate_limit(k)
+
+    sql = text(f"""
+        WITH q AS (SELECT CAST(:qv AS vector) AS v),
+        c AS MATERIALIZED (SELECT id, image_vector FROM {TABLE} ORDER BY {order_by} LIMIT :candidates)
+        SELECT id FROM c ORDER BY image_vector <=> (SELECT v FROM q) LIMIT :k
+    """)
+    t0 = time.perf_counter()
+    rows = (await db.execute(sql, {"qv": query, "candidates": candidates, "k": k})).scalars().all()
+    elapsed = (time.perf_counter() - t0) * 1000.0
+    await db.rollback()
+    return list(rows), elapsed
+
+
+def report(name: str, latencies: Sequence[float], recall: float) -> None:
+    print(f"  {name:<22} p50 {np.percentile(latencies, 50):8.2f} ms  p99 {np.percentile(latencies, 99):8.2f} ms  recall {recall:.3f}")
+
+
+async def bench_index(db, args: argparse.Namespace, n: int, queries: np.ndarray) -> None:
+    truth, exact_lat = [], []
+    for q in queries:
+        ids, ms = await search(db, None, q, args.k, None)
+        truth.append(set(ids))
+        exact_lat.append(ms)
+    report("exact scan", exact_lat, 1.0)
+
+    index = VectorIndexService(table=TABLE, dim=args.dim, index_type=args.type, lists=max(1, n // 1000))
+    t0 = time.perf_counter()
+    await index.rebuild(db)
+    print(f"  built {index.mode} index in {time.perf_counter() - t0:.1f} s")
+
+    knob = "ef_search" if args.type == "hnsw" else "probes"
+    for setting in [int(s) for s in args.settings.split(",")]:
+        lat, hits = [], 0
+        for q, expected in zip(queries, truth):
+            ids, ms = await search(db, index, q, args.k, setting)
+            lat.append(ms)
+            hits += len(expected & set(ids))
+        report(f"{knob}={setting}", lat, hits / (args.k * len(queries)))
+    if args.source == "stored":
+        # The query vectors above are rows of the table; this excludes each
+        # query from its own results.
+        print(f"  recall excluding self-matches: {await index.measure_recall(db, queries=len(queries), k=args.k)}")
+
+
+async def run(args: argparse.Namespace) -> None:
+    rng = np.random.default_rng(0)
+    async with AsyncSessionLocal() as db:
+        await disable_statement_timeout(db, local=False)
+        if args.source == "stored":
+            n = await copy_stored(db, args.limit)
+            rows = (await db.execute(
+                text(f"SELECT image_vector FROM {TABLE} ORDER BY random() LIMIT :n"), {"n": args.queries}
+            )).scalars().all()
+            await db.rollback()
+            queries = np.stack([row.to_numpy() for row in rows])
+            args.dim = queries.shape[1]
+            print(f"\n== {n} stored vectors x {args.dim} dims ({args.type})")
+            await bench_index(db, args, n, queries)
+        else:
+            for n in [int(s) for s in args.sizes.split(",")]:
+                print(f"\n== {n} synthetic vectors x {args.dim} dims ({args.type})")
+                vectors = make_vectors(n, args.dim, args.clusters, rng)
+                queries = vectors[rng.choice(n, size=args.queries, replace=False)]
+                queries = queries + 0.05 * rng.standard_normal(queries.shape).astype(np.float32)
+                await load_table(db, vectors)
+                await bench_index(db, args, n, queries)
+
+        if not args.keep:
+            await db.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+            await db.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Latency vs recall of pgvector ANN search on narcotic vectors")
+    parser.add_argument("--source", choices=("stored", "synthetic"), default="stored",
+                        help="stored: copy narcotics_image_vectors (queries are stored vectors); synthetic: generated")
+    parser.add_argument("--limit", type=int, default=None, help="rows to copy with --source stored")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="row counts with --source synthetic")
+    parser.add_argument("--dim", type=int, default=get_embedding_dim())
+    parser.add_argument("--type", choices=("hnsw", "ivfflat"), default="hnsw")
+    parser.add_argument("--settings", default="10,20,40,80,160", help="ef_search (hnsw) or probes (ivfflat) values")
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark table")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import re
+import json
+import time
+import base64
+import argparse
+from typing import Callable, Dict
+
+import numpy as np
+
+from app.config.ai_config import get_embedding_dim
+from app.config.db_config import encode_vector
+from app.services.vector_service import VectorService
+
+LITERAL_RE = re.compile(r'^\[\s*-?\d+(\.\d+)?(?:\s*,\s*-?\d+(\.\d+)?)*\s*\]$')
+
+
+def legacy_base64(body: bytes) -> str:
+    payload = json.loads(body)
+    vector = np.frombuffer(base64.b64decode(payload["vector_base64"]), dtype=np.float32).tolist()
+    literal = "[" + ",".join(format(float(x), ".8f") for x in vector) + "]"
+    if not LITERAL_RE.match(literal):
+        raise ValueError("Invalid vector format")
+    return f"SELECT '{literal}'::vector AS v"
+
+
+def legacy_json_list(body: bytes) -> str:
+    payload = json.loads(body)
+    literal = "[" + ",".join(format(float(x), ".8f") for x in payload["vector"]) + "]"
+    if not LITERAL_RE.match(literal):
+        raise ValueError("Invalid vector format")
+    return f"SELECT '{literal}'::vector AS v"
+
+
+# "after" includes the codec's encoding of the bound ndarray, which is what
+# asyncpg puts on the wire.
+def bound_base64(body: bytes):
+    payload = json.loads(body)
+    return encode_vector(VectorService.decode_base64_vector(payload["vector_base64"]))
+
+
+def bound_raw(body: bytes):
+    return encode_vector(VectorService.decode_vector_bytes(body))
+
+
+def measure(fn: Callable[[bytes], object], body: bytes, rounds: int) -> Dict[str, float]:
+    fn(body)
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    for _ in range(rounds):
+        fn(body)
+    return {
+        "cpu_ms": (time.process_time() - cpu0) * 1000.0 / rounds,
+        "wall_ms": (time.perf_counter() - wall0) * 1000.0 / rounds,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-request CPU cost of preparing a /search-vector query vector")
+    parser.add_argument("--dim", type=int, default=get_embedding_dim())
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    vector = np.random.default_rng(0).standard_normal(args.dim).astype(np.float32)
+    vector /= np.linalg.norm(vector)
+    b64_body = json.dumps({"vector_base64": base64.b64encode(vector.tobytes()).decode("ascii")}).encode()
+    list_body = json.dumps({"vector": vector.tolist()}).encode()
+    raw_body = vector.astype("<f4").tobytes()
+
+    print(f"dim {args.dim}, {args.rounds} rounds; sizes: base64 json {len(b64_body) / 1024:.1f} KiB, "
+          f"list json {len(list_body) / 1024:.1f} KiB, raw {len(raw_body) / 1024:.1f} KiB")
+    cases = (
+        ("before: json list -> literal", legacy_json_list, list_body),
+        ("before: base64 -> literal", legacy_base64, b64_body),
+        ("after: base64 -> bind", bound_base64, b64_body),
+        ("after: octet-stream -> bind", bound_raw, raw_body),
+    )
+    for name, fn, body in cases:
+        stats = measure(fn, body, args.rounds)
+        print(f"{name:<30} cpu {stats['cpu_ms']:8.3f} ms/req  wall {stats['wall_ms']:8.3f} ms/req")
+
+
+if __name__ == "__main__":
+    main()
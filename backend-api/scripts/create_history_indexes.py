@@ -0,0 +1,33 @@
+"""Create the /history pagination and filter indexes on an existing database.
+
+The indexes are declared on the History model; tables created before they were
+added only pick them up through this script. Safe to re-run.
+
+    python -m scripts.create_history_indexes
+"""
+import asyncio
+
+from sqlalchemy.schema import CreateIndex
+
+from app.config.db_config import async_engine
+from app.models.history_model import History
+
+
+async def run() -> None:
+    async with async_engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.exec_driver_sql("SET statement_timeout = 0")
+        for index in sorted(History.__table__.indexes, key=lambda i: i.name):
+            ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=async_engine.dialect))
+            ddl = ddl.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1)
+            print(ddl)
+            await conn.exec_driver_sql(ddl)
+        await conn.exec_driver_sql("ANALYZE history")
+
+
+def main() -> None:
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""Create (or re-create) the history_summary table, its sync triggers, and
+backfill it from history. Safe to re-run; history writes are blocked while it runs.
+The API does the same at startup when the table or a trigger is missing
+(HISTORY_SUMMARY_AUTO_INSTALL); use this to force a rebuild.
+
+    python -m scripts.install_history_summary
+    python -m scripts.install_history_summary --no-rebuild   # refresh functions/triggers only
+"""
+import asyncio
+import argparse
+
+from app.config.db_config import AsyncSessionLocal
+from app.services.history_summary_service import install_history_summary
+
+
+async def run(args: argparse.Namespace) -> None:
+    async with AsyncSessionLocal() as db:
+        print(await install_history_summary(db, rebuild=not args.no_rebuild))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Install the incrementally maintained history summary")
+    parser.add_argument("--no-rebuild", action="store_true", help="keep existing summary rows")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
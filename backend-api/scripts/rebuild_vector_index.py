@@ -0,0 +1,53 @@
+"""Rebuild the approximate-nearest-neighbour index on narcotics_image_vectors.
+
+    python -m scripts.rebuild_vector_index --type hnsw --m 16 --ef-construction 64
+    python -m scripts.rebuild_vector_index --type ivfflat          # lists = rows / 1000
+    python -m scripts.rebuild_vector_index --type none             # drop it, back to exact search
+
+With VECTOR_SEARCH_ANN=auto (the default) /search-vector switches to the
+index as soon as it exists, so check the recall printed at the end: it is
+measured on the stored embeddings against an exact scan. Above 2000 dims the
+index is over binary_quantize(), which loses most of its signal on mostly
+positive vectors; drop the index or set VECTOR_SEARCH_ANN=false if recall is
+too low.
+"""
+import math
+import asyncio
+import argparse
+
+from sqlalchemy import text
+
+from app.config.db_config import AsyncSessionLocal
+from app.services.vector_index_service import VectorIndexService
+
+
+async def run(args: argparse.Namespace) -> None:
+    async with AsyncSessionLocal() as db:
+        lists = args.lists
+        if args.type == "ivfflat" and not lists:
+            rows = (await db.execute(text("SELECT COUNT(*) FROM narcotics_image_vectors"))).scalar_one()
+            lists = max(1, rows // 1000 if rows <= 1_000_000 else int(math.sqrt(rows)))
+
+        index = VectorIndexService(index_type=args.type, m=args.m, ef_construction=args.ef_construction, lists=lists)
+        if args.maintenance_work_mem:
+            await db.execute(text(f"SET maintenance_work_mem = '{args.maintenance_work_mem}'"))
+        print(f"building {index.mode} {index.index_type} index for {index.dim}-dim vectors ...")
+        print(await index.rebuild(db))
+        if index.mode != "exact" and args.recall_queries:
+            print(f"recall on stored embeddings: {await index.measure_recall(db, queries=args.recall_queries, k=args.recall_k)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the ANN index for narcotic image vectors")
+    parser.add_argument("--type", choices=("hnsw", "ivfflat", "none"), default="hnsw")
+    parser.add_argument("--m", type=int, default=None)
+    parser.add_argument("--ef-construction", type=int, default=None)
+    parser.add_argument("--lists", type=int, default=None)
+    parser.add_argument("--maintenance-work-mem", default="1GB")
+    parser.add_argument("--recall-queries", type=int, default=20, help="stored vectors to measure recall with (0 to skip)")
+    parser.add_argument("--recall-k", type=int, default=10)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Re-embed narcotics_image_vectors with the AI service's current embedding head.
+
+Vectors are written to a staging column first so the search endpoint keeps
+serving the old embeddings until the swap. Re-running resumes where it left off.
+The swap is refused while any stored vector has no replacement (e.g. its
+reference image is missing), and an ANN index on the old column is rebuilt
+for the new one.
+
+    EMBEDDING_HEAD=gap EMBEDDING_DIM=1280  (on the AI service)
+    python -m scripts.reembed_narcotic_vectors --dim 1280
+"""
+import json
+import asyncio
+import argparse
+from typing import Dict, List, Tuple
+
+import httpx
+from sqlalchemy import text
+
+from app.config.ai_config import get_ai_service_url
+from app.config.db_config import AsyncSessionLocal, disable_statement_timeout
+from app.services.vector_index_service import VectorIndexService
+from app.services.vector_service import VectorService
+
+STAGING_COLUMN = "image_vector_next"
+
+
+async def fetch_pending(db, limit: int) -> List[Tuple[int, str]]:
+    result = await db.execute(text(
+        f"SELECT v.id, i.image_url FROM narcotics_image_vectors v "
+        f"JOIN narcotic_example_images i ON i.id = v.image_id "
+        f"WHERE v.{STAGING_COLUMN} IS NULL AND i.image_url IS NOT NULL "
+        f"ORDER BY v.id LIMIT :limit"
+    ), {"limit": limit})
+    return [(row[0], row[1]) for row in result.all()]
+
+
+async def count_uncovered(db) -> Tuple[int, List[int]]:
+    """Stored vectors with no staged replacement, including rows
+    fetch_pending never selects (no example image or no image_url)."""
+    where = f"image_vector IS NOT NULL AND {STAGING_COLUMN} IS NULL"
+    count = (await db.execute(text(f"SELECT count(*) FROM narcotics_image_vectors WHERE {where}"))).scalar_one()
+    ids = (await db.execute(text(f"SELECT id FROM narcotics_image_vectors WHERE {where} ORDER BY id LIMIT 10"))).scalars().all()
+    return int(count), list(ids)
+
+
+async def download(client: httpx.AsyncClient, url: str) -> bytes:
+    response = await client.get(url)
+    response.raise_for_status()
+    return response.content
+
+
+async def embed(client: httpx.AsyncClient, ai_url: str, images: List[Tuple[str, bytes]]) -> List[Dict]:
+    files = [("images", (name, data, "application/octet-stream")) for name, data in images]
+    response = await client.post(
+        f"{ai_url}/api/convert_image_ref_to_vector/batch",
+        files=files,
+        data={"segment_first": "true", "batch_size": str(len(images))},
+    )
+    response.raise_for_status()
+    return [json.loads(line) for line in response.text.splitlines() if line.strip()]
+
+
+async def run(dim: int, batch_size: int, swap: bool) -> None:
+    ai_url = get_ai_service_url()
+    if not ai_url:
+        raise SystemExit("AI_SERVICE_URL is not set")
+
+    async with AsyncSessionLocal() as db:
+        await disable_statement_timeout(db, local=False)
+        await db.execute(text(
+            f"ALTER TABLE narcotics_image_vectors ADD COLUMN IF NOT EXISTS {STAGING_COLUMN} vector({dim})"
+        ))
+        await db.commit()
+
+        done, failed, skipped = 0, 0, set()
+        async with httpx.AsyncClient(timeout=120.0) as client:
+            while True:
+                rows = [row for row in await fetch_pending(db, batch_size + len(skipped)) if row[0] not in skipped]
+                rows = rows[:batch_size]
+                if not rows:
+                    break
+
+                downloads = await asyncio.gather(*(download(client, url) for _, url in rows), return_exceptions=True)
+                images, ids = [], []
+                for (vector_id, url), data in zip(rows, downloads):
+                    if isinstance(data, Exception):
+                        print(f"[skip] id={vector_id} download failed: {data}")
+                        skipped.add(vector_id)
+                        failed += 1
+                        continue
+                    images.append((f"{vector_id}.jpg", data))
+                    ids.append(vector_id)
+                if not images:
+                    continue
+
+                for result in await embed(client, ai_url, images):
+                    vector_id = ids[result["index"]]
+                    if "error" in result:
+                        print(f"[skip] id={vector_id} embedding failed: {result['error']}")
+                        skipped.add(vector_id)
+                        failed += 1
+                        continue
+                    if result["vector_dimension"] != dim:
+                        raise SystemExit(
+                            f"AI service returned {result['vector_dimension']}-dim vectors "
+                            f"({result.get('embedding_head')}), expected {dim}"
+                        )
+                    vector = VectorService.decode_base64_vector(result["vector_base64"])
+                    await db.execute(
+                        text(f"UPDATE narcotics_image_vectors SET {STAGING_COLUMN} = CAST(:v AS vector) WHERE id = :id"),
+                        {"v": vector, "id": vector_id},
+                    )
+                    done += 1
+                await db.commit()
+                print(f"re-embedded {done} (failed {failed})")
+
+        if not swap:
+            print(f"staging column {STAGING_COLUMN} filled; re-run without --no-swap to activate")
+            return
+        if failed:
+            print(f"{failed} rows failed; keeping the old column. Fix them and re-run.")
+            return
+
+        # Block inserts until the swap commits, so no vector lands in the old
+        # column after the check.
+        await db.execute(text("LOCK TABLE narcotics_image_vectors IN SHARE ROW EXCLUSIVE MODE"))
+        uncovered, sample = await count_uncovered(db)
+        if uncovered:
+            await db.rollback()
+            print(f"{uncovered} stored vectors have no re-embedded replacement (ids {sample}"
+                  f"{' ...' if uncovered > len(sample) else ''}); their reference image is missing "
+                  f"or failed. Keeping the old column; fix or delete those rows and re-run.")
+            return
+
+        index = VectorIndexService(dim=dim)
+        had_index = await index.index_exists(db)
+        await db.execute(text("ALTER TABLE narcotics_image_vectors DROP COLUMN image_vector"))
+        await db.execute(text(f"ALTER TABLE narcotics_image_vectors RENAME COLUMN {STAGING_COLUMN} TO image_vector"))
+        await db.commit()
+        print(f"swapped image_vector to vector({dim}); set EMBEDDING_DIM={dim} on the backend")
+
+        # Dropping the old column dropped its ANN index too.
+        if had_index:
+            print(f"rebuilding {index.mode} {index.index_type} index for {dim}-dim vectors ...")
+            print(await index.rebuild(db))
+            if index.mode != "exact":
+                print(f"recall on stored embeddings: {await index.measure_recall(db)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Re-embed stored narcotic reference vectors")
+    parser.add_argument("--dim", type=int, required=True, help="dimension produced by the AI service's embedding head")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--no-swap", action="store_true", help="fill the staging column only")
+    args = parser.parse_args()
+    asyncio.run(run(args.dim, args.batch_size, swap=not args.no_swap))
+
+
+if __name__ == "__main__":
+    main()
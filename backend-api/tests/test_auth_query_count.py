@@ -0,0 +1,23 @@
+import pytest
+
+from app.controllers.auth_controller import get_user_from_db
+from app.models import Role, User
+
+
+@pytest.mark.asyncio
+async def test_user_lookup_does_not_load_role_members(db, statement_counter):
+    role = Role(role_name="officer")
+    db.add_all([role, *(
+        User(user_id=f"U{i:04d}", firstname=f"First{i}", lastname=f"Last{i}", email=f"u{i}@example.com",
+             password="x", role=role)
+        for i in range(20)
+    )])
+    await db.commit()
+    db.expunge_all()
+
+    statement_counter.reset()
+    user = await get_user_from_db("u3@example.com", db)
+
+    # users JOIN roles only; no selectin load of every user in the role.
+    assert len(statement_counter) == 1
+    assert user.role.role_name == "officer"
@@ -0,0 +1,55 @@
+import gzip
+
+import pytest
+from starlette.requests import Request
+
+from app.services.geometry_cache_service import CachedGeometry
+
+
+def make_request(**headers) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/api/provinces",
+        "headers": [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()],
+    })
+
+
+@pytest.fixture
+def geometry():
+    return CachedGeometry.build('[{"id": 1}]', count=1, version="1")
+
+
+def test_each_encoding_has_its_own_etag(geometry):
+    plain = geometry.respond(make_request(), 60)
+    gz = geometry.respond(make_request(accept_encoding="gzip"), 60)
+
+    assert gzip.decompress(gz.body) == plain.body
+    assert plain.headers["etag"] != gz.headers["etag"]
+    assert gz.headers["vary"] == plain.headers["vary"] == "Accept-Encoding"
+
+
+def test_not_modified_only_for_the_same_encoding(geometry):
+    gz_etag = geometry.respond(make_request(accept_encoding="gzip"), 60).headers["etag"]
+
+    revalidated = geometry.respond(make_request(accept_encoding="gzip", if_none_match=gz_etag), 60)
+    weak = geometry.respond(make_request(accept_encoding="gzip", if_none_match=f"W/{gz_etag}"), 60)
+    other_encoding = geometry.respond(make_request(if_none_match=gz_etag), 60)
+
+    assert revalidated.status_code == 304
+    assert weak.status_code == 304
+    assert other_encoding.status_code == 200
+
+
+@pytest.mark.parametrize("path, schema", [
+    ("/api/provinces", "Province"),
+    ("/api/districts", "District"),
+    ("/api/subdistricts", "Subdistrict"),
+])
+def test_geography_routes_document_their_response(path, schema):
+    from app.main import app
+
+    response = app.openapi()["paths"][path]["get"]["responses"]["200"]
+    body = response["content"]["application/json"]["schema"]
+    assert body["type"] == "array"
+    assert body["items"]["$ref"] == f"#/components/schemas/{schema}"
@@ -0,0 +1,71 @@
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+import pytest
+
+from app.controllers.history_controller import HistoryController
+from app.models import Exhibit, History, Narcotic
+from app.models.district_model import District
+from app.models.province_model import Province
+from app.models.subdistrict_model import Subdistrict
+from app.schemas.history_schema import HistoryWithExhibit
+
+
+async def seed_history(db, created_at: datetime) -> History:
+    province = Province(province_name="Bangkok")
+    district = District(district_name="Pathum Wan", province=province, perimeter=0.0, area_sqkm=0.0)
+    subdistrict = Subdistrict(subdistrict_name="Lumphini", district=district, perimeter=0.0, area_sqkm=0.0)
+    exhibit = Exhibit(category="ยาเสพติด", subcategory="pill")
+    db.add_all([province, district, subdistrict, exhibit])
+    await db.flush()
+
+    db.add(Narcotic(exhibit_id=exhibit.id, drug_type="methamphetamine", weight_grams=Decimal("12.50")))
+    history = History(
+        exhibit_id=exhibit.id,
+        subdistrict_id=subdistrict.id,
+        discovery_date=date(2024, 1, 2),
+        discovery_time=time(9, 30),
+        quantity=Decimal("1.50"),
+        ai_confidence=Decimal("87.25"),
+        created_at=created_at,
+        modified_at=created_at,
+        location="SRID=4326;POINT(100.5 13.75)",
+    )
+    db.add(history)
+    await db.commit()
+    return history
+
+
+def pydantic_json(history: History, exhibit: dict) -> dict:
+    """What the ORM + Pydantic list endpoints returned for the same row."""
+    row = {c.name: getattr(history, c.name) for c in history.__table__.columns if c.name != "location"}
+    row.update(latitude=13.75, longitude=100.5, exhibit=exhibit)
+    return json.loads(HistoryWithExhibit.model_validate(row).model_dump_json())
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("created_at", [
+    datetime(2024, 1, 2, 9, 30),
+    datetime(2024, 1, 2, 9, 30, 0, 120000),
+])
+async def test_history_json_matches_pydantic(db, created_at):
+    history = await seed_history(db, created_at)
+
+    body, _ = await HistoryController().get_histories_json(db, limit=1)
+    item = json.loads(body)[0]
+    expected = pydantic_json(history, item["exhibit"])
+
+    for field in ("quantity", "ai_confidence", "latitude", "longitude", "created_at", "modified_at",
+                  "discovery_date", "discovery_time"):
+        assert item[field] == expected[field], field
+    assert item["exhibit"]["narcotics"][0]["weight_grams"] == "12.50"
+
+
+@pytest.mark.asyncio
+async def test_narcotic_history_json_keeps_float_weight(db):
+    await seed_history(db, datetime(2024, 1, 2, 9, 30))
+
+    body, _ = await HistoryController().get_histories_json(db, limit=1, narcotics_only=True)
+
+    assert json.loads(body)[0]["exhibit"]["narcotics"][0]["weight_grams"] == 12.5
@@ -0,0 +1,71 @@
+from datetime import date, time
+
+import pytest
+from sqlalchemy import select
+
+from app.controllers.history_controller import HistoryController
+from app.models import Exhibit, History, Role, User
+from app.models.district_model import District
+from app.models.province_model import Province
+from app.models.subdistrict_model import Subdistrict
+
+SIZES = (1, 10, 50)
+
+
+async def seed_histories(db, n: int) -> None:
+    role = Role(role_name="officer")
+    province = Province(province_name="Bangkok")
+    district = District(district_name="Pathum Wan", province=province, perimeter=0.0, area_sqkm=0.0)
+    subdistricts = [
+        Subdistrict(subdistrict_name=f"Sub {i}", district=district, perimeter=0.0, area_sqkm=0.0)
+        for i in range(3)
+    ]
+    users = [
+        User(user_id=f"U{i:04d}", firstname=f"First{i}", lastname=f"Last{i}", email=f"u{i}@example.com",
+             password="x", role=role)
+        for i in range(4)
+    ]
+    exhibit = Exhibit(category="ยาเสพติด", subcategory="pill")
+    db.add_all([role, province, district, exhibit, *subdistricts, *users])
+    await db.flush()
+
+    db.add_all([
+        History(
+            exhibit_id=exhibit.id,
+            subdistrict_id=subdistricts[i % len(subdistricts)].id,
+            discovery_date=date(2024, 1, 1 + i % 28),
+            discovery_time=time(12, 0),
+            discovered_by=users[i % len(users)].user_id,
+            modified_by=users[(i + 1) % len(users)].user_id,
+            location="SRID=4326;POINT(100.5 13.7)",
+        )
+        for i in range(n)
+    ])
+    await db.commit()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("n", SIZES)
+async def test_attach_names_query_count_is_constant(db, statement_counter, n):
+    await seed_histories(db, n)
+    histories = (await db.execute(select(History))).scalars().all()
+    rows = [({}, history) for history in histories]
+
+    statement_counter.reset()
+    await HistoryController()._attach_names(db, rows)
+
+    # One lookup for locations and one for users, however many histories.
+    assert len(statement_counter) == 2
+    assert all(row["subdistrict_name"] and row["discoverer_name"] and row["modifier_name"] for row, _ in rows)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("n", SIZES)
+async def test_history_list_query_count_is_constant(db, statement_counter, n):
+    await seed_histories(db, n)
+
+    statement_counter.reset()
+    body, _ = await HistoryController().get_histories_json(db, limit=n)
+
+    assert len(statement_counter) == 1
+    assert body.count(b'"discoverer_name"') == n
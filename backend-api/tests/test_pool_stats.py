@@ -0,0 +1,39 @@
+import time
+
+import pytest
+from sqlalchemy.util import greenlet_spawn
+
+from app.config.db_config import InstrumentedQueuePool
+
+CONNECT_SECONDS = 0.05
+
+
+class FakeConnection:
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def slow_connect():
+    time.sleep(CONNECT_SECONDS)
+    return FakeConnection()
+
+
+def checkout_twice(pool):
+    pool.connect().close()  # opens the connection
+    pool.connect().close()  # reuses it
+
+
+@pytest.mark.asyncio
+async def test_connect_latency_is_not_counted_as_pool_wait():
+    pool = InstrumentedQueuePool(slow_connect, pool_size=1, max_overflow=0)
+
+    await greenlet_spawn(checkout_twice, pool)
+
+    stats = pool.get_stats()
+    assert stats["acquisitions"] == 2
+    assert stats["connects"] == 1
+    assert stats["connect_ms_max"] >= CONNECT_SECONDS * 1000.0
+    assert stats["wait_ms_max"] < CONNECT_SECONDS * 1000.0 / 2
@@ -0,0 +1,18 @@
+from fastapi.testclient import TestClient
+
+from app.main import create_app
+
+
+def test_oversized_upload_is_rejected_with_cors_headers(monkeypatch):
+    monkeypatch.setenv("AI_MAX_UPLOAD_MB", "0.001")
+    client = TestClient(create_app())
+
+    response = client.post(
+        "/api/object-classify",
+        content=b"x" * 4096,
+        headers={"Origin": "http://localhost", "Content-Type": "application/octet-stream"},
+    )
+
+    # Without the CORS headers a browser reports a CORS error instead of the 413.
+    assert response.status_code == 413
+    assert response.headers["access-control-allow-origin"] == "http://localhost"